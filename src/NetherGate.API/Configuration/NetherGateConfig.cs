@@ -269,6 +269,18 @@ public class MonitoringConfig
     /// </summary>
     [JsonPropertyName("crash_detection")]
     public CrashDetectionConfig CrashDetection { get; set; } = new();
+
+    /// <summary>
+    /// 日志刷屏抑制配置
+    /// </summary>
+    [JsonPropertyName("log_throttle")]
+    public LogThrottleConfig LogThrottle { get; set; } = new();
+
+    /// <summary>
+    /// 日志匹配器统计配置
+    /// </summary>
+    [JsonPropertyName("log_matcher_stats")]
+    public LogMatcherStatsConfig LogMatcherStats { get; set; } = new();
 }
 
 /// <summary>
@@ -307,6 +319,104 @@ public class CrashDetectionConfig
     public List<string> Keywords { get; set; } = new() { "Exception in server tick loop" };
 }
 
+/// <summary>
+/// 日志刷屏抑制配置
+/// 按删除数字后的消息模板限流，被抑制的行不发布日志事件、不进入日志匹配器
+/// </summary>
+public class LogThrottleConfig
+{
+    /// <summary>
+    /// 是否启用日志刷屏抑制
+    /// </summary>
+    [JsonPropertyName("enabled")]
+    public bool Enabled { get; set; } = false;
+
+    /// <summary>
+    /// 每个模板每秒允许通过的行数（0 表示只限制命中规则的日志）
+    /// </summary>
+    [JsonPropertyName("rate")]
+    public double Rate { get; set; } = 5.0;
+
+    /// <summary>
+    /// 每个模板允许的突发行数
+    /// </summary>
+    [JsonPropertyName("burst")]
+    public int Burst { get; set; } = 20;
+
+    /// <summary>
+    /// 生成 "N 条相似日志被抑制" 汇总事件的间隔（秒）
+    /// </summary>
+    [JsonPropertyName("summary_interval")]
+    public double SummaryInterval { get; set; } = 10.0;
+
+    /// <summary>
+    /// 最多跟踪的模板数
+    /// </summary>
+    [JsonPropertyName("max_templates")]
+    public int MaxTemplates { get; set; } = 4096;
+
+    /// <summary>
+    /// 针对特定日志的限流规则（按顺序取第一个命中的规则）
+    /// </summary>
+    [JsonPropertyName("rules")]
+    public List<LogThrottleRuleConfig> Rules { get; set; } = new()
+    {
+        new LogThrottleRuleConfig { Contains = "moved too quickly!", Rate = 0.2, Burst = 1 },
+        new LogThrottleRuleConfig { Contains = "moved wrongly!", Rate = 0.2, Burst = 1 },
+        new LogThrottleRuleConfig { Contains = "Can't keep up!", Rate = 0.1, Burst = 1 }
+    };
+}
+
+/// <summary>
+/// 日志刷屏抑制规则
+/// </summary>
+public class LogThrottleRuleConfig
+{
+    /// <summary>
+    /// 消息包含该文本时使用本规则
+    /// </summary>
+    [JsonPropertyName("contains")]
+    public string Contains { get; set; } = string.Empty;
+
+    /// <summary>
+    /// 每个模板每秒允许通过的行数（0 表示令牌不再补充）
+    /// </summary>
+    [JsonPropertyName("rate")]
+    public double Rate { get; set; } = 1.0;
+
+    /// <summary>
+    /// 允许的突发行数
+    /// </summary>
+    [JsonPropertyName("burst")]
+    public int Burst { get; set; } = 1;
+}
+
+/// <summary>
+/// 日志匹配器统计配置
+/// 记录每个匹配器的尝试次数、命中次数、累计和 p99 耗时，用于定位拖慢日志解析的匹配器
+/// </summary>
+public class LogMatcherStatsConfig
+{
+    /// <summary>
+    /// 是否记录匹配器统计
+    /// </summary>
+    [JsonPropertyName("enabled")]
+    public bool Enabled { get; set; } = true;
+
+    /// <summary>
+    /// 是否按近期命中次数重排同优先级的匹配器（隐含 enabled）
+    /// 同一行能被多个同优先级匹配器匹配时，胜出者可能因此改变
+    /// </summary>
+    [JsonPropertyName("adaptive")]
+    public bool Adaptive { get; set; } = false;
+
+    /// <summary>
+    /// 自适应重排的间隔（行数）
+    /// </summary>
+    [JsonPropertyName("reorder_interval")]
+    public int ReorderInterval { get; set; } = 10000;
+}
+
 /// <summary>
 /// 自动重启配置
 /// </summary>
@@ -100,6 +100,32 @@ public record ServerLogEvent : ServerEvent
     public string? Logger { get; init; }
 }
 
+/// <summary>
+/// 相似日志被抑制的汇总事件
+/// </summary>
+public record LogSpamSuppressedEvent : ServerEvent
+{
+    /// <summary>
+    /// 归一化模板（删除数字后的消息）
+    /// </summary>
+    public string Template { get; init; } = string.Empty;
+    
+    /// <summary>
+    /// 第一条被抑制的原始消息
+    /// </summary>
+    public string Sample { get; init; } = string.Empty;
+    
+    /// <summary>
+    /// 被抑制的行数
+    /// </summary>
+    public int Count { get; init; }
+    
+    /// <summary>
+    /// 从第一条被抑制到汇总时经过的时间
+    /// </summary>
+    public TimeSpan Duration { get; init; }
+}
+
 /// <summary>
 /// RCON 已连接
 /// </summary>
@@ -5,6 +5,17 @@ namespace NetherGate.API.Protocol;
 /// </summary>
 public interface ISmpApi
 {
+    // ========== 通用调用 ==========
+
+    /// <summary>
+    /// 调用任意 SMP 方法
+    /// 参数和结果均为 JSON 文本，供 Python 等脚本桥接使用（如一次请求添加多个白名单条目）
+    /// </summary>
+    /// <param name="method">方法名（如 "allowlist/add"）</param>
+    /// <param name="parametersJson">JSON 格式的参数，null 表示无参数</param>
+    /// <returns>JSON 格式的结果，无结果时为 null</returns>
+    Task<string?> InvokeJsonAsync(string method, string? parametersJson = null);
+
     // ========== 白名单管理 ==========
     
     /// <summary>
@@ -390,6 +390,24 @@ server_process:
       enabled: true
       keywords:  # 崩溃关键词
         - ""Exception in server tick loop""
+    
+    # 日志刷屏抑制（被抑制的行不发布日志事件、不进入日志匹配器，定时发布汇总事件）
+    log_throttle:
+      enabled: false
+      rate: 5.0  # 每个模板每秒允许的行数（0 表示只限制命中规则的日志）
+      burst: 20  # 每个模板允许的突发行数
+      summary_interval: 10  # 汇总间隔（秒）
+      max_templates: 4096  # 最多跟踪的模板数
+      rules:  # 特定日志的限流规则
+        - contains: ""moved too quickly!""
+          rate: 0.2
+          burst: 1
+    
+    # 日志匹配器统计（每个匹配器的尝试/命中次数、累计和 p99 耗时）
+    log_matcher_stats:
+      enabled: true
+      adaptive: false  # 按近期命中次数重排同优先级的匹配器
+      reorder_interval: 10000  # 自适应重排间隔（行数）
   
   # 自动重启配置
   auto_restart:
@@ -0,0 +1,153 @@
+using NetherGate.API.Events;
+using System.Diagnostics;
+
+namespace NetherGate.Core.Process;
+
+/// <summary>
+/// 单个日志匹配器的尝试次数、命中次数和耗时统计
+/// 耗时按纳秒数的二进制位数分桶记录，p99 的精度为 2 倍以内，记录开销固定且与样本数无关。
+/// 与 Python SDK 的 MatcherStats 使用相同的统计方式
+/// </summary>
+public class LogMatcherStats
+{
+    private readonly long[] _histogram = new long[64];
+    private long _attempts;
+    private long _hits;
+    private long _errors;
+    private long _totalTicks;
+    private long _scoredHits;
+
+    /// <summary>
+    /// 匹配器
+    /// </summary>
+    public ILogMatcher Matcher { get; }
+
+    /// <summary>
+    /// 匹配器类型名
+    /// </summary>
+    public string Name => Matcher.GetType().Name;
+
+    /// <summary>
+    /// 匹配器优先级
+    /// </summary>
+    public int Priority => Matcher.Priority;
+
+    /// <summary>
+    /// 尝试次数
+    /// </summary>
+    public long Attempts => Interlocked.Read(ref _attempts);
+
+    /// <summary>
+    /// 产生事件的次数
+    /// </summary>
+    public long Hits => Interlocked.Read(ref _hits);
+
+    /// <summary>
+    /// 抛出异常的次数
+    /// </summary>
+    public long Errors => Interlocked.Read(ref _errors);
+
+    /// <summary>
+    /// 命中次数 / 尝试次数
+    /// </summary>
+    public double HitRate => Attempts > 0 ? (double)Hits / Attempts : 0;
+
+    /// <summary>
+    /// 累计匹配耗时
+    /// </summary>
+    public TimeSpan TotalTime => TimeSpan.FromSeconds((double)Interlocked.Read(ref _totalTicks) / Stopwatch.Frequency);
+
+    /// <summary>
+    /// 平均每次尝试的耗时
+    /// </summary>
+    public TimeSpan MeanTime => Attempts > 0 ? TotalTime / Attempts : TimeSpan.Zero;
+
+    /// <summary>
+    /// 单次尝试耗时的 99 分位数
+    /// </summary>
+    public TimeSpan P99 => GetPercentile(0.99);
+
+    /// <summary>
+    /// 自适应重排使用的近期命中分数（每次重排衰减一半）
+    /// </summary>
+    internal double Score { get; private set; }
+
+    public LogMatcherStats(ILogMatcher matcher)
+    {
+        Matcher = matcher;
+    }
+
+    /// <summary>
+    /// 单次尝试耗时的分位数
+    /// </summary>
+    /// <param name="fraction">分位（0~1）</param>
+    /// <returns>所在分桶的上界（精度为 2 倍以内）</returns>
+    public TimeSpan GetPercentile(double fraction)
+    {
+        var attempts = Attempts;
+        if (attempts == 0)
+            return TimeSpan.Zero;
+
+        var rank = fraction * attempts;
+        long seen = 0;
+        for (var bits = 0; bits < _histogram.Length - 1; bits++)
+        {
+            seen += Interlocked.Read(ref _histogram[bits]);
+            if (seen >= rank)
+                // 分桶上界为 2^bits 纳秒，TimeSpan 精度为 100 纳秒，向上取整
+                return TimeSpan.FromTicks(((1L << bits) + 99) / 100);
+        }
+        return TimeSpan.MaxValue;
+    }
+
+    /// <summary>
+    /// 记录一次尝试
+    /// </summary>
+    /// <param name="elapsedTicks">Stopwatch 计时单位的耗时</param>
+    /// <param name="hit">是否产生事件</param>
+    /// <param name="error">是否抛出异常</param>
+    public void Record(long elapsedTicks, bool hit, bool error = false)
+    {
+        Interlocked.Increment(ref _attempts);
+        if (hit)
+            Interlocked.Increment(ref _hits);
+        if (error)
+            Interlocked.Increment(ref _errors);
+        Interlocked.Add(ref _totalTicks, elapsedTicks);
+
+        var nanoseconds = (ulong)Math.Max(0, (long)(elapsedTicks * (1_000_000_000.0 / Stopwatch.Frequency)));
+        var bucket = Math.Min(64 - System.Numerics.BitOperations.LeadingZeroCount(nanoseconds), _histogram.Length - 1);
+        Interlocked.Increment(ref _histogram[bucket]);
+    }
+
+    /// <summary>
+    /// 清空统计
+    /// </summary>
+    public void Reset()
+    {
+        Interlocked.Exchange(ref _attempts, 0);
+        Interlocked.Exchange(ref _hits, 0);
+        Interlocked.Exchange(ref _errors, 0);
+        Interlocked.Exchange(ref _totalTicks, 0);
+        for (var i = 0; i < _histogram.Length; i++)
+            Interlocked.Exchange(ref _histogram[i], 0);
+        _scoredHits = 0;
+        Score = 0;
+    }
+
+    /// <summary>
+    /// 把上次重排以来的命中次数计入分数，旧分数衰减一半
+    /// </summary>
+    internal void UpdateScore()
+    {
+        var hits = Hits;
+        Score = Score / 2 + (hits - _scoredHits);
+        _scoredHits = hits;
+    }
+
+    public override string ToString()
+    {
+        return $"{Name} (priority={Priority}): attempts={Attempts}, hits={Hits}, errors={Errors}, " +
+               $"total={TotalTime.TotalMilliseconds:F3}ms, p99={P99.TotalMilliseconds * 1000:F1}us";
+    }
+}
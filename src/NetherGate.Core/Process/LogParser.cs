@@ -1,19 +1,33 @@
+using NetherGate.API.Configuration;
 using NetherGate.API.Events;
 using NetherGate.API.Logging;
+using System.Diagnostics;
 using System.Text.RegularExpressions;
 
 namespace NetherGate.Core.Process;
 
 /// <summary>
 /// Minecraft 服务器日志解析器
-/// 解析服务器输出日志，提取事件信息，支持插件注册自定义匹配器
+/// 解析服务器输出日志，提取事件信息，支持插件注册自定义匹配器。
+/// 启用日志刷屏抑制时，被抑制的行既不发布日志事件也不进入匹配器，汇总事件定时发布。
+/// 启用匹配器统计时记录每个匹配器的尝试次数、命中次数、累计和 p99 耗时（GetMatcherStats）
 /// </summary>
-public class LogParser
+public class LogParser : IDisposable
 {
+    private sealed record MatcherEntry(ILogMatcher Matcher, long Sequence, LogMatcherStats Stats);
+
     private readonly ILogger _logger;
     private readonly IEventBus _eventBus;
-    private readonly List<ILogMatcher> _matchers = new();
+    private readonly List<MatcherEntry> _matchers = new();
     private readonly object _matcherLock = new();
+    private readonly LogThrottle? _throttle;
+    private readonly System.Threading.Timer? _summaryTimer;
+    private readonly bool _collectStats;
+    private readonly bool _adaptive;
+    private readonly int _reorderInterval;
+    private MatcherEntry[] _ordered = Array.Empty<MatcherEntry>();
+    private long _nextSequence;
+    private long _lines;
 
     // 日志格式正则表达式
     // 示例: [19:45:30] [Server thread/INFO]: <Player> Hello world
@@ -27,11 +41,33 @@ public class LogParser
         @"^\[(\d{2}:\d{2}:\d{2})\s+([A-Z]+)\s*\]:\s+(.+)$",
         RegexOptions.Compiled | RegexOptions.IgnoreCase);
 
-    public LogParser(ILogger logger, IEventBus eventBus)
+    /// <summary>
+    /// 进入匹配器管线的行数（启用匹配器统计时记录）
+    /// </summary>
+    public long MatchedLines => Interlocked.Read(ref _lines);
+
+    public LogParser(
+        ILogger logger,
+        IEventBus eventBus,
+        LogThrottleConfig? throttleConfig = null,
+        LogMatcherStatsConfig? statsConfig = null)
     {
         _logger = logger;
         _eventBus = eventBus;
 
+        statsConfig ??= new LogMatcherStatsConfig();
+        _adaptive = statsConfig.Adaptive;
+        _collectStats = statsConfig.Enabled || _adaptive;
+        _reorderInterval = Math.Max(1, statsConfig.ReorderInterval);
+
+        if (throttleConfig is { Enabled: true })
+        {
+            _throttle = new LogThrottle(throttleConfig);
+            // 刷屏停止后不会再有新行到达，汇总事件由定时器发布
+            var period = TimeSpan.FromSeconds(Math.Max(1, throttleConfig.SummaryInterval));
+            _summaryTimer = new System.Threading.Timer(_ => _ = FlushSummariesAsync(), null, period, period);
+        }
+
         // 注册内置匹配器
         RegisterMatcher(new ServerReadyMatcher());
         RegisterMatcher(new ServerStoppingMatcher());
@@ -50,9 +86,30 @@ public class LogParser
     {
         lock (_matcherLock)
         {
-            _matchers.Add(matcher);
-            // 按优先级降序排序
-            _matchers.Sort((a, b) => b.Priority.CompareTo(a.Priority));
+            _matchers.Add(new MatcherEntry(matcher, _nextSequence++, new LogMatcherStats(matcher)));
+            SortMatchers();
+        }
+    }
+
+    /// <summary>
+    /// 获取日志匹配器统计
+    /// </summary>
+    /// <returns>按当前执行顺序排列的统计</returns>
+    public IReadOnlyList<LogMatcherStats> GetMatcherStats()
+    {
+        return Volatile.Read(ref _ordered).Select(entry => entry.Stats).ToList();
+    }
+
+    /// <summary>
+    /// 清空所有匹配器统计
+    /// </summary>
+    public void ResetMatcherStats()
+    {
+        lock (_matcherLock)
+        {
+            Interlocked.Exchange(ref _lines, 0);
+            foreach (var entry in _matchers)
+                entry.Stats.Reset();
         }
     }
 
@@ -75,6 +132,9 @@ public class LogParser
                 var level = match.Groups[3].Value;
                 var message = match.Groups[4].Value;
 
+                if (IsSuppressed(message))
+                    return;
+
                 // 发布日志事件
                 await PublishLogEventAsync(level, message, thread);
 
@@ -91,16 +151,22 @@ public class LogParser
                 var level = altMatch.Groups[2].Value;
                 var message = altMatch.Groups[3].Value;
 
+                if (IsSuppressed(message))
+                    return;
+
                 await PublishLogEventAsync(level, message);
                 await TryParseSpecificEventsAsync(message, level);
                 return;
             }
 
+            // 尝试从嵌套的 "[...]: " 包裹中提取最内层消息并解析（例如 Paper 输出或嵌套前缀导致）
+            var innerMessage = ExtractInnermostMessage(line);
+            if (IsSuppressed(innerMessage))
+                return;
+
             // 两种格式都不符合：发布原始日志
             await PublishLogEventAsync("INFO", line);
 
-            // 尝试从嵌套的 "[...]: " 包裹中提取最内层消息并解析（例如 Paper 输出或嵌套前缀导致）
-            var innerMessage = ExtractInnermostMessage(line);
             if (!string.Equals(innerMessage, line, StringComparison.Ordinal))
             {
                 await TryParseSpecificEventsAsync(innerMessage);
@@ -117,21 +183,69 @@ public class LogParser
     }
 
     /// <summary>
-    /// 尝试解析特定事件（使用匹配器管线）
+    /// 立即发布所有尚未汇总的刷屏抑制记录
     /// </summary>
-    private async Task TryParseSpecificEventsAsync(string message, string level = "INFO", string? thread = null)
+    public async Task FlushSummariesAsync(bool force = false)
     {
-        ILogMatcher[] matchers;
-        lock (_matcherLock)
+        if (_throttle == null)
+            return;
+
+        try
         {
-            matchers = _matchers.ToArray();
+            foreach (var summary in _throttle.Flush(force))
+            {
+                await _eventBus.PublishAsync(summary);
+            }
         }
+        catch (Exception ex)
+        {
+            _logger.Error("发布日志抑制汇总失败", ex);
+        }
+    }
+
+    public void Dispose()
+    {
+        _summaryTimer?.Dispose();
+    }
+
+    /// <summary>
+    /// 日志刷屏抑制：在发布日志事件和匹配器之前按消息模板限流
+    /// </summary>
+    private bool IsSuppressed(string message)
+    {
+        return _throttle != null && !_throttle.Allow(message);
+    }
 
-        foreach (var matcher in matchers)
+    /// <summary>
+    /// 尝试解析特定事件（使用匹配器管线）
+    /// </summary>
+    private async Task TryParseSpecificEventsAsync(string message, string level = "INFO", string? thread = null)
+    {
+        var matchers = Volatile.Read(ref _ordered);
+        var collectStats = _collectStats;
+        var line = collectStats ? Interlocked.Increment(ref _lines) : 0;
+
+        foreach (var entry in matchers)
         {
+            var matcher = entry.Matcher;
             try
             {
-                var evt = matcher.TryMatch(message, level, thread);
+                var start = collectStats ? Stopwatch.GetTimestamp() : 0;
+                ServerEvent? evt;
+                try
+                {
+                    evt = matcher.TryMatch(message, level, thread);
+                }
+                catch
+                {
+                    if (collectStats)
+                        entry.Stats.Record(Stopwatch.GetTimestamp() - start, hit: false, error: true);
+                    throw;
+                }
+
+                if (collectStats)
+                    entry.Stats.Record(Stopwatch.GetTimestamp() - start, evt != null);
+
                 if (evt != null)
                 {
                     // 特殊处理 ServerReadyEvent 的日志输出
@@ -148,7 +262,7 @@ public class LogParser
                     }
 
                     await _eventBus.PublishAsync(evt);
-                    return; // 匹配成功，停止后续匹配
+                    break; // 匹配成功，停止后续匹配
                 }
             }
             catch (Exception ex)
@@ -156,6 +270,32 @@ public class LogParser
                 _logger.Error($"日志匹配器 {matcher.GetType().Name} 执行失败", ex);
             }
         }
+
+        if (_adaptive && line % _reorderInterval == 0)
+        {
+            lock (_matcherLock)
+            {
+                foreach (var entry in _matchers)
+                    entry.Stats.UpdateScore();
+                SortMatchers();
+            }
+        }
+    }
+
+    /// <summary>
+    /// 重新生成匹配器执行顺序（调用方持有 _matcherLock）
+    /// 按优先级降序；同优先级在自适应模式下按近期命中分数降序，其余按注册顺序
+    /// </summary>
+    private void SortMatchers()
+    {
+        var adaptive = _adaptive;
+        var ordered = _matchers
+            .OrderByDescending(entry => entry.Matcher.Priority)
+            .ThenByDescending(entry => adaptive ? entry.Stats.Score : 0)
+            .ThenBy(entry => entry.Sequence)
+            .ToArray();
+        // 新数组构建完成后才替换，正在进行的匹配继续使用旧数组
+        Volatile.Write(ref _ordered, ordered);
     }
 
     /// <summary>
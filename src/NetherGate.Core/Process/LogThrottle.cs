@@ -0,0 +1,207 @@
+using NetherGate.API.Configuration;
+using NetherGate.API.Events;
+using System.Diagnostics;
+
+namespace NetherGate.Core.Process;
+
+/// <summary>
+/// 日志刷屏抑制器
+/// 每个归一化模板（删除数字后的消息）一个令牌桶：允许 Burst 行突发，之后每秒 Rate 行。
+/// 被抑制的行只计数，Flush 每 SummaryInterval 秒为有抑制记录的模板生成一个 LogSpamSuppressedEvent。
+/// 与 Python SDK 的 LogThrottle 使用相同的模板规则和参数
+/// </summary>
+public class LogThrottle
+{
+    private sealed class Bucket
+    {
+        public double Tokens;
+        public long Updated;
+        public double Rate;
+        public int Burst;
+        public int Suppressed;
+        public string Sample = string.Empty;
+        public long Since;
+        public LinkedListNode<string> Node = null!;
+    }
+
+    private readonly LogThrottleConfig _config;
+    private readonly Dictionary<string, Bucket> _buckets = new(StringComparer.Ordinal);
+    private readonly LinkedList<string> _order = new();
+    private readonly List<LogSpamSuppressedEvent> _evicted = new();
+    private readonly object _lock = new();
+    private long _nextSummary;
+
+    /// <summary>
+    /// 放行的行数
+    /// </summary>
+    public long Passed { get; private set; }
+
+    /// <summary>
+    /// 被抑制的行数
+    /// </summary>
+    public long Suppressed { get; private set; }
+
+    public LogThrottle(LogThrottleConfig config)
+    {
+        _config = config;
+        _nextSummary = Stopwatch.GetTimestamp() + ToTicks(config.SummaryInterval);
+    }
+
+    /// <summary>
+    /// 删除所有数字得到日志消息的归一化模板
+    /// 例如 "Running 2003ms or 40 ticks behind" 与 "Running 5120ms or 102 ticks behind" 得到相同的模板
+    /// </summary>
+    public static string GetTemplate(string message)
+    {
+        var digits = 0;
+        foreach (var c in message)
+        {
+            if (c is >= '0' and <= '9')
+                digits++;
+        }
+        if (digits == 0)
+            return message;
+
+        return string.Create(message.Length - digits, message, static (span, source) =>
+        {
+            var index = 0;
+            foreach (var c in source)
+            {
+                if (c is < '0' or > '9')
+                    span[index++] = c;
+            }
+        });
+    }
+
+    /// <summary>
+    /// 判断一行日志是否放行
+    /// </summary>
+    /// <param name="message">日志消息（已剥离时间戳/线程/级别）</param>
+    /// <returns>放行返回 true，被抑制返回 false</returns>
+    public bool Allow(string message)
+    {
+        var rate = _config.Rate;
+        var burst = _config.Burst;
+        var ruled = false;
+        foreach (var rule in _config.Rules)
+        {
+            if (!string.IsNullOrEmpty(rule.Contains) && message.Contains(rule.Contains, StringComparison.Ordinal))
+            {
+                rate = rule.Rate;
+                burst = rule.Burst;
+                ruled = true;
+                break;
+            }
+        }
+
+        lock (_lock)
+        {
+            if (!ruled && rate <= 0)
+            {
+                Passed++;
+                return true;
+            }
+
+            var template = GetTemplate(message);
+            var now = Stopwatch.GetTimestamp();
+            if (!_buckets.TryGetValue(template, out var bucket))
+            {
+                if (_buckets.Count >= _config.MaxTemplates && _order.First != null)
+                {
+                    // 淘汰最早加入的模板，保留其尚未汇总的抑制计数
+                    var oldest = _order.First.Value;
+                    var evicted = _buckets[oldest];
+                    _buckets.Remove(oldest);
+                    _order.RemoveFirst();
+                    if (evicted.Suppressed > 0)
+                        _evicted.Add(CreateSummary(oldest, evicted, now));
+                }
+
+                bucket = new Bucket { Tokens = burst, Updated = now, Rate = rate, Burst = burst };
+                bucket.Node = _order.AddLast(template);
+                _buckets[template] = bucket;
+            }
+            else
+            {
+                var elapsed = (double)(now - bucket.Updated) / Stopwatch.Frequency;
+                bucket.Tokens = Math.Min(bucket.Burst, bucket.Tokens + elapsed * bucket.Rate);
+                bucket.Updated = now;
+            }
+
+            if (bucket.Tokens >= 1)
+            {
+                bucket.Tokens -= 1;
+                Passed++;
+                return true;
+            }
+
+            if (bucket.Suppressed == 0)
+            {
+                bucket.Sample = message;
+                bucket.Since = now;
+            }
+            bucket.Suppressed++;
+            Suppressed++;
+            return false;
+        }
+    }
+
+    /// <summary>
+    /// 生成到期的汇总事件
+    /// </summary>
+    /// <param name="force">忽略 SummaryInterval，立即汇总全部抑制记录</param>
+    /// <returns>汇总事件列表，未到期时为空</returns>
+    public List<LogSpamSuppressedEvent> Flush(bool force = false)
+    {
+        lock (_lock)
+        {
+            var now = Stopwatch.GetTimestamp();
+            if (!force && now < _nextSummary)
+                return new List<LogSpamSuppressedEvent>();
+
+            _nextSummary = now + ToTicks(_config.SummaryInterval);
+            var summaries = new List<LogSpamSuppressedEvent>(_evicted);
+            _evicted.Clear();
+
+            var idle = new List<string>();
+            foreach (var (template, bucket) in _buckets)
+            {
+                if (bucket.Suppressed > 0)
+                {
+                    summaries.Add(CreateSummary(template, bucket, now));
+                    bucket.Suppressed = 0;
+                    continue;
+                }
+
+                // 令牌已经回满的模板与新建的桶状态相同，可以删除
+                var elapsed = (double)(now - bucket.Updated) / Stopwatch.Frequency;
+                if (bucket.Rate <= 0 || bucket.Tokens + elapsed * bucket.Rate >= bucket.Burst)
+                    idle.Add(template);
+            }
+
+            foreach (var template in idle)
+            {
+                _order.Remove(_buckets[template].Node);
+                _buckets.Remove(template);
+            }
+
+            return summaries;
+        }
+    }
+
+    private static LogSpamSuppressedEvent CreateSummary(string template, Bucket bucket, long now)
+    {
+        return new LogSpamSuppressedEvent
+        {
+            Template = template,
+            Sample = bucket.Sample,
+            Count = bucket.Suppressed,
+            Duration = TimeSpan.FromSeconds((double)(now - bucket.Since) / Stopwatch.Frequency)
+        };
+    }
+
+    private static long ToTicks(double seconds)
+    {
+        return (long)(Math.Max(0, seconds) * Stopwatch.Frequency);
+    }
+}
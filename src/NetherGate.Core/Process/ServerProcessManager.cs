@@ -31,6 +31,11 @@ public class ServerProcessManager : IDisposable
     public bool IsRunning => _isRunning && _process != null && !_process.HasExited;
     public int? ProcessId => _process?.Id;
 
+    /// <summary>
+    /// 日志解析器（可通过 GetMatcherStats 查看各日志匹配器的开销）
+    /// </summary>
+    public LogParser LogParser => _logParser;
+
     public ServerProcessManager(
         ServerProcessConfig config,
         ILogger logger,
@@ -40,7 +45,7 @@ public class ServerProcessManager : IDisposable
         _config = config;
         _logger = logger;
         _eventBus = eventBus;
-        _logParser = new LogParser(logger, eventBus);
+        _logParser = new LogParser(logger, eventBus, config.Monitoring.LogThrottle, config.Monitoring.LogMatcherStats);
         _sparkAgent = sparkAgent;
     }
 
@@ -590,6 +595,7 @@ _logger.Info("正在启动 Minecraft 服务器...");
 
             _inputWriter?.Dispose();
             _process?.Dispose();
+            _logParser.Dispose();
         }
         catch (Exception ex)
         {
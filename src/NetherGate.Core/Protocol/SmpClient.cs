@@ -2,6 +2,7 @@ using NetherGate.API.Configuration;
 using NetherGate.API.Events;
 using NetherGate.API.Logging;
 using NetherGate.API.Protocol;
+using System.Text.Json;
 
 namespace NetherGate.Core.Protocol;
 
@@ -208,6 +209,19 @@ public class SmpClient : ISmpApi, IDisposable
 
     // ========== ISmpApi 实现 ==========
 
+    public async Task<string?> InvokeJsonAsync(string method, string? parametersJson = null)
+    {
+        object? parameters = null;
+        if (parametersJson != null)
+        {
+            using var document = JsonDocument.Parse(parametersJson);
+            parameters = document.RootElement.Clone();
+        }
+
+        var result = await InvokeAsync<JsonElement?>(method, parameters);
+        return result?.GetRawText();
+    }
+
     #region 白名单管理
 
     public async Task<List<PlayerDto>> GetAllowlistAsync()
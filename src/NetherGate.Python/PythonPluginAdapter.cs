@@ -273,6 +273,7 @@ public class PythonPluginAdapter : IPlugin
             "event_bus" or "eventbus" => serviceProvider.GetService(typeof(API.Events.IEventBus)),
             "commands" or "command_registry" => serviceProvider.GetService(typeof(API.Protocol.IServerCommandExecutor)),
             "rcon" or "rcon_client" => serviceProvider.GetService(typeof(API.Protocol.IRconClient)),
+            "smp" or "smp_api" => serviceProvider.GetService(typeof(API.Protocol.ISmpApi)),
             "scheduler" => serviceProvider.GetService(typeof(API.Scheduling.IScheduler)),
             "config" or "config_manager" => null, // TODO: 实现配置管理器
             "scoreboard" or "scoreboard_manager" => serviceProvider.GetService(typeof(API.Scoreboard.IScoreboardApi)),
@@ -288,6 +289,15 @@ public class PythonPluginAdapter : IPlugin
     /// </summary>
     private PyObject ToPython(object obj)
     {
+        // SMP 服务包装为 Python SmpApi，插件可以直接 await invoke 和类型化方法
+        if (obj is API.Protocol.ISmpApi)
+        {
+            using var smpModule = Py.Import("nethergate.smp");
+            using var bridgedClass = smpModule.GetAttr("BridgedSmpApi");
+            using var service = obj.ToPython();
+            return bridgedClass.Invoke(service);
+        }
+
         // 使用 Python.NET 的自动转换
         return obj.ToPython();
     }
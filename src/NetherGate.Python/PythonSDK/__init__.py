@@ -10,24 +10,40 @@ __author__ = "NetherGate Team"
 from .plugin import Plugin, PluginInfo
 from .logging import Logger, LogLevel
 from .events import (
-    Event, EventBus,
+    Event, EventBus, LocalEventBus,
     ServerStartingEvent, ServerStartedEvent, ServerStoppingEvent, ServerStoppedEvent,
     PlayerJoinEvent, PlayerLeaveEvent, PlayerChatEvent, PlayerDeathEvent, PlayerAdvancementEvent,
     RconConnectedEvent, RconDisconnectedEvent,
-    WebSocketClientConnected, WebSocketClientDisconnected
+    WebSocketClientConnected, WebSocketClientDisconnected,
+    LogSpamSuppressedEvent
 )
 from .commands import CommandRegistry, CommandContext
-from .rcon import RconClient, RconResponse
+from .rcon import (
+    RconClient, RconResponse, PipelinedRconClient, RconConnectionPool,
+    PlayerList, ScoreResult, DataGetResult, parse_snbt, register_parser, parse_response
+)
+from .functionbatch import FunctionBatchRconClient
+from .rconcache import CachedRconClient, RconCacheStats
+from .rconpriority import PriorityRconClient, RconPriority, RconLaneStats
+from .rcongroup import RconGroup, RconGroupResult, RconGroupBatchResult
 from .scheduling import Scheduler
 from .config import ConfigManager
 from .smp import (
     SmpApi, PlayerDto, UserBanDto, IpBanDto, OperatorDto, 
-    ServerState, TypedRule
+    ServerState, TypedRule, SmpError, SmpBatch, BridgedSmpApi
 )
+from .smpclient import SmpClient
+from .smpsync import SmpSynchronizer, SmpSyncResult
+from .smpmirror import SmpMirror
+from .banindex import BanIndex
 from .logmatcher import (
-    ILogMatcher, RegexLogMatcher, ServerEvent,
+    ILogMatcher, RegexLogMatcher, ServerEvent, LogMatcherSet, MatcherStats, pattern_prefixes,
+    required_literals, LogLine, parse_log_line,
     PlayerJoinMatcher, PlayerLeaveMatcher, PlayerChatMatcher, ServerDoneMatcher
 )
+from .logreplay import LogReplayer, ReplayRecord, discover_logs
+from .logtail import LogTailer, TailingLogListener
+from .logthrottle import LogThrottle, ThrottleRule, log_template
 from .data import (
     PlayerDataReader, WorldDataReader,
     PlayerData, PlayerStats, PlayerAdvancements,
@@ -90,6 +106,7 @@ __all__ = [
     # Events
     'Event',
     'EventBus',
+    'LocalEventBus',
     'ServerStartingEvent',
     'ServerStartedEvent',
     'ServerStoppingEvent',
@@ -103,6 +120,7 @@ __all__ = [
     'RconDisconnectedEvent',
     'WebSocketClientConnected',
     'WebSocketClientDisconnected',
+    'LogSpamSuppressedEvent',
     
     # Commands
     'CommandRegistry',
@@ -111,6 +129,23 @@ __all__ = [
     # RCON
     'RconClient',
     'RconResponse',
+    'PipelinedRconClient',
+    'RconConnectionPool',
+    'PlayerList',
+    'ScoreResult',
+    'DataGetResult',
+    'parse_snbt',
+    'register_parser',
+    'parse_response',
+    'FunctionBatchRconClient',
+    'CachedRconClient',
+    'RconCacheStats',
+    'PriorityRconClient',
+    'RconPriority',
+    'RconLaneStats',
+    'RconGroup',
+    'RconGroupResult',
+    'RconGroupBatchResult',
     
     # Scheduling
     'Scheduler',
@@ -120,6 +155,14 @@ __all__ = [
     
     # SMP API
     'SmpApi',
+    'SmpClient',
+    'SmpBatch',
+    'BridgedSmpApi',
+    'SmpError',
+    'SmpSynchronizer',
+    'SmpSyncResult',
+    'SmpMirror',
+    'BanIndex',
     'PlayerDto',
     'UserBanDto',
     'IpBanDto',
@@ -131,6 +174,20 @@ __all__ = [
     'ILogMatcher',
     'RegexLogMatcher',
     'ServerEvent',
+    'LogMatcherSet',
+    'MatcherStats',
+    'pattern_prefixes',
+    'required_literals',
+    'LogLine',
+    'parse_log_line',
+    'LogReplayer',
+    'ReplayRecord',
+    'discover_logs',
+    'LogTailer',
+    'TailingLogListener',
+    'LogThrottle',
+    'ThrottleRule',
+    'log_template',
     'PlayerJoinMatcher',
     'PlayerLeaveMatcher',
     'PlayerChatMatcher',
@@ -0,0 +1,77 @@
+"""
+SMP 条目公共工具
+
+SMP 列表同步、镜像和封禁索引共用的玩家比较键、双索引集合和通知参数解析
+"""
+
+from typing import Any, Dict, Generic, Iterable, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+def player_key(uuid: str, name: str) -> str:
+    """玩家条目的比较键：优先使用 UUID，缺失时使用小写名称"""
+    return uuid.lower() if uuid else name.lower()
+
+
+class PlayerIndex(Generic[T]):
+    """按 UUID 和小写名称双索引的玩家条目集合"""
+    
+    __slots__ = ("_entries", "_names")
+    
+    def __init__(self):
+        self._entries: Dict[str, T] = {}
+        self._names: Dict[str, str] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def values(self) -> List[T]:
+        return list(self._entries.values())
+    
+    def get(self, player: str) -> Optional[T]:
+        """按 UUID 或名称（不区分大小写）查找"""
+        lowered = player.lower()
+        entry = self._entries.get(lowered)
+        if entry is None:
+            key = self._names.get(lowered)
+            if key is not None:
+                entry = self._entries.get(key)
+        return entry
+    
+    def add(self, entry: T):
+        key = player_key(entry.uuid, entry.name)
+        self._entries[key] = entry
+        if entry.name:
+            self._names[entry.name.lower()] = key
+    
+    def remove(self, uuid: str, name: str):
+        key = player_key(uuid, name)
+        if key not in self._entries and name:
+            key = self._names.get(name.lower(), key)
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry.name:
+            self._names.pop(entry.name.lower(), None)
+    
+    def replace(self, entries: Iterable[T]):
+        self._entries.clear()
+        self._names.clear()
+        for entry in entries:
+            self.add(entry)
+
+
+def notification_entries(params: Any) -> List[Any]:
+    """把通知参数统一为条目列表（兼容单个对象、对象列表和按位置参数包装的列表）"""
+    if params is None:
+        return []
+    if isinstance(params, list):
+        if len(params) == 1 and isinstance(params[0], list):
+            return params[0]
+        return params
+    return [params]
+
+
+def to_dto(dto_type, entry: Any):
+    """JSON 对象转换为 DTO，已经是 DTO 时原样返回"""
+    return dto_type.from_dict(entry) if isinstance(entry, dict) else entry
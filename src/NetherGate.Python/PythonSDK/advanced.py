@@ -7,7 +7,8 @@
 from typing import List, Dict, Optional, Any, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
-from .data import Position, ItemStack
+from .data import ItemStack
+from .gameutils import Position
 
 
 # ========== NBT 数据写入 ==========
@@ -0,0 +1,562 @@
+"""
+封禁索引
+
+IPv4/IPv6 前缀树上的 IP 封禁查询（支持 CIDR 网段封禁），以及按过期时间自动解除临时封禁
+"""
+
+import asyncio
+import heapq
+import ipaddress
+import itertools
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .smp import SmpApi, PlayerDto, UserBanDto, IpBanDto
+from ._smpentries import PlayerIndex, notification_entries, to_dto
+
+
+IpNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_expires(expires: Optional[str]) -> Optional[float]:
+    """
+    解析封禁过期时间
+    
+    支持 ISO 8601（"2025-01-01T00:00:00Z"）和原版封禁列表格式
+    （"2025-01-01 00:00:00 +0000"）；没有时区的时间按 UTC 处理
+    
+    Args:
+        expires: 过期时间文本，None、空字符串或 "forever" 表示永久
+        
+    Returns:
+        过期时间的 Unix 时间戳，永久封禁为 None
+        
+    Raises:
+        ValueError: 无法识别的时间格式
+    """
+    if not expires or expires == "forever":
+        return None
+    if not isinstance(expires, str):
+        raise ValueError(f"无法识别的过期时间: {expires!r}")
+    text = expires.strip()
+    try:
+        moment = datetime.fromisoformat(text[:-1] + "+00:00" if text.endswith("Z") else text)
+    except ValueError:
+        moment = datetime.strptime(text, "%Y-%m-%d %H:%M:%S %z")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def parse_network(ip: str) -> IpNetwork:
+    """
+    解析 IP 地址或 CIDR 网段
+    
+    主机位不为零的网段会被截断（"10.1.2.3/8" 视为 "10.0.0.0/8"），
+    IPv4 映射的 IPv6 地址（::ffff:1.2.3.4）按 IPv4 处理
+    
+    Raises:
+        ValueError: 不是合法的地址或网段
+    """
+    if not isinstance(ip, str):
+        raise ValueError(f"不是合法的地址或网段: {ip!r}")
+    network = ipaddress.ip_network(ip.strip(), strict=False)
+    if network.version == 6 and network.prefixlen >= 96:
+        mapped = network.network_address.ipv4_mapped
+        if mapped is not None:
+            network = ipaddress.ip_network(f"{mapped}/{network.prefixlen - 96}")
+    return network
+
+
+def _parse_address(ip: str) -> Optional[Tuple[int, int]]:
+    """快速解析单个地址为 (版本, 整数)，查询路径上使用 inet_pton 代替 ipaddress"""
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+    except OSError:
+        pass
+    try:
+        value = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), "big")
+    except OSError:
+        return None
+    if value >> 32 == 0xFFFF:
+        return 4, value & 0xFFFFFFFF
+    return 6, value
+
+
+class _PrefixTree:
+    """
+    二进制前缀树（基数为 2 的基数树）
+    
+    每个节点为 [子节点 0, 子节点 1, 值]，插入和查询都只沿前缀位向下走，
+    复杂度为 O(前缀长度)，与已封禁的条目数量无关
+    """
+    
+    __slots__ = ("_bits", "_root", "_size")
+    
+    def __init__(self, bits: int):
+        self._bits = bits
+        self._root: list = [None, None, None]
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def insert(self, network: int, length: int, value: Any):
+        node = self._root
+        shift = self._bits - 1
+        for _ in range(length):
+            bit = (network >> shift) & 1
+            child = node[bit]
+            if child is None:
+                child = node[bit] = [None, None, None]
+            node = child
+            shift -= 1
+        if node[2] is None:
+            self._size += 1
+        node[2] = value
+    
+    def get(self, network: int, length: int) -> Any:
+        node = self._root
+        shift = self._bits - 1
+        for _ in range(length):
+            node = node[(network >> shift) & 1]
+            if node is None:
+                return None
+            shift -= 1
+        return node[2]
+    
+    def remove(self, network: int, length: int) -> Any:
+        """删除前缀上的值并回收空节点，返回被删除的值"""
+        path: List[Tuple[list, int]] = []
+        node = self._root
+        shift = self._bits - 1
+        for _ in range(length):
+            bit = (network >> shift) & 1
+            child = node[bit]
+            if child is None:
+                return None
+            path.append((node, bit))
+            node = child
+            shift -= 1
+        value = node[2]
+        if value is None:
+            return None
+        node[2] = None
+        self._size -= 1
+        for parent, bit in reversed(path):
+            child = parent[bit]
+            if child[0] is not None or child[1] is not None or child[2] is not None:
+                break
+            parent[bit] = None
+        return value
+    
+    def matches(self, address: int) -> List[Any]:
+        """返回覆盖该地址的所有值，从最短前缀到最长前缀"""
+        found: List[Any] = []
+        node = self._root
+        shift = self._bits - 1
+        while node is not None:
+            if node[2] is not None:
+                found.append(node[2])
+            if shift < 0:
+                break
+            node = node[(address >> shift) & 1]
+            shift -= 1
+        return found
+    
+    def clear(self):
+        self._root = [None, None, None]
+        self._size = 0
+
+
+class _IpBanEntry:
+    __slots__ = ("ban", "network", "expires_at")
+    
+    def __init__(self, ban: IpBanDto, network: IpNetwork, expires_at: Optional[float]):
+        self.ban = ban
+        self.network = network
+        self.expires_at = expires_at
+
+
+class _UserBanEntry:
+    __slots__ = ("ban", "expires_at", "uuid", "name")
+    
+    def __init__(self, ban: UserBanDto, expires_at: Optional[float]):
+        self.ban = ban
+        self.expires_at = expires_at
+        self.uuid = ban.uuid
+        self.name = ban.name
+
+
+class BanIndex:
+    """
+    封禁索引
+    
+    IP 封禁按网段存入 IPv4/IPv6 两棵前缀树，IpBanDto.ip 既可以是单个地址，
+    也可以是 "10.0.0.0/8"、"2001:db8::/32" 这样的网段。
+    find_ip_ban() 沿前缀树向下查找覆盖该地址的最具体的有效封禁。
+    
+    带过期时间的玩家封禁和 IP 封禁进入一个按过期时间排序的最小堆，
+    start() 启动的后台任务只在堆顶封禁到期时醒来，将其从索引中移除，
+    并在 lift_expired=True 时通过 SmpApi 从服务器上解除；不会周期性地扫描整个列表。
+    查询时也会检查过期时间，因此即使未启动后台任务，已过期的封禁也不会生效。
+    
+    加载列表或收到通知时，ip 或 expires 格式错误的条目会被跳过并交给 on_invalid，不影响其他封禁。
+    
+    Example:
+        >>> bans = BanIndex(self.smp)
+        >>> await bans.load()
+        >>> bans.start()
+        >>> ban = bans.find_ip_ban(address)
+        >>> if ban is not None:
+        ...     await self.smp.kick_player(name, ban.reason)
+    """
+    
+    def __init__(
+        self,
+        smp: Optional[SmpApi] = None,
+        lift_expired: bool = True,
+        on_expired: Optional[Callable[[Union[UserBanDto, IpBanDto]], Any]] = None,
+        on_invalid: Optional[Callable[[Union[UserBanDto, IpBanDto], ValueError], None]] = None
+    ):
+        """
+        构造函数
+        
+        Args:
+            smp: SMP API；为 None 时只作为本地索引使用
+            lift_expired: 临时封禁到期时是否在服务器上解除
+            on_expired: 临时封禁到期时的回调
+            on_invalid: 跳过格式错误的封禁时的回调，参数为 (封禁, 异常)
+        """
+        self._smp = smp
+        self._lift_expired = lift_expired
+        self._on_expired = on_expired
+        self._on_invalid = on_invalid
+        self._v4 = _PrefixTree(32)
+        self._v6 = _PrefixTree(128)
+        self._bans: PlayerIndex[_UserBanEntry] = PlayerIndex()
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._handlers: Dict[str, Callable[[Any], None]] = {}
+    
+    @property
+    def ip_ban_count(self) -> int:
+        """IP 封禁（含网段）数量"""
+        return len(self._v4) + len(self._v6)
+    
+    @property
+    def ban_count(self) -> int:
+        """玩家封禁数量"""
+        return len(self._bans)
+    
+    @property
+    def next_expiry(self) -> Optional[float]:
+        """最近一个临时封禁的过期时间戳"""
+        while self._heap and not self._is_current(self._heap[0][2]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+    
+    # ========== 加载与同步 ==========
+    
+    async def load(self):
+        """
+        从服务器读取封禁列表，并订阅封禁相关通知以保持索引最新
+        
+        Raises:
+            RuntimeError: 未提供 SmpApi
+        """
+        if self._smp is None:
+            raise RuntimeError("BanIndex 未关联 SmpApi")
+        if not self._handlers:
+            for method in ("bans/added", "bans/removed", "bans/set", "bans/cleared",
+                           "ip_bans/added", "ip_bans/removed", "ip_bans/set", "ip_bans/cleared"):
+                handler = self._make_handler(method)
+                self._handlers[method] = handler
+                self._smp.on_notification(method, handler)
+        bans, ip_bans = await asyncio.gather(self._smp.get_bans(), self._smp.get_ip_bans())
+        self.replace(bans or [], ip_bans or [])
+    
+    def replace(
+        self,
+        bans: List[UserBanDto],
+        ip_bans: List[IpBanDto]
+    ) -> List[Tuple[Union[UserBanDto, IpBanDto], ValueError]]:
+        """
+        用完整列表替换索引内容
+        
+        格式错误的条目被跳过并交给 on_invalid，其余封禁照常生效
+        
+        Returns:
+            被跳过的 (封禁, 异常)
+        """
+        self._v4.clear()
+        self._v6.clear()
+        self._bans.replace([])
+        self._heap.clear()
+        rejected: List[Tuple[Union[UserBanDto, IpBanDto], ValueError]] = []
+        for ban in bans:
+            try:
+                self.add_ban(ban)
+            except ValueError as ex:
+                rejected.append((ban, ex))
+                self._report_invalid(ban, ex)
+        for ban in ip_bans:
+            try:
+                self.add_ip_ban(ban)
+            except ValueError as ex:
+                rejected.append((ban, ex))
+                self._report_invalid(ban, ex)
+        return rejected
+    
+    def start(self):
+        """启动到期解除任务"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._expiry_loop())
+    
+    async def stop(self):
+        """停止到期解除任务并取消通知订阅"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._smp is not None:
+            for method, handler in self._handlers.items():
+                self._smp.off_notification(method, handler)
+        self._handlers.clear()
+    
+    # ========== 修改 ==========
+    
+    def add_ip_ban(self, ban: IpBanDto):
+        """
+        添加或替换 IP 封禁
+        
+        Raises:
+            ValueError: ban.ip 不是合法的地址或网段，或 ban.expires 不是可识别的时间格式
+        """
+        network = parse_network(ban.ip)
+        entry = _IpBanEntry(ban, network, parse_expires(ban.expires))
+        tree = self._v4 if network.version == 4 else self._v6
+        tree.insert(int(network.network_address), network.prefixlen, entry)
+        self._schedule(entry)
+    
+    def remove_ip_ban(self, ip: str) -> Optional[IpBanDto]:
+        """
+        移除 IP 封禁（地址或网段需与封禁时一致）
+        
+        Returns:
+            被移除的封禁，不存在时为 None
+        """
+        try:
+            network = parse_network(ip)
+        except ValueError:
+            return None
+        tree = self._v4 if network.version == 4 else self._v6
+        entry = tree.remove(int(network.network_address), network.prefixlen)
+        return entry.ban if entry is not None else None
+    
+    def add_ban(self, ban: UserBanDto):
+        """
+        添加或替换玩家封禁
+        
+        Raises:
+            ValueError: ban.expires 不是可识别的时间格式
+        """
+        entry = _UserBanEntry(ban, parse_expires(ban.expires))
+        self._bans.add(entry)
+        self._schedule(entry)
+    
+    def remove_ban(self, player: Union[PlayerDto, UserBanDto]) -> Optional[UserBanDto]:
+        """
+        移除玩家封禁
+        
+        Returns:
+            被移除的封禁，不存在时为 None
+        """
+        entry = self._bans.get(player.uuid or player.name)
+        if entry is None:
+            return None
+        self._bans.remove(entry.uuid, entry.name)
+        return entry.ban
+    
+    # ========== 查询 ==========
+    
+    def find_ip_ban(self, ip: str, now: Optional[float] = None) -> Optional[IpBanDto]:
+        """
+        查找覆盖该地址的最具体的有效 IP 封禁
+        
+        Args:
+            ip: 连接地址（IPv4、IPv6 或 IPv4 映射的 IPv6）
+            now: 判断过期使用的时间戳，默认为当前时间
+            
+        Returns:
+            匹配的封禁，未被封禁或地址无效时为 None
+        """
+        address = _parse_address(ip.strip())
+        if address is None:
+            return None
+        version, value = address
+        tree = self._v4 if version == 4 else self._v6
+        now = time.time() if now is None else now
+        for entry in reversed(tree.matches(value)):
+            if entry.expires_at is None or entry.expires_at > now:
+                return entry.ban
+        return None
+    
+    def is_ip_banned(self, ip: str) -> bool:
+        """地址是否被（精确或按网段）封禁"""
+        return self.find_ip_ban(ip) is not None
+    
+    def get_ip_ban(self, ip: str) -> Optional[IpBanDto]:
+        """按封禁时的地址或网段精确获取 IP 封禁"""
+        try:
+            network = parse_network(ip)
+        except ValueError:
+            return None
+        tree = self._v4 if network.version == 4 else self._v6
+        entry = tree.get(int(network.network_address), network.prefixlen)
+        return entry.ban if entry is not None else None
+    
+    def find_ban(self, player: str, now: Optional[float] = None) -> Optional[UserBanDto]:
+        """
+        查找玩家（UUID 或名称）的有效封禁
+        
+        Returns:
+            封禁信息，未被封禁或已过期时为 None
+        """
+        entry = self._bans.get(player)
+        if entry is None:
+            return None
+        now = time.time() if now is None else now
+        if entry.expires_at is not None and entry.expires_at <= now:
+            return None
+        return entry.ban
+    
+    def is_banned(self, player: str) -> bool:
+        """玩家（UUID 或名称）是否被封禁"""
+        return self.find_ban(player) is not None
+    
+    def _report_invalid(self, ban: Any, ex: ValueError):
+        if self._on_invalid is not None:
+            try:
+                self._on_invalid(ban, ex)
+            except Exception:
+                pass
+    
+    # ========== 到期处理 ==========
+    
+    def expire(self, now: Optional[float] = None) -> List[Union[UserBanDto, IpBanDto]]:
+        """
+        从索引中移除所有已到期的临时封禁
+        
+        只弹出堆顶已到期的条目，复杂度为 O(k log n)，k 为到期数量
+        
+        Returns:
+            被移除的封禁
+        """
+        now = time.time() if now is None else now
+        expired: List[Union[UserBanDto, IpBanDto]] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, _, entry = heapq.heappop(heap)
+            if not self._is_current(entry):
+                continue
+            if isinstance(entry, _IpBanEntry):
+                network = entry.network
+                tree = self._v4 if network.version == 4 else self._v6
+                tree.remove(int(network.network_address), network.prefixlen)
+            else:
+                self._bans.remove(entry.uuid, entry.name)
+            expired.append(entry.ban)
+        return expired
+    
+    def _schedule(self, entry):
+        if entry.expires_at is None:
+            return
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (entry.expires_at, next(self._sequence), entry))
+        if self._wakeup is not None and (earliest is None or entry.expires_at < earliest):
+            self._wakeup.set()
+    
+    def _is_current(self, entry) -> bool:
+        """堆中的条目是否仍在索引中（被替换或移除的条目延迟删除）"""
+        if isinstance(entry, _IpBanEntry):
+            network = entry.network
+            tree = self._v4 if network.version == 4 else self._v6
+            return tree.get(int(network.network_address), network.prefixlen) is entry
+        return self._bans.get(entry.uuid or entry.name) is entry
+    
+    async def _expiry_loop(self):
+        """睡眠到堆顶封禁到期，或被更早的新封禁唤醒"""
+        while True:
+            self._wakeup.clear()
+            expiry = self.next_expiry
+            delay = None if expiry is None else max(0.0, expiry - time.time())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+                continue
+            except asyncio.TimeoutError:
+                pass
+            for ban in self.expire():
+                await self._lift(ban)
+    
+    async def _lift(self, ban: Union[UserBanDto, IpBanDto]):
+        if self._on_expired is not None:
+            try:
+                result = self._on_expired(ban)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                pass
+        if self._smp is None or not self._lift_expired:
+            return
+        try:
+            if isinstance(ban, IpBanDto):
+                await self._smp.remove_ip_ban(ban.ip)
+            else:
+                await self._smp.remove_ban(PlayerDto(uuid=ban.uuid, name=ban.name))
+        except Exception:
+            # 解除失败时服务器仍会在玩家登录时自行忽略过期封禁
+            pass
+    
+    # ========== 通知处理 ==========
+    
+    def _make_handler(self, method: str) -> Callable[[Any], None]:
+        family, _, action = method.partition("/")
+        
+        def handler(params: Any):
+            if action in ("set", "cleared"):
+                if family == "bans":
+                    self._bans.replace([])
+                else:
+                    self._v4.clear()
+                    self._v6.clear()
+            for entry in notification_entries(params):
+                ban = entry
+                try:
+                    if family == "ip_bans":
+                        if action == "removed":
+                            ip = entry if isinstance(entry, str) else (
+                                entry.get("ip") if isinstance(entry, dict) else entry.ip
+                            )
+                            self.remove_ip_ban(ip)
+                        elif action in ("added", "set"):
+                            ban = to_dto(IpBanDto, entry)
+                            self.add_ip_ban(ban)
+                    elif action == "removed":
+                        if isinstance(entry, dict):
+                            entry = PlayerDto.from_dict(entry.get("player") or entry)
+                        self.remove_ban(entry)
+                    elif action in ("added", "set"):
+                        ban = to_dto(UserBanDto, entry)
+                        self.add_ban(ban)
+                except ValueError as ex:
+                    self._report_invalid(ban, ex)
+        return handler
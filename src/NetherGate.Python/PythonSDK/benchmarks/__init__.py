@@ -0,0 +1,7 @@
+"""
+基准测试
+
+使用 python -m 运行各基准测试模块，例如::
+
+    python -m nethergate.benchmarks.rcon_benchmark --help
+"""
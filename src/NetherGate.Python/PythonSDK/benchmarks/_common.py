@@ -0,0 +1,67 @@
+"""
+基准测试公共工具
+
+RCON 与 SMP 基准测试共用的结果类型、计时和表格输出。
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List
+
+
+@dataclass
+class BenchmarkResult:
+    """单个场景的测量结果"""
+    name: str
+    commands: int
+    calls: int
+    elapsed: float
+    p50: float
+    p99: float
+    failures: int = 0
+    
+    @property
+    def commands_per_second(self) -> float:
+        """每秒完成的命令数"""
+        return self.commands / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """计算样本的分位数（最近秩法）"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def timed(latencies: List[float], call: Callable[[], Awaitable]):
+    """执行一次调用并记录耗时"""
+    start = time.perf_counter()
+    result = await call()
+    latencies.append(time.perf_counter() - start)
+    return result
+
+
+def make_result(name: str, commands: int, latencies: List[float], elapsed: float, failures: int) -> BenchmarkResult:
+    """根据单次调用耗时生成场景结果"""
+    return BenchmarkResult(
+        name=name,
+        commands=commands,
+        calls=len(latencies),
+        elapsed=elapsed,
+        p50=percentile(latencies, 0.50),
+        p99=percentile(latencies, 0.99),
+        failures=failures
+    )
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """格式化结果表格"""
+    lines = [f"{'scenario':<24}{'cmds':>8}{'calls':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'cmd/s':>12}{'fail':>6}"]
+    for result in results:
+        lines.append(
+            f"{result.name:<24}{result.commands:>8}{result.calls:>8}"
+            f"{result.p50 * 1000:>10.3f}{result.p99 * 1000:>10.3f}"
+            f"{result.commands_per_second:>12.1f}{result.failures:>6}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,150 @@
+"""
+事件对象构造开销基准测试
+
+对比重构前的事件实现（实例字典 + 构造时 datetime.now()）与当前的
+__slots__ + 惰性时间戳实现，输出每个事件的构造耗时和内存占用。
+
+各场景先预热一轮，然后交替执行 --repeat 轮（每轮轮换场景顺序），取每个场景的最小耗时，
+避免先执行的场景承担预热和频率调节的开销::
+
+    python -m nethergate.benchmarks.event_benchmark --count 200000 --repeat 7
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from ..events import LocalEventBus, PlayerChatEvent
+
+
+class _LegacyEvent:
+    """重构前的事件基类"""
+    
+    def __init__(self):
+        self.timestamp = datetime.now()
+
+
+class _LegacyChatEvent(_LegacyEvent):
+    """重构前的 PlayerChatEvent"""
+    
+    def __init__(self, player_name: str, message: str):
+        super().__init__()
+        self.player_name = player_name
+        self.message = message
+        self._cancelled = False
+
+
+@dataclass
+class EventBenchmarkResult:
+    """单个场景的测量结果"""
+    name: str
+    count: int
+    elapsed: float
+    bytes_per_event: Optional[float] = None
+    
+    @property
+    def ns_per_event(self) -> float:
+        """每个事件的耗时（纳秒）"""
+        return self.elapsed / self.count * 1e9 if self.count else 0.0
+
+
+def _measure(scenarios: List[Tuple[str, Callable[[int], None]]], count: int, repeat: int) -> List[EventBenchmarkResult]:
+    """预热后交替执行各场景 repeat 轮，每个场景取最小耗时"""
+    for _, body in scenarios:
+        body(min(count, 10000))
+    best = [float("inf")] * len(scenarios)
+    for round_ in range(repeat):
+        for offset in range(len(scenarios)):
+            index = (round_ + offset) % len(scenarios)
+            start = time.perf_counter()
+            scenarios[index][1](count)
+            best[index] = min(best[index], time.perf_counter() - start)
+    return [EventBenchmarkResult(name, count, elapsed) for (name, _), elapsed in zip(scenarios, best)]
+
+
+def _memory(factory: Callable[[], object], count: int) -> float:
+    """保留 count 个事件时每个事件占用的字节数"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        events = [factory() for _ in range(count)]
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del events
+    return used / count
+
+
+def bench_construct(count: int, repeat: int = 5) -> List[EventBenchmarkResult]:
+    """构造事件，以及构造后访问 timestamp"""
+    
+    def legacy(n: int):
+        for _ in range(n):
+            _LegacyChatEvent("Steve", "hello")
+    
+    def slotted(n: int):
+        for _ in range(n):
+            PlayerChatEvent("Steve", "hello")
+    
+    def legacy_timestamp(n: int):
+        for _ in range(n):
+            _LegacyChatEvent("Steve", "hello").timestamp
+    
+    def slotted_timestamp(n: int):
+        for _ in range(n):
+            PlayerChatEvent("Steve", "hello").timestamp
+    
+    memory_count = min(count, 100000)
+    results = _measure([
+        ("legacy construct", legacy),
+        ("slotted construct", slotted),
+        ("legacy + timestamp", legacy_timestamp),
+        ("slotted + timestamp", slotted_timestamp),
+    ], count, repeat)
+    results[0].bytes_per_event = _memory(lambda: _LegacyChatEvent("Steve", "hello"), memory_count)
+    results[1].bytes_per_event = _memory(lambda: PlayerChatEvent("Steve", "hello"), memory_count)
+    return results
+
+
+async def bench_publish(count: int, repeat: int = 5) -> EventBenchmarkResult:
+    """构造事件并通过 LocalEventBus 发布给一个同步处理函数（预热后取 repeat 轮的最小耗时）"""
+    bus = LocalEventBus()
+    bus.subscribe(PlayerChatEvent, lambda event: None)
+    best = float("inf")
+    for round_ in range(repeat + 1):
+        n = min(count, 10000) if round_ == 0 else count
+        start = time.perf_counter()
+        for _ in range(n):
+            await bus.publish(PlayerChatEvent("Steve", "hello"))
+        if round_:
+            best = min(best, time.perf_counter() - start)
+    return EventBenchmarkResult("construct + publish", count, best)
+
+
+def format_results(results: List[EventBenchmarkResult]) -> str:
+    """格式化结果表格"""
+    lines = [f"{'scenario':<24}{'events':>10}{'ns/event':>12}{'bytes/event':>14}"]
+    for result in results:
+        memory = f"{result.bytes_per_event:.0f}" if result.bytes_per_event is not None else "-"
+        lines.append(f"{result.name:<24}{result.count:>10}{result.ns_per_event:>12.1f}{memory:>14}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="事件对象构造开销基准测试")
+    parser.add_argument("--count", type=int, default=200000, help="每个场景每轮构造的事件数")
+    parser.add_argument("--repeat", type=int, default=5, help="每个场景执行的轮数（取最小耗时）")
+    args = parser.parse_args(argv)
+    
+    repeat = max(1, args.repeat)
+    results = bench_construct(args.count, repeat)
+    results.append(asyncio.run(bench_publish(args.count, repeat)))
+    print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
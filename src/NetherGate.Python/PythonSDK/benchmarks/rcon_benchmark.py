@@ -0,0 +1,115 @@
+"""
+RCON 吞吐量/延迟基准测试
+
+默认连接本地 RCON 替身服务器，也可以通过 --host 指向真实服务器。
+分别测量 execute（顺序）、execute_batch 和多个并发调用者三种场景，
+输出每次调用的 p50/p99 延迟和每秒命令数::
+
+    python -m nethergate.benchmarks.rcon_benchmark --commands 2000 --latency 0.0005
+    python -m nethergate.benchmarks.rcon_benchmark --client pool --pool-size 4
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+from ..rcon import RconClient, PipelinedRconClient, RconConnectionPool
+from ..testing.rcon_server import FakeRconServer
+from ._common import BenchmarkResult, format_results, make_result, timed
+
+
+async def bench_execute(rcon: RconClient, commands: List[str]) -> BenchmarkResult:
+    """逐条 await execute"""
+    latencies: List[float] = []
+    failures = 0
+    start = time.perf_counter()
+    for command in commands:
+        response = await timed(latencies, lambda: rcon.execute(command))
+        failures += not response.success
+    return make_result("execute", len(commands), latencies, time.perf_counter() - start, failures)
+
+
+async def bench_batch(rcon: RconClient, commands: List[str], batch_size: int) -> BenchmarkResult:
+    """按 batch_size 分批调用 execute_batch（延迟按批次统计）"""
+    latencies: List[float] = []
+    failures = 0
+    start = time.perf_counter()
+    for offset in range(0, len(commands), batch_size):
+        batch = commands[offset:offset + batch_size]
+        responses = await timed(latencies, lambda: rcon.execute_batch(batch))
+        failures += sum(1 for response in responses if not response.success)
+    return make_result(f"execute_batch({batch_size})", len(commands), latencies, time.perf_counter() - start, failures)
+
+
+async def bench_concurrent(rcon: RconClient, commands: List[str], concurrency: int) -> BenchmarkResult:
+    """concurrency 个调用者并发地逐条调用 execute"""
+    latencies: List[float] = []
+    failures = 0
+    
+    async def caller(part: List[str]):
+        nonlocal failures
+        for command in part:
+            response = await timed(latencies, lambda: rcon.execute(command))
+            failures += not response.success
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(commands[i::concurrency]) for i in range(concurrency)))
+    return make_result(f"concurrent({concurrency})", len(commands), latencies, time.perf_counter() - start, failures)
+
+
+def _create_client(args, host: str, port: int, password: str) -> RconClient:
+    if args.client == "pool":
+        return RconConnectionPool(host, port, password, size=args.pool_size, health_check_interval=0)
+    return PipelinedRconClient(host, port, password)
+
+
+async def run(args) -> List[BenchmarkResult]:
+    """按命令行参数运行全部场景"""
+    server: Optional[FakeRconServer] = None
+    host, port, password = args.host, args.port, args.password
+    if host is None:
+        server = FakeRconServer(
+            password=password,
+            latency=args.latency,
+            serialize=not args.parallel_server
+        )
+        server.set_response("say", "")
+        await server.start()
+        host, port = server.host, server.port
+    
+    rcon = _create_client(args, host, port, password)
+    try:
+        await rcon.connect()
+        commands = [f"{args.command} {i}" for i in range(args.commands)]
+        return [
+            await bench_execute(rcon, commands),
+            await bench_batch(rcon, commands, args.batch_size),
+            await bench_concurrent(rcon, commands, args.concurrency),
+        ]
+    finally:
+        await rcon.disconnect()
+        if server is not None:
+            await server.stop()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="RCON 吞吐量/延迟基准测试")
+    parser.add_argument("--host", default=None, help="真实服务器地址（默认启动本地替身服务器）")
+    parser.add_argument("--port", type=int, default=25575)
+    parser.add_argument("--password", default="nethergate")
+    parser.add_argument("--client", choices=("pipelined", "pool"), default="pipelined")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--commands", type=int, default=1000, help="每个场景发送的命令数")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--command", default="say bench", help="命令前缀，后面追加序号")
+    parser.add_argument("--latency", type=float, default=0.0, help="替身服务器每条命令的延迟（秒）")
+    parser.add_argument("--parallel-server", action="store_true", help="替身服务器并行执行不同连接的命令")
+    args = parser.parse_args(argv)
+    
+    print(format_results(asyncio.run(run(args))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+SMP 吞吐量/镜像延迟基准测试
+
+默认连接本地 SMP 替身服务器，也可以通过 --host 指向真实服务器（会修改其白名单）。
+在 --list-size 条目的白名单上分别测量完整列表读取、逐条/并发/批量写入、
+增量同步，以及写入后 SmpMirror 通过通知反映变化的延迟::
+
+    python -m nethergate.benchmarks.smp_benchmark --list-size 20000 --latency 0.0005
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+from ..smp import SmpApi, SmpError, PlayerDto
+from ..smpclient import SmpClient
+from ..smpmirror import SmpMirror
+from ..smpsync import SmpSynchronizer
+from ..testing.smp_server import FakeSmpServer
+from ._common import BenchmarkResult, format_results, make_result, timed
+
+
+def _players(prefix: str, count: int, start: int = 0) -> List[PlayerDto]:
+    return [PlayerDto(**FakeSmpServer.make_player(f"{prefix}{i}")) for i in range(start, start + count)]
+
+
+async def _attempt(latencies: List[float], call) -> bool:
+    """执行一次写入，返回是否失败"""
+    try:
+        await timed(latencies, call)
+    except (SmpError, ConnectionError, asyncio.TimeoutError):
+        return True
+    return False
+
+
+async def bench_get_list(smp: SmpApi, calls: int) -> BenchmarkResult:
+    """完整读取白名单（单次响应携带整个列表）"""
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(calls):
+        await timed(latencies, smp.get_allowlist)
+    return make_result("get_allowlist", calls, latencies, time.perf_counter() - start, 0)
+
+
+async def bench_sequential(smp: SmpApi, players: List[PlayerDto]) -> BenchmarkResult:
+    """逐条 await add_to_allowlist"""
+    latencies: List[float] = []
+    failures = 0
+    start = time.perf_counter()
+    for player in players:
+        failures += await _attempt(latencies, lambda: smp.add_to_allowlist(player))
+    return make_result("add_to_allowlist", len(players), latencies, time.perf_counter() - start, failures)
+
+
+async def bench_concurrent(smp: SmpApi, players: List[PlayerDto], concurrency: int) -> BenchmarkResult:
+    """concurrency 个调用者并发地逐条调用 remove_from_allowlist"""
+    latencies: List[float] = []
+    failures = 0
+    
+    async def caller(part: List[PlayerDto]):
+        nonlocal failures
+        for player in part:
+            failures += await _attempt(latencies, lambda: smp.remove_from_allowlist(player))
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(players[i::concurrency]) for i in range(concurrency)))
+    return make_result(f"concurrent({concurrency})", len(players), latencies, time.perf_counter() - start, failures)
+
+
+async def bench_batch(smp: SmpApi, players: List[PlayerDto], batch_size: int) -> BenchmarkResult:
+    """按 batch_size 把单条写入合并为 JSON-RPC 批量请求（延迟按批次统计）"""
+    latencies: List[float] = []
+    failures = 0
+    
+    async def flush(chunk: List[PlayerDto]):
+        nonlocal failures
+        async with smp.batch() as batch:
+            futures = [batch.add_to_allowlist(player) for player in chunk]
+        failures += sum(1 for future in futures if future.exception() is not None)
+    
+    start = time.perf_counter()
+    for offset in range(0, len(players), batch_size):
+        await timed(latencies, lambda: flush(players[offset:offset + batch_size]))
+    return make_result(f"batch({batch_size})", len(players), latencies, time.perf_counter() - start, failures)
+
+
+async def bench_sync(smp: SmpApi, list_size: int, churn: int, chunk_size: int) -> BenchmarkResult:
+    """SmpSynchronizer 在完整列表上替换 churn 个条目（commands 为实际请求数）"""
+    sync = SmpSynchronizer(smp, chunk_size=chunk_size)
+    await sync.refresh("allowlist")
+    desired = _players("player", list_size - churn, churn) + _players("synced", churn)
+    start = time.perf_counter()
+    result = await sync.sync_allowlist(desired)
+    elapsed = time.perf_counter() - start
+    return make_result(f"sync(churn={churn})", result.requests, [elapsed], elapsed, 0)
+
+
+async def bench_mirror_lag(smp: SmpApi, writer: SmpApi, players: List[PlayerDto]) -> BenchmarkResult:
+    """另一个连接写入后，SmpMirror 通过通知反映变化的延迟（含写入本身的往返）"""
+    mirror = SmpMirror(smp)
+    load_start = time.perf_counter()
+    await mirror.load()
+    load = time.perf_counter() - load_start
+    
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for player in players:
+        begin = time.perf_counter()
+        await writer.add_to_allowlist(player)
+        while not mirror.is_allowlisted(player.uuid):
+            await asyncio.sleep(0)
+        latencies.append(time.perf_counter() - begin)
+    result = make_result(f"mirror_lag(load={load * 1000:.0f}ms)", len(players), latencies, time.perf_counter() - start, 0)
+    mirror.close()
+    return result
+
+
+async def run(args) -> List[BenchmarkResult]:
+    """按命令行参数运行全部场景"""
+    server: Optional[FakeSmpServer] = None
+    host, port, secret = args.host, args.port, args.secret
+    if host is None:
+        server = FakeSmpServer(secret=secret, latency=args.latency, allowlist_size=args.list_size)
+        await server.start()
+        host, port = server.host, server.port
+    
+    smp = SmpClient(host, port, secret, method_prefix=args.method_prefix)
+    writer = SmpClient(host, port, secret, method_prefix=args.method_prefix)
+    try:
+        await smp.connect()
+        await writer.connect()
+        await smp.set_allowlist(_players("player", args.list_size))
+        players = _players("bench", args.calls)
+        return [
+            await bench_get_list(smp, args.list_calls),
+            await bench_sequential(smp, players),
+            await bench_concurrent(smp, players, args.concurrency),
+            await bench_batch(smp, players, args.batch_size),
+            await bench_sync(smp, args.list_size + args.calls, args.churn, args.chunk_size),
+            await bench_mirror_lag(smp, writer, _players("lag", args.lag_samples)),
+        ]
+    finally:
+        await writer.disconnect()
+        await smp.disconnect()
+        if server is not None:
+            await server.stop()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="SMP 吞吐量/镜像延迟基准测试")
+    parser.add_argument("--host", default=None, help="真实服务器地址（默认启动本地替身服务器）")
+    parser.add_argument("--port", type=int, default=40745)
+    parser.add_argument("--secret", default="nethergate")
+    parser.add_argument("--method-prefix", default="", help="方法名前缀，原版服务器为 minecraft:")
+    parser.add_argument("--list-size", type=int, default=10000, help="白名单条目数")
+    parser.add_argument("--list-calls", type=int, default=20, help="完整列表读取次数")
+    parser.add_argument("--calls", type=int, default=1000, help="每个写入场景的调用数")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--churn", type=int, default=500, help="增量同步替换的条目数")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--lag-samples", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="替身服务器每个请求的延迟（秒）")
+    args = parser.parse_args(argv)
+    
+    print(format_results(asyncio.run(run(args))))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,8 @@
 
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, field
-from .data import ItemStack, Position
+from .data import ItemStack
+from .gameutils import Position
 
 
 @dataclass
@@ -4,37 +4,85 @@
 提供事件订阅和发布功能
 """
 
-from typing import Callable, Type, Any
+import asyncio
+import contextvars
+import itertools
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple, Type, Any
 from datetime import datetime
 
 
+_time_ns = time.time_ns
+_fromtimestamp = datetime.fromtimestamp
+
+
 class Event:
-    """基础事件类"""
+    """
+    基础事件类
+    
+    事件类使用 __slots__，不创建实例字典；构造时只记录纪元纳秒时间戳，
+    timestamp 在首次访问时才转换为 datetime。
+    未声明 __slots__ 的子类（如插件自定义事件）照常拥有实例字典。
+    
+    取舍：构造比构造时调用 datetime.now() 便宜，但首次读取 timestamp 需要一次
+    datetime.fromtimestamp，构造加读取的总耗时比构造时调用 datetime.now() 高约 0.3~0.5 微秒。
+    只在大多数事件的时间戳不被读取时才有净收益；只需要排序或计算间隔的处理函数
+    应使用 timestamp_ns。赋值 timestamp（如日志回放设置日志时间）不做转换。
+    """
+    
+    __slots__ = ("_created_ns", "_timestamp")
     
     def __init__(self):
-        self.timestamp = datetime.now()
+        self._created_ns: Optional[int] = _time_ns()
+        self._timestamp: Optional[datetime] = None
+    
+    @property
+    def timestamp(self) -> datetime:
+        """事件创建时间（本地时间）"""
+        timestamp = self._timestamp
+        if timestamp is None:
+            timestamp = self._timestamp = _fromtimestamp(self._created_ns / 1e9)
+        return timestamp
+    
+    @timestamp.setter
+    def timestamp(self, value: datetime):
+        self._timestamp = value
+        # 纪元纳秒在读取 timestamp_ns 时才计算（datetime.timestamp() 比赋值本身慢得多）
+        self._created_ns = None
+    
+    @property
+    def timestamp_ns(self) -> int:
+        """事件创建时间（纪元纳秒）"""
+        created_ns = self._created_ns
+        if created_ns is None:
+            created_ns = self._created_ns = int(self._timestamp.timestamp() * 1e9)
+        return created_ns
 
 
 # ========== 服务器事件 ==========
 
 class ServerStartingEvent(Event):
     """服务器启动中事件"""
-    pass
+    
+    __slots__ = ()
 
 
 class ServerStartedEvent(Event):
     """服务器已启动事件"""
-    pass
+    
+    __slots__ = ()
 
 
 class ServerStoppingEvent(Event):
     """服务器停止中事件"""
-    pass
+    
+    __slots__ = ()
 
 
 class ServerStoppedEvent(Event):
     """服务器已停止事件"""
-    pass
+    
+    __slots__ = ()
 
 
 # ========== 玩家事件 ==========
@@ -42,6 +90,8 @@ class ServerStoppedEvent(Event):
 class PlayerJoinEvent(Event):
     """玩家加入事件"""
     
+    __slots__ = ("player_name", "player_uuid")
+    
     def __init__(self, player_name: str, player_uuid: str):
         super().__init__()
         self.player_name = player_name
@@ -51,6 +101,8 @@ class PlayerJoinEvent(Event):
 class PlayerLeaveEvent(Event):
     """玩家离开事件"""
     
+    __slots__ = ("player_name",)
+    
     def __init__(self, player_name: str):
         super().__init__()
         self.player_name = player_name
@@ -59,6 +111,8 @@ class PlayerLeaveEvent(Event):
 class PlayerChatEvent(Event):
     """玩家聊天事件"""
     
+    __slots__ = ("player_name", "message", "_cancelled")
+    
     def __init__(self, player_name: str, message: str):
         super().__init__()
         self.player_name = player_name
@@ -77,6 +131,8 @@ class PlayerChatEvent(Event):
 class PlayerDeathEvent(Event):
     """玩家死亡事件"""
     
+    __slots__ = ("player_name", "death_message")
+    
     def __init__(self, player_name: str, death_message: str):
         super().__init__()
         self.player_name = player_name
@@ -86,27 +142,48 @@ class PlayerDeathEvent(Event):
 class PlayerAdvancementEvent(Event):
     """玩家达成成就事件"""
     
+    __slots__ = ("player_name", "advancement")
+    
     def __init__(self, player_name: str, advancement: str):
         super().__init__()
         self.player_name = player_name
         self.advancement = advancement
 
 
+# ========== 日志事件 ==========
+
+class LogSpamSuppressedEvent(Event):
+    """相似日志被抑制的汇总事件"""
+    
+    __slots__ = ("template", "sample", "count", "duration")
+    
+    def __init__(self, template: str, sample: str, count: int, duration: float):
+        super().__init__()
+        self.template = template
+        self.sample = sample
+        self.count = count
+        self.duration = duration
+
+
 # ========== 网络事件 ==========
 
 class RconConnectedEvent(Event):
     """RCON 已连接事件"""
-    pass
+    
+    __slots__ = ()
 
 
 class RconDisconnectedEvent(Event):
     """RCON 已断开事件"""
-    pass
+    
+    __slots__ = ()
 
 
 class WebSocketClientConnected(Event):
     """WebSocket 客户端连接事件"""
     
+    __slots__ = ("client_id",)
+    
     def __init__(self, client_id: str):
         super().__init__()
         self.client_id = client_id
@@ -115,6 +192,8 @@ class WebSocketClientConnected(Event):
 class WebSocketClientDisconnected(Event):
     """WebSocket 客户端断开事件"""
     
+    __slots__ = ("client_id",)
+    
     def __init__(self, client_id: str):
         super().__init__()
         self.client_id = client_id
@@ -129,23 +208,57 @@ class EventBus:
     注意：这是一个接口类，实际实现由 C# 桥接提供
     """
     
-    def subscribe(self, event_type: Type[Event], handler: Callable[[Event], Any]):
+    def subscribe(
+        self,
+        event_type: Type[Event],
+        handler: Callable[[Event], Any],
+        concurrent: bool = False,
+        key: Optional[Tuple[str, Any]] = None
+    ):
         """
         订阅事件
         
         Args:
             event_type: 事件类型
             handler: 事件处理函数
+            concurrent: 是否允许与其他处理函数并发执行（仅对不可取消的事件生效）
+            key: (属性名, 值)，只接收该属性等于该值的事件，如 ("player_name", "Steve")
+        """
+        pass
+    
+    def subscribe_batched(
+        self,
+        event_type: Type[Event],
+        handler: Callable[[List[Event]], Any],
+        max_batch: int = 100,
+        max_delay: float = 0.05
+    ):
+        """
+        批量订阅事件
+        
+        事件先缓存起来，每 max_delay 秒或攒满 max_batch 个时以事件列表调用一次处理函数
+        
+        Args:
+            event_type: 事件类型
+            handler: 批处理函数，参数为事件列表
+            max_batch: 单批最多的事件数
+            max_delay: 第一个事件进入缓存后最多等待的秒数
         """
         pass
     
-    def unsubscribe(self, event_type: Type[Event], handler: Callable[[Event], Any]):
+    def unsubscribe(
+        self,
+        event_type: Type[Event],
+        handler: Callable[[Event], Any],
+        key: Optional[Tuple[str, Any]] = None
+    ):
         """
         取消订阅事件
         
         Args:
             event_type: 事件类型
             handler: 事件处理函数
+            key: 只取消使用该 (属性名, 值) 订阅的处理函数；为 None 时取消全部
         """
         pass
     
@@ -158,3 +271,490 @@ class EventBus:
         """
         pass
 
+
+class _Subscription:
+    __slots__ = ("event_type", "handler", "priority", "sequence", "concurrent", "callback", "key")
+    
+    def __init__(
+        self,
+        event_type: type,
+        handler: Callable[[Event], Any],
+        priority: int,
+        sequence: int,
+        concurrent: bool = False,
+        callback: Optional[Callable] = None,
+        key: Optional[Tuple[str, Any]] = None
+    ):
+        self.event_type = event_type
+        self.handler = handler
+        """发布时调用的函数"""
+        self.priority = priority
+        self.sequence = sequence
+        self.concurrent = concurrent
+        self.callback = handler if callback is None else callback
+        """订阅者传入的函数（取消订阅时用于比较）"""
+        self.key = key
+        """(属性名, 值)，None 表示接收所有事件"""
+
+
+class _EventBatcher:
+    """
+    批量订阅的事件缓存
+    
+    作为普通处理函数注册到总线上：每个事件只追加到列表，不创建协程；
+    攒满 max_batch 时返回投递协程（由 publish 等待，形成背压），否则由定时器在 max_delay 后投递。
+    投递串行进行，处理函数按事件发布顺序收到各批。
+    """
+    
+    __slots__ = ("handler", "max_batch", "max_delay", "on_error", "_events", "_timer", "_lock", "_loop", "_tasks")
+    
+    def __init__(
+        self,
+        handler: Callable[[List[Event]], Any],
+        max_batch: int,
+        max_delay: float,
+        on_error: Optional[Callable[[Event, Callable, Exception], None]]
+    ):
+        self.handler = handler
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.on_error = on_error
+        self._events: List[Event] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+        """定时器和 close() 启动的投递任务（事件循环只保留弱引用，需要在这里持有）"""
+    
+    def __call__(self, event: Event):
+        events = self._events
+        events.append(event)
+        if len(events) >= self.max_batch:
+            return self.flush()
+        if self._timer is None:
+            if self._loop is None:
+                self._loop = asyncio.get_running_loop()
+            self._timer = self._loop.call_later(self.max_delay, self._on_timer)
+        return None
+    
+    @property
+    def pending(self) -> int:
+        """缓存中尚未投递的事件数"""
+        return len(self._events)
+    
+    async def flush(self):
+        """立即投递缓存中的事件"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._events:
+            return
+        batch, self._events = self._events, []
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                result = self.handler(batch)
+                if result is not None and asyncio.iscoroutine(result):
+                    await result
+            except Exception as ex:
+                if self.on_error is not None:
+                    self.on_error(batch[0], self.handler, ex)
+    
+    async def drain(self):
+        """投递缓存中的事件，并等待后台投递任务完成"""
+        await self.flush()
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    def close(self):
+        """取消订阅时在后台投递剩余的事件（可通过 drain() 等待）"""
+        if self._events and self._loop is not None and not self._loop.is_closed():
+            self._spawn()
+        elif self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    
+    def _on_timer(self):
+        self._timer = None
+        self._spawn()
+    
+    def _spawn(self):
+        task = self._loop.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+_MISSING = object()
+
+_in_concurrent_handler: contextvars.ContextVar = contextvars.ContextVar("_in_concurrent_handler", default=False)
+"""当前是否在并发处理函数（或其调用链）中执行，用于识别重入发布"""
+
+
+def _subscription_order(subscription: _Subscription) -> Tuple[int, int]:
+    return -subscription.priority, subscription.sequence
+
+
+class _Dispatch:
+    """
+    一个具体事件类的分发表
+    
+    不带键的订阅预先排好序；带键的订阅按 属性名 -> 值 -> 订阅列表 建立哈希索引。
+    发布时每个键属性只做一次字典查找，命中的键组合与不带键的订阅合并排序后缓存，
+    同一组合再次出现时直接复用
+    """
+    
+    __slots__ = ("cancellable", "handlers", "concurrent", "keyed", "_unkeyed", "_selected")
+    
+    def __init__(self, cancellable: bool, subscriptions: List[_Subscription]):
+        """
+        Args:
+            cancellable: 事件是否可取消
+            subscriptions: 已按执行顺序排好的订阅
+        """
+        self.cancellable = cancellable
+        self._unkeyed = [subscription for subscription in subscriptions if subscription.key is None]
+        self.handlers, self.concurrent = self._build(self._unkeyed)
+        """不带键的处理函数，以及每个处理函数是否并发执行（没有并发处理函数时为 None）"""
+        index: Dict[str, Dict[Any, List[_Subscription]]] = {}
+        for subscription in subscriptions:
+            if subscription.key is not None:
+                attribute, value = subscription.key
+                index.setdefault(attribute, {}).setdefault(value, []).append(subscription)
+        self.keyed: Optional[Dict[str, Dict[Any, List[_Subscription]]]] = index or None
+        """属性名 -> 值 -> 订阅列表，没有带键的订阅时为 None"""
+        self._selected: Dict[tuple, Tuple[Tuple[Callable[[Event], Any], ...], Optional[Tuple[bool, ...]]]] = {}
+    
+    def select(self, event: Event) -> Tuple[Tuple[Callable[[Event], Any], ...], Optional[Tuple[bool, ...]]]:
+        """获取该事件实例需要调用的处理函数"""
+        matched = ()
+        for attribute, table in self.keyed.items():
+            value = getattr(event, attribute, _MISSING)
+            try:
+                if value in table:
+                    matched += ((attribute, value),)
+            except TypeError:
+                # 不可哈希的属性值不可能匹配任何键
+                pass
+        if not matched:
+            return self.handlers, self.concurrent
+        selected = self._selected.get(matched)
+        if selected is None:
+            subscriptions = list(self._unkeyed)
+            for attribute, value in matched:
+                subscriptions.extend(self.keyed[attribute][value])
+            subscriptions.sort(key=_subscription_order)
+            selected = self._selected[matched] = self._build(subscriptions)
+        return selected
+    
+    def _build(
+        self,
+        subscriptions: List[_Subscription]
+    ) -> Tuple[Tuple[Callable[[Event], Any], ...], Optional[Tuple[bool, ...]]]:
+        handlers = tuple(subscription.handler for subscription in subscriptions)
+        concurrent = tuple(subscription.concurrent for subscription in subscriptions)
+        if self.cancellable or not any(concurrent):
+            # 可取消事件必须按顺序执行，cancel() 才能阻止后续处理函数
+            return handlers, None
+        return handlers, concurrent
+
+
+class LocalEventBus(EventBus):
+    """
+    Python 侧事件总线
+    
+    发布事件不再跨越到 C# 事件总线。每个具体事件类首次发布时，
+    沿其 MRO 收集所有订阅（订阅 Event 等基类的处理函数同样会收到子类事件），
+    按优先级从高到低（同优先级按订阅顺序）排好序缓存为元组；
+    只有订阅和取消订阅会清空缓存，因此 publish 只是遍历一个元组，不排序、不加锁、不做反射。
+    
+    与 C# EventBus 一致，单个处理函数抛出异常不影响其他处理函数；
+    可取消事件（如 PlayerChatEvent）被取消后不再调用后续处理函数。
+    
+    以 concurrent=True 订阅的处理函数在不可取消事件上作为独立任务启动，不等待其完成就继续调用后续处理函数，
+    所有在途的并发处理函数共享 max_concurrency 个名额（名额用尽时 publish 等待空出名额）；
+    并发处理函数中再次发布的事件不占用名额（外层处理函数持有名额等待内层完成，占用会在名额用尽时死锁）。
+    publish 在该事件的全部处理函数完成后返回。可取消事件忽略该选项，始终按顺序执行，保证 cancel() 能阻止后续处理函数。
+    
+    subscribe_batched 的处理函数以事件列表为参数，每个时间窗口调用一次，适合统计、广播等高频事件的消费者。
+    
+    指定 key=(属性名, 值) 的订阅只在事件的该属性等于该值时被调用。带键的订阅按属性值建立哈希索引，
+    大量按玩家区分的订阅（如任务追踪）不会在每个事件上都被唤醒；调用顺序仍按优先级与不带键的处理函数合并。
+    
+    Example:
+        >>> bus = LocalEventBus()
+        >>> bus.subscribe(PlayerChatEvent, self.on_chat, priority=100)
+        >>> bus.subscribe(Event, self.audit)  # 收到所有事件
+        >>> bus.subscribe(PlayerJoinEvent, self.load_profile, concurrent=True)  # 慢 I/O 不阻塞其他插件
+        >>> bus.subscribe_batched(PlayerChatEvent, self.store_chat_batch, max_batch=500, max_delay=1.0)
+        >>> bus.subscribe(PlayerChatEvent, tracker.on_chat, key=("player_name", "Steve"))
+        >>> await bus.publish(PlayerChatEvent("Steve", "hello"))
+    """
+    
+    def __init__(
+        self,
+        on_error: Optional[Callable[[Event, Callable, Exception], None]] = None,
+        max_concurrency: int = 64
+    ):
+        """
+        构造函数
+        
+        Args:
+            on_error: 处理函数抛出异常时的回调，参数为 (事件, 处理函数, 异常)
+            max_concurrency: 同时执行的并发处理函数上限
+        """
+        self._on_error = on_error
+        self._max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._subscriptions: Dict[type, List[_Subscription]] = {}
+        self._dispatch: Dict[type, _Dispatch] = {}
+        """具体事件类 -> 分发表"""
+        self._sequence = itertools.count()
+        self._closing: Set[_EventBatcher] = set()
+        """已取消订阅、仍在后台投递剩余事件的批量订阅"""
+    
+    def subscribe(
+        self,
+        event_type: Type[Event],
+        handler: Callable[[Event], Any],
+        priority: int = 0,
+        concurrent: bool = False,
+        key: Optional[Tuple[str, Any]] = None
+    ):
+        """
+        订阅事件
+        
+        Args:
+            event_type: 事件类型，订阅基类会收到所有子类事件
+            handler: 事件处理函数，可以是协程函数
+            priority: 优先级（数字越大越先执行；并发处理函数按优先级顺序启动）
+            concurrent: 是否作为并发任务执行（仅对不可取消的事件生效）
+            key: (属性名, 值)，只接收该属性等于该值的事件，如 ("player_name", "Steve")；值必须可哈希
+            
+        Raises:
+            TypeError: key 不是 (属性名, 可哈希的值)
+        """
+        self._subscriptions.setdefault(event_type, []).append(
+            _Subscription(event_type, handler, priority, next(self._sequence), concurrent, key=self._check_key(key))
+        )
+        self._dispatch = {}
+    
+    def subscribe_batched(
+        self,
+        event_type: Type[Event],
+        handler: Callable[[List[Event]], Any],
+        max_batch: int = 100,
+        max_delay: float = 0.05,
+        priority: int = 0,
+        key: Optional[Tuple[str, Any]] = None
+    ):
+        """
+        批量订阅事件
+        
+        事件先缓存起来，第一个事件进入缓存 max_delay 秒后，或攒满 max_batch 个时，
+        以事件列表调用一次处理函数。批处理函数在可取消事件上的位置与同优先级的普通处理函数相同，
+        但它收到事件时已经晚于后续处理函数，无法再取消事件
+        
+        Args:
+            event_type: 事件类型，订阅基类会收到所有子类事件
+            handler: 批处理函数，参数为事件列表，可以是协程函数
+            max_batch: 单批最多的事件数
+            max_delay: 第一个事件进入缓存后最多等待的秒数
+            priority: 优先级（决定事件进入缓存的先后，通常无需设置）
+            key: (属性名, 值)，只缓存该属性等于该值的事件
+        """
+        key = self._check_key(key)
+        batcher = _EventBatcher(handler, max_batch, max_delay, self._on_error)
+        self._subscriptions.setdefault(event_type, []).append(
+            _Subscription(event_type, batcher, priority, next(self._sequence), callback=handler, key=key)
+        )
+        self._dispatch = {}
+    
+    def unsubscribe(
+        self,
+        event_type: Type[Event],
+        handler: Callable[[Event], Any],
+        key: Optional[Tuple[str, Any]] = None
+    ):
+        """
+        取消订阅事件
+        
+        不指定 key 时移除该类型上所有相同的处理函数（无论订阅时的键）；
+        指定 key 时只移除使用该键订阅的处理函数，例如玩家离开时只取消该玩家的追踪。
+        
+        批量订阅同样使用传给 subscribe_batched 的处理函数取消，缓存中剩余的事件在后台投递，
+        关闭前 await flush() 可以等待投递完成
+        
+        Args:
+            event_type: 事件类型
+            handler: 事件处理函数
+            key: 订阅时使用的 (属性名, 值)
+            
+        Example:
+            >>> bus.unsubscribe(PlayerChatEvent, tracker.on_chat, key=("player_name", "Steve"))
+        """
+        subscriptions = self._subscriptions.get(event_type)
+        if not subscriptions:
+            return
+        removed = [
+            subscription for subscription in subscriptions
+            if subscription.callback == handler and (key is None or subscription.key == key)
+        ]
+        if not removed:
+            return
+        removed_ids = {id(subscription) for subscription in removed}
+        remaining = [subscription for subscription in subscriptions if id(subscription) not in removed_ids]
+        for subscription in removed:
+            if isinstance(subscription.handler, _EventBatcher):
+                self._close_batcher(subscription.handler)
+        if remaining:
+            self._subscriptions[event_type] = remaining
+        else:
+            del self._subscriptions[event_type]
+        self._dispatch = {}
+    
+    def clear(self):
+        """清空所有订阅（批量订阅缓存中剩余的事件在后台投递，可通过 flush() 等待）"""
+        for batcher in self._batchers():
+            self._close_batcher(batcher)
+        self._subscriptions.clear()
+        self._dispatch = {}
+    
+    async def flush(self):
+        """
+        立即投递所有批量订阅缓存中的事件，并等待后台投递完成（包括已取消订阅的批量订阅）
+        
+        clear() 和 unsubscribe() 不能被等待，关闭前应调用本方法
+        """
+        for batcher in self._batchers():
+            await batcher.drain()
+        while self._closing:
+            closing, self._closing = self._closing, set()
+            for batcher in closing:
+                await batcher.drain()
+    
+    def handlers(self, event_type: Type[Event]) -> Tuple[Callable[[Event], Any], ...]:
+        """
+        获取发布该类型事件时会依次调用的处理函数
+        
+        Args:
+            event_type: 具体事件类型
+            
+        Returns:
+            按执行顺序排列的处理函数（不含带键的订阅）
+        """
+        entry = self._dispatch.get(event_type)
+        if entry is None:
+            entry = self._dispatch[event_type] = self._resolve(event_type)
+        return entry.handlers
+    
+    async def publish(self, event: Event):
+        """
+        发布事件
+        
+        Args:
+            event: 事件实例
+        """
+        entry = self._dispatch.get(type(event))
+        if entry is None:
+            entry = self._dispatch[type(event)] = self._resolve(type(event))
+        if entry.keyed is None:
+            handlers, concurrent = entry.handlers, entry.concurrent
+        else:
+            handlers, concurrent = entry.select(event)
+        if concurrent is not None:
+            await self._publish_concurrent(event, handlers, concurrent)
+            return
+        for handler in handlers:
+            try:
+                result = handler(event)
+                if result is not None and asyncio.iscoroutine(result):
+                    await result
+            except Exception as ex:
+                if self._on_error is not None:
+                    self._on_error(event, handler, ex)
+            if entry.cancellable and event.is_cancelled():
+                return
+    
+    async def _publish_concurrent(
+        self,
+        event: Event,
+        handlers: Tuple[Callable[[Event], Any], ...],
+        concurrent: Tuple[bool, ...]
+    ):
+        """顺序处理函数就地执行，并发处理函数启动为任务，最后等待全部任务完成"""
+        if _in_concurrent_handler.get():
+            # 重入发布：调用链上的并发处理函数已经持有名额
+            semaphore = None
+        else:
+            semaphore = self._semaphore
+            if semaphore is None:
+                # 延迟到事件循环中创建（Python 3.8/3.9 的 Semaphore 在构造时绑定事件循环）
+                semaphore = self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        tasks = []
+        for handler, flag in zip(handlers, concurrent):
+            if flag:
+                if semaphore is not None:
+                    await semaphore.acquire()
+                tasks.append(asyncio.ensure_future(self._run_concurrent(event, handler, semaphore)))
+                continue
+            try:
+                result = handler(event)
+                if result is not None and asyncio.iscoroutine(result):
+                    await result
+            except Exception as ex:
+                if self._on_error is not None:
+                    self._on_error(event, handler, ex)
+        if tasks:
+            await asyncio.gather(*tasks)
+    
+    async def _run_concurrent(
+        self,
+        event: Event,
+        handler: Callable[[Event], Any],
+        semaphore: Optional[asyncio.Semaphore]
+    ):
+        # 任务运行在自己的上下文副本中，设置的标记只对该处理函数的调用链可见
+        _in_concurrent_handler.set(True)
+        try:
+            result = handler(event)
+            if result is not None and asyncio.iscoroutine(result):
+                await result
+        except Exception as ex:
+            if self._on_error is not None:
+                self._on_error(event, handler, ex)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+    
+    def _close_batcher(self, batcher: _EventBatcher):
+        batcher.close()
+        if batcher.pending or batcher._tasks:
+            self._closing.add(batcher)
+    
+    def _batchers(self) -> List[_EventBatcher]:
+        return [
+            subscription.handler
+            for subscriptions in self._subscriptions.values()
+            for subscription in subscriptions
+            if isinstance(subscription.handler, _EventBatcher)
+        ]
+    
+    def _resolve(self, event_type: type) -> _Dispatch:
+        """沿 MRO 收集订阅并排序"""
+        subscriptions = [
+            subscription
+            for base in event_type.__mro__
+            for subscription in self._subscriptions.get(base, ())
+        ]
+        subscriptions.sort(key=_subscription_order)
+        return _Dispatch(hasattr(event_type, "is_cancelled"), subscriptions)
+    
+    @staticmethod
+    def _check_key(key: Optional[Tuple[str, Any]]) -> Optional[Tuple[str, Any]]:
+        if key is None:
+            return None
+        if not isinstance(key, tuple) or len(key) != 2 or not isinstance(key[0], str):
+            raise TypeError("key 必须是 (属性名, 值)")
+        hash(key[1])
+        return key
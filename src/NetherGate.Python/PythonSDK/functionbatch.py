@@ -0,0 +1,239 @@
+"""
+数据包函数批量执行
+
+把大批量命令编译为临时数据包函数，通过一次 function 调用执行
+"""
+
+import asyncio
+import json
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import List, Optional, Union
+
+from .rcon import RconClient, RconResponse
+
+
+_UNKNOWN_FUNCTION = re.compile(r"unknown function", re.IGNORECASE)
+"""reload 尚未完成时 function 命令的回复"""
+
+_EXECUTED_NOTHING = re.compile(r"executed 0 commands", re.IGNORECASE)
+"""函数存在但没有执行任何命令"""
+
+
+class FunctionBatchRconClient(RconClient):
+    """
+    数据包函数批量执行客户端
+    
+    包装一个现有的 RCON 客户端。命令数量达到阈值的批次不再逐条发送，
+    而是写入世界 datapacks/ 目录下生成的 .mcfunction 文件，
+    经一次 reload 和一次 function 调用执行，然后删除临时文件。
+    适合 fill_area、烟花表演、批量设置容器物品等成千上万条命令的场景。
+    
+    reload 是异步的（回复 "Reloading!" 时数据包还没有重新加载完），
+    因此 function 调用会以 poll_interval 为间隔重试，直到不再回复 "Unknown function" 或超过 reload_timeout。
+    
+    注意：
+        - 每批命令都会执行一次 reload，重新加载服务器上的全部数据包（包括其他插件和地图的数据包），
+          大型数据包较多的服务器上 reload 本身可能需要数秒，并会触发它们的 load 函数标签
+        - 函数中单条命令没有独立的返回值，整批共享 function 调用的结果
+        - 单次 function 调用执行的命令数受游戏规则 maxCommandChainLength 限制，
+          超出 max_commands_per_function 的批次会拆分为多个函数
+          
+    Example:
+        >>> rcon = FunctionBatchRconClient(rcon, "/srv/minecraft/world")
+        >>> commands = [f"setblock {x} 64 {z} minecraft:stone"
+        ...             for x in range(100) for z in range(100)]
+        >>> responses = await rcon.execute_batch(commands)
+    """
+    
+    def __init__(
+        self,
+        inner: RconClient,
+        world_path: Union[str, Path],
+        threshold: int = 64,
+        namespace: str = "nethergate_batch",
+        pack_format: int = 48,
+        legacy_layout: bool = False,
+        max_commands_per_function: int = 65536,
+        reload_timeout: float = 30.0,
+        poll_interval: float = 0.1
+    ):
+        """
+        构造函数
+        
+        Args:
+            inner: 实际执行命令的 RCON 客户端
+            world_path: 世界存档目录（包含 level.dat 的目录）
+            threshold: 批次命令数达到该值时改用数据包函数执行
+            namespace: 临时数据包的名称和命名空间
+            pack_format: pack.mcmeta 中的 pack_format
+            legacy_layout: 是否使用 1.21 之前的 functions/ 目录名
+            max_commands_per_function: 单个函数文件的最大命令数
+            reload_timeout: 等待 reload 完成（函数可被调用）的最长秒数
+            poll_interval: 等待 reload 完成时重试 function 调用的间隔（秒）
+        """
+        self._inner = inner
+        self._pack_dir = Path(world_path) / "datapacks" / namespace
+        self._function_dir = self._pack_dir / "data" / namespace / (
+            "functions" if legacy_layout else "function"
+        )
+        self._namespace = namespace
+        self._threshold = max(1, threshold)
+        self._pack_format = pack_format
+        self._max_commands = max(1, max_commands_per_function)
+        self._reload_timeout = reload_timeout
+        self._poll_interval = poll_interval
+        self._lock: Optional[asyncio.Lock] = None
+    
+    @property
+    def inner(self) -> RconClient:
+        """被包装的 RCON 客户端"""
+        return self._inner
+    
+    def is_connected(self) -> bool:
+        """检查连接状态"""
+        return self._inner.is_connected()
+    
+    async def connect(self, *args, **kwargs):
+        """连接被包装的客户端"""
+        await self._inner.connect(*args, **kwargs)
+    
+    async def disconnect(self):
+        """断开被包装的客户端"""
+        await self._inner.disconnect()
+    
+    async def execute(self, command: str) -> RconResponse:
+        """执行单条命令"""
+        return await self._inner.execute(command)
+    
+    async def execute_batch(self, commands: List[str]) -> List[RconResponse]:
+        """
+        批量执行命令
+        
+        低于阈值的批次直接交给被包装的客户端；达到阈值的批次编译为数据包函数执行，
+        返回列表中每一项都是对应 function 调用的结果
+        """
+        if len(commands) < self._threshold:
+            return await self._inner.execute_batch(commands)
+        
+        results: List[RconResponse] = []
+        for start in range(0, len(commands), self._max_commands):
+            chunk = commands[start:start + self._max_commands]
+            response = await self.execute_as_function(chunk)
+            results.extend(
+                RconResponse(
+                    success=response.success,
+                    response=response.response,
+                    error=response.error,
+                    request_id=response.request_id
+                )
+                for _ in chunk
+            )
+        return results
+    
+    async def execute_as_function(self, commands: List[str]) -> RconResponse:
+        """
+        把命令写入临时函数并通过一次 function 调用执行
+        
+        会执行一次 reload，重新加载服务器上的全部数据包
+        
+        Args:
+            commands: 命令列表（不需要前导斜杠，不能包含换行）
+            
+        Returns:
+            function 命令的执行结果；reload 超时仍找不到函数，或函数没有执行任何命令时 success 为 False
+        """
+        lines = []
+        for command in commands:
+            command = command.strip()
+            if "\n" in command or "\r" in command:
+                return RconResponse(success=False, error=f"函数命令不能包含换行: {command!r}")
+            lines.append(command[1:] if command.startswith("/") else command)
+        
+        name = f"batch_{uuid.uuid4().hex}"
+        path = self._function_dir / f"{name}.mcfunction"
+        loop = asyncio.get_running_loop()
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        
+        # 其他批次删除文件后的 reload 会卸载本批次的函数，写入、reload、调用必须连续完成
+        async with self._lock:
+            try:
+                await loop.run_in_executor(None, self._write_function, path, "\n".join(lines) + "\n")
+            except OSError as ex:
+                return RconResponse(success=False, error=f"写入函数文件失败: {ex}")
+            
+            try:
+                reload = await self._inner.execute("reload")
+                if not reload.success:
+                    return reload
+                return await self._call_function(f"{self._namespace}:{name}")
+            finally:
+                await loop.run_in_executor(None, self._remove_file, path)
+    
+    async def _call_function(self, function: str) -> RconResponse:
+        """
+        调用函数，reload 尚未完成时重试
+        
+        函数名每批唯一，reload 完成前调用只会得到 "Unknown function" 而不会执行任何命令，
+        因此重试不会重复执行
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._reload_timeout
+        while True:
+            response = await self._inner.execute(f"function {function}")
+            if not response.success:
+                return response
+            if _UNKNOWN_FUNCTION.search(response.response) is None:
+                break
+            if loop.time() >= deadline:
+                return RconResponse(
+                    success=False,
+                    response=response.response,
+                    error=f"等待 reload 超时，函数 {function} 仍不可用",
+                    request_id=response.request_id
+                )
+            await asyncio.sleep(self._poll_interval)
+        if _EXECUTED_NOTHING.search(response.response) is not None:
+            return RconResponse(
+                success=False,
+                response=response.response,
+                error=f"函数 {function} 没有执行任何命令",
+                request_id=response.request_id
+            )
+        return response
+    
+    async def cleanup(self):
+        """删除临时数据包目录"""
+        await asyncio.get_running_loop().run_in_executor(None, self._remove_pack)
+    
+    # ========== 文件操作 ==========
+    
+    def _write_function(self, path: Path, content: str):
+        """写入 pack.mcmeta（如不存在）和函数文件"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = self._pack_dir / "pack.mcmeta"
+        if not meta.exists():
+            meta.write_text(json.dumps({
+                "pack": {
+                    "pack_format": self._pack_format,
+                    "description": "NetherGate temporary batch functions"
+                }
+            }), encoding="utf-8")
+        temp = path.with_suffix(".tmp")
+        temp.write_text(content, encoding="utf-8")
+        temp.replace(path)
+    
+    @staticmethod
+    def _remove_file(path: Path):
+        """删除函数文件"""
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def _remove_pack(self):
+        """递归删除临时数据包目录"""
+        shutil.rmtree(self._pack_dir, ignore_errors=True)
@@ -5,9 +5,17 @@
 """
 
 import re
-from typing import Optional, Pattern
+import itertools
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
 from abc import ABC, abstractmethod
 
+try:
+    from re import _parser as _sre_parse, _constants as _sre
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+    import sre_constants as _sre
+
 
 class ServerEvent:
     """服务器事件基类"""
@@ -53,9 +61,15 @@ class RegexLogMatcher(ILogMatcher):
     基于正则的日志匹配器基类
     
     提供正则表达式匹配功能，子类只需实现 on_match 方法
+    
+    构造时从模式中提取匹配必需的字面量（如 " joined the game"），
+    消息不包含这些字面量时跳过正则匹配
     """
     
-    def __init__(self, pattern: str, priority: int = 0, flags: int = 0):
+    _literals: Tuple[str, ...] = ()
+    """类级默认值：覆盖 __init__ 且未调用 super().__init__() 的子类不做字面量预过滤"""
+    
+    def __init__(self, pattern: str, priority: int = 0, flags: int = 0, literals: Optional[Sequence[str]] = None):
         """
         构造函数
         
@@ -63,9 +77,15 @@ class RegexLogMatcher(ILogMatcher):
             pattern: 正则表达式模式字符串
             priority: 优先级，默认为 0
             flags: 正则表达式标志，默认为 0
+            literals: 匹配成功时消息必然包含的字面量，默认从模式中自动提取；
+                传入空序列可关闭预过滤
         """
         self._pattern: Pattern = re.compile(pattern, flags)
         self._priority = priority
+        if literals is None:
+            self._literals = required_literals(self._pattern)
+        else:
+            self._literals = tuple(literal for literal in literals if literal)
     
     @property
     def priority(self) -> int:
@@ -77,6 +97,11 @@ class RegexLogMatcher(ILogMatcher):
         """正则表达式模式"""
         return self._pattern
     
+    @property
+    def literals(self) -> Tuple[str, ...]:
+        """匹配成功时消息必然包含的字面量"""
+        return self._literals
+    
     def try_match(self, message: str, level: str, thread: Optional[str]) -> Optional[ServerEvent]:
         """
         尝试匹配日志消息并产生事件
@@ -89,6 +114,9 @@ class RegexLogMatcher(ILogMatcher):
         Returns:
             匹配成功返回事件，失败返回 None
         """
+        for literal in self._literals:
+            if literal not in message:
+                return None
         match = self._pattern.match(message)
         if match:
             return self.on_match(match, level, thread)
@@ -110,6 +138,63 @@ class RegexLogMatcher(ILogMatcher):
         pass
 
 
+# ========== 日志行解析 ==========
+
+_LOG_LINE = re.compile(r"^\[(\d{2}:\d{2}:\d{2})\] \[([^\]]+)/([^\]]+)\]: (.+)$")
+"""原版格式: [19:45:30] [Server thread/INFO]: <Player> Hello world"""
+
+_ALTERNATE_LOG_LINE = re.compile(r"^\[(\d{2}:\d{2}:\d{2})\s+([A-Z]+)\s*\]:\s+(.+)$", re.IGNORECASE)
+"""Paper 等简化格式: [19:45:30 INFO]: <Player> Hello world"""
+
+
+class LogLine:
+    """已拆分的日志行"""
+    
+    __slots__ = ("time", "level", "thread", "message")
+    
+    def __init__(self, time: Optional[str], level: str, thread: Optional[str], message: str):
+        self.time = time
+        """时间（HH:mm:ss），无法识别格式时为 None"""
+        self.level = level
+        self.thread = thread
+        self.message = message
+    
+    def __repr__(self) -> str:
+        return f"LogLine(time={self.time!r}, level={self.level!r}, thread={self.thread!r}, message={self.message!r})"
+
+
+def parse_log_line(line: str) -> Optional[LogLine]:
+    """
+    按 C# LogParser 的规则拆分一行服务器日志
+    
+    依次尝试原版格式和简化格式；都不符合时剥离嵌套的 "[...]: " 前缀，以整行（或最内层消息）作为 INFO 消息
+    
+    Args:
+        line: 原始日志行
+        
+    Returns:
+        拆分结果，空行返回 None
+    """
+    line = line.strip()
+    if not line:
+        return None
+    match = _LOG_LINE.match(line)
+    if match:
+        return LogLine(match.group(1), match.group(3), match.group(2), match.group(4))
+    match = _ALTERNATE_LOG_LINE.match(line)
+    if match:
+        return LogLine(match.group(1), match.group(2), None, match.group(3))
+    message = line
+    # 最多剥离 5 层，与 LogParser.ExtractInnermostMessage 一致
+    for _ in range(5):
+        index = message.find("]: ")
+        if index > 0 and message[0] == "[":
+            message = message[index + 3:]
+            continue
+        break
+    return LogLine(None, "INFO", None, message)
+
+
 # ========== 示例匹配器 ==========
 
 class PlayerJoinMatcher(RegexLogMatcher):
@@ -180,3 +265,521 @@ class ServerDoneMatcher(RegexLogMatcher):
         from .events import ServerStartedEvent
         return ServerStartedEvent()
 
+
+
+# ========== 组合匹配器 ==========
+
+_MAX_PREFIXES = 32
+"""单个模式最多展开的字面量前缀数（分支、字符集会使前缀数成倍增长）"""
+
+
+def _literal_prefixes(items, prefixes: List[str]) -> Tuple[List[str], bool]:
+    """
+    从已解析的正则项中提取匹配必然以之开头的字面量前缀集合
+    
+    Returns:
+        (前缀列表, 是否整段都是字面量)；后者为 False 时调用方不能在其后继续拼接
+    """
+    for op, av in items:
+        if op is _sre.LITERAL:
+            prefixes = [prefix + chr(av) for prefix in prefixes]
+        elif op is _sre.AT and av in (_sre.AT_BEGINNING, _sre.AT_BEGINNING_STRING):
+            continue
+        elif op is _sre.SUBPATTERN:
+            add_flags = av[1]
+            if add_flags & _sre.SRE_FLAG_IGNORECASE:
+                return prefixes, False
+            prefixes, complete = _literal_prefixes(av[-1], prefixes)
+            if not complete:
+                return prefixes, False
+        elif op is _sre.BRANCH:
+            expanded: List[str] = []
+            complete = True
+            for branch in av[1]:
+                branch_prefixes, branch_complete = _literal_prefixes(branch, prefixes)
+                expanded.extend(branch_prefixes)
+                complete = complete and branch_complete
+            if len(expanded) > _MAX_PREFIXES:
+                return prefixes, False
+            prefixes = expanded
+            if not complete:
+                return prefixes, False
+        elif op is _sre.IN and all(item_op is _sre.LITERAL for item_op, _ in av):
+            if len(prefixes) * len(av) > _MAX_PREFIXES:
+                return prefixes, False
+            prefixes = [prefix + chr(code) for prefix in prefixes for _, code in av]
+        else:
+            return prefixes, False
+    return prefixes, True
+
+
+def pattern_prefixes(pattern: Pattern) -> Tuple[str, ...]:
+    """
+    计算 re.match 成功时消息必然以之开头的字面量前缀
+    
+    Args:
+        pattern: 已编译的正则表达式
+        
+    Returns:
+        前缀元组；包含空字符串时表示无法按前缀过滤
+        
+    Example:
+        >>> pattern_prefixes(re.compile(r"^Done \(([0-9.]+)s\)!"))
+        ('Done (',)
+        >>> pattern_prefixes(re.compile(r"^(?:Stopping|Saving) "))
+        ('Stopping ', 'Saving ')
+    """
+    if pattern.flags & re.IGNORECASE or not isinstance(pattern.pattern, str):
+        return ("",)
+    try:
+        parsed = _sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return ("",)
+    prefixes, _ = _literal_prefixes(list(parsed), [""])
+    return tuple(dict.fromkeys(prefixes))
+
+
+_MIN_LITERAL = 3
+"""自动提取的字面量的最短长度，过短的字面量几乎每行都包含，起不到过滤作用"""
+
+
+def _literal_runs(items, runs: List[str], current: List[str]) -> List[str]:
+    """收集已解析正则项中必然连续出现的字面量片段，返回尚未结束的当前片段"""
+    for op, av in items:
+        if op is _sre.LITERAL:
+            current.append(chr(av))
+        elif op is _sre.AT:
+            # 零宽断言不影响前后字符的相邻关系
+            continue
+        elif op is _sre.SUBPATTERN and not av[1] & _sre.SRE_FLAG_IGNORECASE:
+            current = _literal_runs(av[-1], runs, current)
+        else:
+            runs.append("".join(current))
+            current = []
+            if op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT) and av[0] >= 1:
+                # 至少重复一次的内容也是必需的，但不能与前后拼接
+                runs.append("".join(_literal_runs(av[2], runs, [])))
+    return current
+
+
+def required_literals(pattern: Pattern) -> Tuple[str, ...]:
+    """
+    提取匹配成功时消息必然包含的最长字面量
+    
+    Args:
+        pattern: 已编译的正则表达式
+        
+    Returns:
+        字面量元组；无法提取（忽略大小写、没有足够长的字面量）时为空元组
+        
+    Example:
+        >>> required_literals(re.compile(r"^(\w+) joined the game$"))
+        (' joined the game',)
+    """
+    if pattern.flags & re.IGNORECASE or not isinstance(pattern.pattern, str):
+        return ()
+    try:
+        parsed = _sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return ()
+    runs: List[str] = []
+    runs.append("".join(_literal_runs(list(parsed), runs, [])))
+    longest = max(runs, key=len)
+    return (longest,) if len(longest) >= _MIN_LITERAL else ()
+
+
+def _literal_automaton(literals: Iterable[str]) -> Optional[Callable[[str], Optional[re.Match]]]:
+    """
+    把全部字面量编译为一个按字典树展开的正则，一次扫描判断消息是否包含其中任意一个
+    
+    共同前缀只比较一次，相当于由 sre 引擎在 C 中执行的 Aho-Corasick 搜索；
+    只需判断是否存在，因此一个字面量是另一个的前缀时较长的分支被剪除
+    """
+    trie: Dict[str, dict] = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    if not trie:
+        return None
+    
+    def build(node: Dict[str, dict]) -> str:
+        if "" in node:
+            return ""
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    
+    return re.compile(build(trie)).search
+
+
+class _TrieNode:
+    __slots__ = ("children", "ranks", "candidates", "plain", "filtered")
+    
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.ranks: List[int] = []
+        self.candidates: Tuple[ILogMatcher, ...] = ()
+        self.plain: Tuple[ILogMatcher, ...] = ()
+        """不带字面量的候选匹配器"""
+        self.filtered: Tuple[Tuple[ILogMatcher, Tuple[str, ...]], ...] = ()
+        """带字面量的候选匹配器及其字面量，为空时无需扫描字面量"""
+
+
+class MatcherStats:
+    """
+    单个匹配器的尝试次数、命中次数和耗时统计
+    
+    被前缀或字面量预过滤跳过的行不计入尝试次数
+    """
+    
+    __slots__ = ("matcher", "attempts", "hits", "errors", "total_ns", "_histogram", "_score", "_scored_hits")
+    
+    def __init__(self, matcher: ILogMatcher):
+        self.matcher = matcher
+        self.attempts = 0
+        self.hits = 0
+        self.errors = 0
+        self.total_ns = 0
+        # 按耗时纳秒数的二进制位数分桶，记录开销固定且与样本数无关
+        self._histogram = [0] * 64
+        self._score = 0.0
+        self._scored_hits = 0
+    
+    @property
+    def name(self) -> str:
+        """匹配器类型名"""
+        return type(self.matcher).__name__
+    
+    @property
+    def priority(self) -> int:
+        """匹配器优先级"""
+        return self.matcher.priority
+    
+    @property
+    def hit_rate(self) -> float:
+        """命中次数 / 尝试次数"""
+        return self.hits / self.attempts if self.attempts else 0.0
+    
+    @property
+    def total_time(self) -> float:
+        """累计匹配耗时（秒）"""
+        return self.total_ns / 1e9
+    
+    @property
+    def mean_time(self) -> float:
+        """平均每次尝试的耗时（秒）"""
+        return self.total_ns / self.attempts / 1e9 if self.attempts else 0.0
+    
+    @property
+    def p99(self) -> float:
+        """单次尝试耗时的 99 分位数（秒）"""
+        return self.percentile(0.99)
+    
+    def percentile(self, fraction: float) -> float:
+        """
+        单次尝试耗时的分位数
+        
+        Args:
+            fraction: 分位（0~1）
+            
+        Returns:
+            所在分桶的上界（秒），精度为 2 倍以内
+        """
+        if not self.attempts:
+            return 0.0
+        rank = fraction * self.attempts
+        seen = 0
+        for bits, count in enumerate(self._histogram):
+            seen += count
+            if seen >= rank:
+                return (1 << bits) / 1e9
+        return (1 << 63) / 1e9
+    
+    def record(self, elapsed_ns: int, hit: bool):
+        """记录一次尝试"""
+        self.attempts += 1
+        self.hits += hit
+        self.total_ns += elapsed_ns
+        self._histogram[min(elapsed_ns.bit_length(), 63)] += 1
+    
+    def reset(self):
+        """清空统计"""
+        self.attempts = self.hits = self.errors = self.total_ns = 0
+        self._histogram = [0] * 64
+        self._score = 0.0
+        self._scored_hits = 0
+    
+    def __repr__(self) -> str:
+        return (
+            f"MatcherStats({self.name}, priority={self.priority}, attempts={self.attempts}, hits={self.hits}, "
+            f"total={self.total_time * 1000:.3f}ms, p99={self.p99 * 1e6:.1f}us)"
+        )
+
+
+class LogMatcherSet(ILogMatcher):
+    """
+    组合日志匹配器
+    
+    把多个匹配器编译为一个按字面量前缀索引的字典树：
+    RegexLogMatcher 的模式在构造时被解析出 re.match 必需的开头字面量（如 "Done ("、"<"），
+    每行日志只沿字典树走一次，得到按优先级排好序的候选匹配器元组，
+    只有候选匹配器才会执行正则。无法提取前缀的模式和其他 ILogMatcher 对每行都是候选。
+    
+    所有 RegexLogMatcher 的必需字面量（如 " joined the game"）另外合并为一个多字面量自动机，
+    每行只扫描一次；不含任何字面量的行（大多数普通日志）直接跳过全部带字面量的匹配器。
+    
+    语义与逐个尝试全部匹配器相同：优先级高的先执行（同优先级按注册顺序），
+    第一个返回事件的匹配器胜出。
+    
+    组合匹配器本身也是 ILogMatcher：插件把它作为一个匹配器注册，日志管线每行只调用一次
+    try_match，而不是逐个调用 N 个匹配器。注册后它在管线中以自己的 priority 参与排序，
+    与其他插件的匹配器交错：priority 高于它的匹配器都先于整个组合执行，低于它的都在之后；
+    组合内各匹配器自身的 priority 只决定组合内部的顺序，不会与组合外的匹配器比较。
+    需要与其他插件匹配器保持原有相对顺序时，按优先级分组，每组构造一个组合并使用该组的优先级。
+    
+    开启 collect_stats 后记录每个匹配器的尝试次数、命中次数、累计和 p99 耗时；
+    开启 adaptive 后每处理 reorder_interval 行，把同优先级的匹配器按近期命中次数重新排序
+    （同一行能被多个同优先级匹配器匹配时，胜出者可能因此改变）。
+    C# LogParser 对直接注册的匹配器记录相同的统计并支持相同的重排
+    （配置 monitoring.log_matcher_stats，ServerProcessManager.LogParser.GetMatcherStats()）。
+    
+    Example:
+        >>> matchers = LogMatcherSet([PlayerJoinMatcher(), PlayerChatMatcher(), ServerDoneMatcher()])
+        >>> matchers.add(MyDeathMatcher())
+        >>> event = matchers.try_match("<Steve> hello", "INFO", "Server thread")
+        
+        >>> matchers = LogMatcherSet(plugin_matchers, priority=50, collect_stats=True)
+        >>> for stats in sorted(matchers.stats(), key=lambda s: s.total_ns, reverse=True)[:5]:
+        ...     self.logger.info(repr(stats))
+    """
+    
+    def __init__(
+        self,
+        matchers: Iterable[ILogMatcher] = (),
+        on_error: Optional[Callable[[ILogMatcher, Exception], None]] = None,
+        collect_stats: bool = False,
+        adaptive: bool = False,
+        reorder_interval: int = 10000,
+        priority: int = 0
+    ):
+        """
+        构造函数
+        
+        Args:
+            matchers: 初始匹配器
+            on_error: 匹配器抛出异常时的回调；异常不会中断后续匹配器
+            collect_stats: 是否记录每个匹配器的统计
+            adaptive: 是否按命中次数重排同优先级的匹配器（隐含 collect_stats）
+            reorder_interval: 自适应重排的间隔（行数）
+            priority: 作为一个匹配器注册到日志管线时的优先级
+        """
+        self._priority = priority
+        self._on_error = on_error
+        self._collect_stats = collect_stats or adaptive
+        self._adaptive = adaptive
+        self._reorder_interval = max(1, reorder_interval)
+        self._stats: Dict[int, MatcherStats] = {}
+        self.lines = 0
+        """collect_stats 开启后处理的行数"""
+        self.matched = 0
+        """collect_stats 开启后产生事件的行数"""
+        self._sequence = itertools.count()
+        self._entries: Dict[int, Tuple[ILogMatcher, int, Tuple[str, ...], Tuple[str, ...]]] = {}
+        self._ordered: Tuple[ILogMatcher, ...] = ()
+        self._root = _TrieNode()
+        self._contains_literal: Optional[Callable[[str], Optional[re.Match]]] = None
+        for matcher in matchers:
+            self._entries[id(matcher)] = (matcher, next(self._sequence), *self._filters_of(matcher))
+            self._stats[id(matcher)] = MatcherStats(matcher)
+        self._rebuild()
+    
+    def add(self, matcher: ILogMatcher):
+        """
+        添加匹配器（已存在时忽略）
+        
+        Args:
+            matcher: 匹配器
+            
+        Raises:
+            ValueError: 把组合添加到自身
+        """
+        if matcher is self:
+            raise ValueError("不能把 LogMatcherSet 添加到自身")
+        if id(matcher) in self._entries:
+            return
+        self._entries[id(matcher)] = (matcher, next(self._sequence), *self._filters_of(matcher))
+        self._stats[id(matcher)] = MatcherStats(matcher)
+        self._rebuild()
+    
+    def remove(self, matcher: ILogMatcher) -> bool:
+        """
+        移除匹配器
+        
+        Args:
+            matcher: 匹配器
+            
+        Returns:
+            是否存在并已移除
+        """
+        if self._entries.pop(id(matcher), None) is None:
+            return False
+        self._stats.pop(id(matcher), None)
+        self._rebuild()
+        return True
+    
+    @property
+    def priority(self) -> int:
+        """作为一个匹配器注册到日志管线时的优先级"""
+        return self._priority
+    
+    def __len__(self) -> int:
+        return len(self._ordered)
+    
+    def __iter__(self) -> Iterator[ILogMatcher]:
+        """按执行顺序迭代匹配器"""
+        return iter(self._ordered)
+    
+    def __contains__(self, matcher: ILogMatcher) -> bool:
+        return id(matcher) in self._entries
+    
+    def candidates(self, message: str) -> Tuple[ILogMatcher, ...]:
+        """
+        获取可能匹配该消息的匹配器
+        
+        Args:
+            message: 日志消息
+            
+        Returns:
+            按执行顺序排列的候选匹配器
+        """
+        node = self._root
+        for char in message:
+            child = node.children.get(char)
+            if child is None:
+                break
+            node = child
+        if not node.filtered:
+            return node.candidates
+        if self._contains_literal(message) is None:
+            return node.plain
+        return tuple(
+            matcher for matcher, literals in node.filtered
+            if all(literal in message for literal in literals)
+        )
+    
+    def try_match(self, message: str, level: str = "INFO", thread: Optional[str] = None) -> Optional[ServerEvent]:
+        """
+        依次尝试候选匹配器，返回第一个产生的事件
+        
+        Args:
+            message: 日志消息（已剥离时间戳/线程/级别）
+            level: 日志级别
+            thread: 线程名
+            
+        Returns:
+            匹配成功返回事件，全部失败返回 None
+        """
+        if self._collect_stats:
+            return self._try_match_measured(message, level, thread)
+        for matcher in self.candidates(message):
+            try:
+                event = matcher.try_match(message, level, thread)
+            except Exception as ex:
+                # 与 C# LogParser 一致：单个匹配器失败不影响后续匹配器
+                if self._on_error is not None:
+                    self._on_error(matcher, ex)
+                continue
+            if event is not None:
+                return event
+        return None
+    
+    def stats(self) -> List[MatcherStats]:
+        """
+        获取匹配器统计（需要开启 collect_stats）
+        
+        Returns:
+            按当前执行顺序排列的统计
+        """
+        return [self._stats[id(matcher)] for matcher in self._ordered]
+    
+    def reset_stats(self):
+        """清空所有统计"""
+        self.lines = self.matched = 0
+        for stats in self._stats.values():
+            stats.reset()
+    
+    # ========== 内部实现 ==========
+    
+    def _try_match_measured(self, message: str, level: str, thread: Optional[str]) -> Optional[ServerEvent]:
+        self.lines += 1
+        result = None
+        clock = time.perf_counter_ns
+        for matcher in self.candidates(message):
+            stats = self._stats[id(matcher)]
+            start = clock()
+            try:
+                event = matcher.try_match(message, level, thread)
+            except Exception as ex:
+                stats.record(clock() - start, False)
+                stats.errors += 1
+                if self._on_error is not None:
+                    self._on_error(matcher, ex)
+                continue
+            stats.record(clock() - start, event is not None)
+            if event is not None:
+                self.matched += 1
+                result = event
+                break
+        if self._adaptive and self.lines % self._reorder_interval == 0:
+            self._reorder()
+        return result
+    
+    def _reorder(self):
+        """按近期命中次数（每次重排衰减一半）更新同优先级匹配器的顺序"""
+        for stats in self._stats.values():
+            stats._score = stats._score / 2 + (stats.hits - stats._scored_hits)
+            stats._scored_hits = stats.hits
+        self._rebuild()
+    
+    @staticmethod
+    def _filters_of(matcher: ILogMatcher) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """匹配器的 (开头前缀, 必需字面量)"""
+        # 覆盖了 try_match 的子类可能不再使用 re.match，不能按前缀或字面量过滤
+        if isinstance(matcher, RegexLogMatcher) and type(matcher).try_match is RegexLogMatcher.try_match:
+            return pattern_prefixes(matcher.pattern), matcher.literals
+        return ("",), ()
+    
+    def _rebuild(self):
+        """重建字典树；新树构建完成后才替换，正在进行的匹配继续使用旧树"""
+        stats = self._stats
+        adaptive = self._adaptive
+        entries = sorted(self._entries.values(), key=lambda entry: (
+            -entry[0].priority,
+            -stats[id(entry[0])]._score if adaptive else 0,
+            entry[1]
+        ))
+        ordered = tuple(entry[0] for entry in entries)
+        root = _TrieNode()
+        for rank, (_, _, prefixes, _) in enumerate(entries):
+            for prefix in prefixes:
+                node = root
+                for char in prefix:
+                    node = node.children.setdefault(char, _TrieNode())
+                node.ranks.append(rank)
+        
+        stack = [(root, frozenset())]
+        while stack:
+            node, inherited = stack.pop()
+            ranks = inherited.union(node.ranks)
+            node.candidates = tuple(ordered[rank] for rank in sorted(ranks))
+            node.plain = tuple(ordered[rank] for rank in sorted(ranks) if not entries[rank][3])
+            node.filtered = () if len(node.plain) == len(node.candidates) else tuple(
+                (ordered[rank], entries[rank][3]) for rank in sorted(ranks)
+            )
+            stack.extend((child, ranks) for child in node.children.values())
+        
+        contains_literal = _literal_automaton(literal for entry in entries for literal in entry[3])
+        self._ordered = ordered
+        self._contains_literal = contains_literal
+        self._root = root
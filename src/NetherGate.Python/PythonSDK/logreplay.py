@@ -0,0 +1,283 @@
+"""
+离线日志回放
+
+把历史日志（logs/*.log、logs/*.log.gz）交给进程池并行解压和匹配，
+按时间顺序合并为强类型事件，用于补算在线时长、聊天、死亡等统计
+"""
+
+import asyncio
+import glob
+import gzip
+import heapq
+import itertools
+import os
+import re
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .logmatcher import ILogMatcher, LogMatcherSet, ServerEvent, parse_log_line
+
+
+_ARCHIVE_NAME = re.compile(r"(\d{4})-(\d{2})-(\d{2})-(\d+)\.log(?:\.gz)?$")
+"""原版归档日志文件名: 2024-05-01-3.log.gz"""
+
+_ROLLOVER_TOLERANCE = 3600
+"""时间倒退超过该秒数才视为跨过午夜（容忍少量时钟校正）"""
+
+
+@dataclass
+class ReplayRecord:
+    """回放产生的一条记录"""
+    timestamp: datetime
+    source: str
+    """日志文件路径"""
+    line_number: int
+    level: str
+    thread: Optional[str]
+    message: str
+    event: Optional[ServerEvent] = None
+    """匹配器产生的事件，未匹配时为 None"""
+
+
+def _archive_key(path: str) -> Tuple[Optional[date], int]:
+    match = _ARCHIVE_NAME.search(os.path.basename(path))
+    if match is None:
+        return None, 0
+    year, month, day, index = (int(group) for group in match.groups())
+    return date(year, month, day), index
+
+
+def discover_logs(directory: str, include_latest: bool = True) -> List[str]:
+    """
+    列出目录中的日志文件，按时间顺序排列
+    
+    归档文件按文件名中的日期和序号排序，latest.log 排在最后
+    
+    Args:
+        directory: 日志目录（通常为服务器的 logs 目录）
+        include_latest: 是否包含 latest.log
+        
+    Returns:
+        文件路径列表
+    """
+    archives = [
+        path for path in glob.glob(os.path.join(directory, "*.log*"))
+        if _archive_key(path)[0] is not None
+    ]
+    archives.sort(key=_archive_key)
+    latest = os.path.join(directory, "latest.log")
+    if include_latest and os.path.isfile(latest):
+        archives.append(latest)
+    return archives
+
+
+# ========== 工作进程 ==========
+
+_worker_matchers: Optional[LogMatcherSet] = None
+
+_FileRecord = Tuple[int, int, int, str, Optional[str], str, Optional[ServerEvent]]
+"""(跨日数, 当日秒数, 行号, 级别, 线程, 消息, 事件)"""
+
+
+def _init_worker(matchers: Sequence[ILogMatcher]):
+    global _worker_matchers
+    _worker_matchers = LogMatcherSet(matchers)
+
+
+def _open_log(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace", buffering=1 << 20)
+
+
+def _replay_file(path: str, include_unmatched: bool) -> Tuple[List[_FileRecord], int]:
+    """
+    在工作进程中解压并匹配一个文件
+    
+    Returns:
+        (按行序排列的记录, 文件内跨过午夜的次数)
+    """
+    matchers = _worker_matchers
+    records: List[_FileRecord] = []
+    days = 0
+    previous = -1
+    with _open_log(path) as stream:
+        for number, raw in enumerate(stream, 1):
+            line = parse_log_line(raw)
+            if line is None:
+                continue
+            if line.time is not None:
+                hours, minutes, seconds = line.time.split(":")
+                current = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+                if current < previous - _ROLLOVER_TOLERANCE:
+                    days += 1
+                previous = current
+            event = matchers.try_match(line.message, line.level, line.thread) if matchers else None
+            if event is not None or include_unmatched:
+                # 无时间戳的行沿用上一行的时间
+                records.append((days, max(previous, 0), number, line.level, line.thread, line.message, event))
+    return records, days
+
+
+# ========== 回放 ==========
+
+class LogReplayer:
+    """
+    离线日志回放器
+    
+    每个文件交给进程池中的一个工作进程解压、拆分并通过 LogMatcherSet 匹配，
+    主进程按文件顺序收取结果，借助文件名中的日期把各文件的记录按时间戳归并输出。
+    日志行只有时分秒：归档文件的日期取自文件名，latest.log 的日期由修改时间和文件内跨日次数反推。
+    
+    匹配器会被 pickle 后发送到每个工作进程，因此必须定义在可导入的模块顶层；
+    产生的事件同样需要可 pickle。
+    
+    Example:
+        >>> replayer = LogReplayer([PlayerJoinMatcher(), PlayerLeaveMatcher(), MyDeathMatcher()], workers=8)
+        >>> for record in replayer.replay(discover_logs("server/logs")):
+        ...     stats.feed(record.timestamp, record.event)
+    """
+    
+    def __init__(
+        self,
+        matchers: Iterable[ILogMatcher],
+        workers: Optional[int] = None,
+        include_unmatched: bool = False,
+        executor_factory: Optional[Callable[..., Executor]] = None
+    ):
+        """
+        构造函数
+        
+        Args:
+            matchers: 日志匹配器
+            workers: 工作进程数，默认为 CPU 核数；0 表示在当前进程中顺序处理
+            include_unmatched: 是否输出没有匹配到事件的日志行
+            executor_factory: 自定义执行器工厂，参数与 ProcessPoolExecutor 相同
+        """
+        self._matchers = list(matchers)
+        self._workers = (os.cpu_count() or 1) if workers is None else workers
+        self._include_unmatched = include_unmatched
+        self._executor_factory = executor_factory or ProcessPoolExecutor
+    
+    def replay(self, paths: Iterable[str]) -> Iterator[ReplayRecord]:
+        """
+        回放日志文件
+        
+        Args:
+            paths: 日志文件路径，应按时间顺序排列（见 discover_logs）
+            
+        Returns:
+            按时间戳排序的记录迭代器（时间戳相同时保持文件和行的先后顺序）
+        """
+        paths = list(paths)
+        if not paths:
+            return
+        if self._workers == 0:
+            _init_worker(self._matchers)
+            results = (self._completed(_replay_file(path, self._include_unmatched)) for path in paths)
+            yield from self._merge(paths, results)
+            return
+        
+        executor = self._executor_factory(
+            max_workers=self._workers,
+            initializer=_init_worker,
+            initargs=(self._matchers,)
+        )
+        try:
+            yield from self._merge(paths, self._submit(executor, paths))
+        finally:
+            # 提前停止迭代时最多还有 workers * 2 个在途文件，不等待它们完成
+            executor.shutdown(wait=False)
+    
+    async def replay_to(self, event_bus: Any, paths: Iterable[str]) -> int:
+        """
+        回放日志并把事件发布到事件总线
+        
+        事件的 timestamp 会被设置为日志行的时间
+        
+        Args:
+            event_bus: 事件总线
+            paths: 日志文件路径
+            
+        Returns:
+            发布的事件数
+        """
+        loop = asyncio.get_running_loop()
+        records = self.replay(paths)
+        sentinel = object()
+        published = 0
+        while True:
+            # 归并和等待工作进程都是阻塞操作，放到线程中执行
+            record = await loop.run_in_executor(None, next, records, sentinel)
+            if record is sentinel:
+                return published
+            if record.event is not None:
+                await event_bus.publish(record.event)
+                published += 1
+    
+    # ========== 内部实现 ==========
+    
+    def _submit(self, executor: Executor, paths: List[str]) -> Iterator[Future]:
+        """按文件顺序提交任务，最多保持 workers * 2 个在途任务"""
+        pending: Deque[Future] = deque()
+        remaining = iter(paths)
+        for path in itertools.islice(remaining, self._workers * 2):
+            pending.append(executor.submit(_replay_file, path, self._include_unmatched))
+        while pending:
+            future = pending.popleft()
+            for path in itertools.islice(remaining, 1):
+                pending.append(executor.submit(_replay_file, path, self._include_unmatched))
+            yield future
+    
+    @staticmethod
+    def _completed(result: Tuple[List[_FileRecord], int]) -> Future:
+        future: Future = Future()
+        future.set_result(result)
+        return future
+    
+    def _merge(self, paths: List[str], futures: Iterable[Future]) -> Iterator[ReplayRecord]:
+        """
+        按时间戳归并各文件的记录
+        
+        文件按时间顺序到达，且第 i+1 个文件的记录不早于其文件名日期的零点，
+        因此堆中早于该下界的记录可以立即输出
+        """
+        bounds = self._lower_bounds(paths)
+        heap: List[Tuple[datetime, int, int, ReplayRecord]] = []
+        for index, (path, future) in enumerate(zip(paths, futures)):
+            records, days = future.result()
+            base = self._base_date(path, days)
+            for day, seconds, number, level, thread, message, event in records:
+                timestamp = base + timedelta(days=day, seconds=seconds)
+                if event is not None and hasattr(event, "timestamp"):
+                    event.timestamp = timestamp
+                heapq.heappush(heap, (timestamp, index, number, ReplayRecord(
+                    timestamp, path, number, level, thread, message, event
+                )))
+            bound = bounds[index + 1] if index + 1 < len(paths) else None
+            while heap and (bound is None or heap[0][0] < bound):
+                yield heapq.heappop(heap)[3]
+    
+    @staticmethod
+    def _lower_bounds(paths: List[str]) -> List[Optional[datetime]]:
+        """每个文件记录时间的下界；没有日期的文件（latest.log）沿用前一个文件的下界"""
+        bounds: List[Optional[datetime]] = []
+        previous: Optional[datetime] = None
+        for path in paths:
+            day, _ = _archive_key(path)
+            if day is not None:
+                previous = datetime.combine(day, datetime.min.time())
+            bounds.append(previous)
+        return [bound if bound is not None else datetime.min for bound in bounds]
+    
+    @staticmethod
+    def _base_date(path: str, days: int) -> datetime:
+        """文件第一行所在日期的零点"""
+        day, _ = _archive_key(path)
+        if day is None:
+            # latest.log：最后一行在修改时间当天，向前推算跨日次数
+            day = date.fromtimestamp(os.path.getmtime(path)) - timedelta(days=days)
+        return datetime.combine(day, datetime.min.time())
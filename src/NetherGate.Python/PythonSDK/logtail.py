@@ -0,0 +1,444 @@
+"""
+日志文件跟踪
+
+直接跟踪服务器的 logs/latest.log：大块读取、按批投递完整行、处理日志轮转，
+并持久化已处理的字节偏移，重启后从上次的位置继续
+"""
+
+import asyncio
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+from .logmatcher import LogMatcherSet, parse_log_line
+from .logthrottle import LogThrottle
+from .system import LogListener, LogPattern
+
+
+_HEAD_SIZE = 64
+"""用于识别文件身份的开头字节数（inode 可能在轮转后被复用）"""
+
+
+class LogTailer:
+    """
+    日志文件跟踪器
+    
+    以自适应间隔轮询文件（有新数据时保持 poll_interval，空闲时逐步退避到 max_poll_interval），
+    每次在线程中以 read_size 为单位读取全部新增内容，只把完整的行按批交给 handler。
+    文件被轮转（inode 或开头内容变化）时先读完旧文件剩余部分再从头读取新文件；被截断时从头读取。
+    
+    指定 offset_file 时，每批行处理完成后把偏移写入该文件；重启后文件身份未变则从该偏移继续，
+    文件在停机期间被轮转（身份变化）则从新文件开头读取，
+    因此既不会重复处理也不会遗漏（handler 执行中途崩溃的那一批除外）。
+    handler 抛出的异常交给 on_error，该批视为已处理，跟踪继续进行。
+    
+    Example:
+        >>> async def on_lines(lines):
+        ...     for line in lines:
+        ...         await parser.feed(line)
+        >>> tailer = LogTailer("server/logs/latest.log", on_lines, offset_file="data/latest.offset")
+        >>> await tailer.start()
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        handler: Callable[[List[str]], Any],
+        offset_file: Optional[str] = None,
+        start_at_end: bool = True,
+        poll_interval: float = 0.1,
+        max_poll_interval: float = 1.0,
+        read_size: int = 1 << 20,
+        encoding: str = "utf-8",
+        on_error: Optional[Callable[[List[str], Exception], None]] = None,
+        on_poll: Optional[Callable[[], Any]] = None
+    ):
+        """
+        构造函数
+        
+        Args:
+            path: 日志文件路径
+            handler: 行批处理函数，参数为行列表（不含换行符），可以是协程函数
+            offset_file: 偏移持久化文件，None 表示不持久化
+            start_at_end: 没有可用的持久化偏移时是否从文件末尾开始（只处理新行）
+            poll_interval: 有新数据时的轮询间隔（秒）
+            max_poll_interval: 空闲时退避到的最大轮询间隔（秒）
+            read_size: 单次读取的字节数，也是单批的大致上限
+            encoding: 文件编码
+            on_error: handler 抛出异常时的回调，参数为 (该批行, 异常)；on_poll 的异常以空列表报告
+            on_poll: 每轮轮询后调用（无论是否有新行），可以是协程函数，用于定时任务
+        """
+        self._path = path
+        self._handler = handler
+        self._offset_file = offset_file
+        self._start_at_end = start_at_end
+        self._poll_interval = poll_interval
+        self._max_poll_interval = max(poll_interval, max_poll_interval)
+        self._read_size = read_size
+        self._encoding = encoding
+        self._on_error = on_error
+        self._on_poll = on_poll
+        
+        self._file = None
+        self._identity: Optional[Tuple[int, int]] = None
+        self._head = b""
+        self._offset = 0
+        """已投递的最后一个完整行之后的位置"""
+        self._pending = b""
+        """尚未以换行结束的行"""
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._reading: Optional[asyncio.Future] = None
+        """正在线程中进行的读取"""
+        
+        self.lines = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+    
+    @property
+    def path(self) -> str:
+        """日志文件路径"""
+        return self._path
+    
+    @property
+    def offset(self) -> int:
+        """已处理到的字节偏移"""
+        return self._offset
+    
+    async def start(self):
+        """开始跟踪"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+    
+    async def stop(self):
+        """停止跟踪，并持久化当前偏移"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        reading, self._reading = self._reading, None
+        if reading is not None:
+            # 线程中的读取无法取消：等它结束后再关闭文件，否则线程可能读到已关闭的文件，
+            # 或者在轮转分支中于关闭之后重新打开文件
+            try:
+                await reading
+            except Exception:
+                pass
+        self._close()
+    
+    def is_running(self) -> bool:
+        """是否正在跟踪"""
+        return self._task is not None and not self._task.done()
+    
+    def notify(self):
+        """立即进行下一次轮询（例如收到外部文件变更通知时）"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def poll(self) -> int:
+        """
+        读取并投递所有新增的完整行
+        
+        Returns:
+            本次投递的行数
+        """
+        loop = asyncio.get_running_loop()
+        delivered = 0
+        while True:
+            reading = self._reading = loop.run_in_executor(None, self._read)
+            # 调用方被取消时不取消读取本身，stop() 会等待它结束
+            batch, more = await asyncio.shield(reading)
+            self._reading = None
+            if batch is None:
+                return delivered
+            lines, offset = batch
+            if lines:
+                try:
+                    result = self._handler(lines)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as ex:
+                    # 不重试该批，否则一行格式异常的日志会让跟踪永远卡住
+                    self.errors += 1
+                    if self._on_error is not None:
+                        self._on_error(lines, ex)
+                delivered += len(lines)
+                self.lines += len(lines)
+                self.batches += 1
+            self._offset = offset
+            self._save()
+            if not more:
+                return delivered
+    
+    # ========== 内部实现 ==========
+    
+    async def _run(self):
+        interval = self._poll_interval
+        while True:
+            try:
+                delivered = await self.poll()
+            except OSError:
+                delivered = 0
+            if self._on_poll is not None:
+                try:
+                    result = self._on_poll()
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as ex:
+                    self.errors += 1
+                    if self._on_error is not None:
+                        self._on_error([], ex)
+            interval = self._poll_interval if delivered else min(interval * 2, self._max_poll_interval)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _read(self) -> Tuple[Optional[Tuple[List[str], int]], bool]:
+        """
+        在线程中读取一块数据
+        
+        Returns:
+            ((完整行, 新偏移) 或 None, 是否还有更多数据)
+        """
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            # 轮转过程中文件可能暂时不存在，先读完旧文件
+            stat = None
+        
+        if self._file is None:
+            if stat is None:
+                return None, False
+            self._open(stat)
+        elif stat is not None and self._rotated(stat):
+            data = self._file.read()
+            if data or self._pending:
+                # 读完旧文件的剩余部分，下一次调用再切换到新文件
+                return self._split(data, force=True), True
+            self.rotations += 1
+            self._close()
+            self._open(stat, resume=False)
+        elif stat is not None and stat.st_size < self._offset:
+            # 文件被截断
+            self.rotations += 1
+            self._file.seek(0)
+            self._offset = 0
+            self._pending = b""
+            self._head = b""
+        
+        data = self._file.read(self._read_size)
+        if not data:
+            return None, False
+        if len(self._head) < _HEAD_SIZE:
+            self._head = self._read_head()
+        return self._split(data), len(data) == self._read_size
+    
+    def _split(self, data: bytes, force: bool = False) -> Tuple[List[str], int]:
+        """切分出完整的行；force 为 True 时把末尾不完整的行也作为一行（旧文件已不会再写入）"""
+        data = self._pending + data
+        end = len(data) if force else data.rfind(b"\n") + 1
+        self._pending = data[end:]
+        offset = self._offset + end
+        if end == 0:
+            return [], self._offset
+        text = data[:end].decode(self._encoding, "replace")
+        lines = text.split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        return [line[:-1] if line.endswith("\r") else line for line in lines], offset
+    
+    def _open(self, stat: os.stat_result, resume: bool = True):
+        self._file = open(self._path, "rb", buffering=0)
+        self._identity = (stat.st_dev, stat.st_ino)
+        self._head = self._read_head()
+        self._pending = b""
+        self._offset = 0
+        saved, known = self._load() if resume else (None, False)
+        if saved is not None and saved <= stat.st_size:
+            self._offset = saved
+        elif known:
+            # 有该文件的持久化状态但身份不一致或偏移超出文件大小：文件在停机期间被轮转或截断，
+            # 新文件中的内容都还没有处理过
+            self._offset = 0
+        elif resume and self._start_at_end:
+            # 从末尾开始时对齐到最后一个完整行之后
+            self._offset = stat.st_size - len(self._tail_fragment(stat.st_size))
+        self._file.seek(self._offset)
+    
+    def _close(self):
+        if self._file is not None:
+            self._save()
+            self._file.close()
+            self._file = None
+    
+    def _rotated(self, stat: os.stat_result) -> bool:
+        if (stat.st_dev, stat.st_ino) != self._identity:
+            return True
+        # 同一 inode 被复用时开头内容会变化
+        return bool(self._head) and self._read_head(len(self._head)) != self._head
+    
+    def _read_head(self, size: int = _HEAD_SIZE) -> bytes:
+        try:
+            with open(self._path, "rb") as stream:
+                return stream.read(size)
+        except OSError:
+            return self._head
+    
+    def _tail_fragment(self, size: int) -> bytes:
+        """文件末尾最后一个换行之后的内容"""
+        start = max(0, size - self._read_size)
+        self._file.seek(start)
+        data = self._file.read(size - start)
+        index = data.rfind(b"\n")
+        return data[index + 1:] if index >= 0 else (data if start == 0 else b"")
+    
+    def _load(self) -> Tuple[Optional[int], bool]:
+        """
+        读取持久化偏移
+        
+        Returns:
+            (偏移，文件身份不一致时为 None, 是否存在该路径的持久化状态)
+        """
+        if not self._offset_file:
+            return None, False
+        try:
+            with open(self._offset_file, "r", encoding="utf-8") as stream:
+                state: Dict[str, Any] = json.load(stream)
+            head = bytes.fromhex(state.get("head", ""))
+            offset = int(state.get("offset", 0))
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None, False
+        if state.get("path", os.path.abspath(self._path)) != os.path.abspath(self._path):
+            return None, False
+        if [state.get("device"), state.get("inode")] != list(self._identity) or not self._head.startswith(head):
+            return None, True
+        return offset, True
+    
+    def _save(self):
+        if not self._offset_file or self._identity is None:
+            return
+        state = {
+            "path": os.path.abspath(self._path),
+            "device": self._identity[0],
+            "inode": self._identity[1],
+            "head": self._head.hex(),
+            "offset": self._offset,
+        }
+        temp = f"{self._offset_file}.tmp"
+        with open(temp, "w", encoding="utf-8") as stream:
+            json.dump(state, stream)
+        os.replace(temp, self._offset_file)
+
+
+class TailingLogListener(LogListener):
+    """
+    直接跟踪日志文件的日志监听器
+    
+    不依赖 ServerProcessManager 读取标准输出，可以附加到不由 NetherGate 启动的服务器。
+    每行按 LogParser 的规则拆分后，用消息依次匹配已添加的 LogPattern（re.search），
+    匹配成功时以 re.Match 调用其 handler；同时可以通过 LogMatcherSet 产生强类型事件并发布到事件总线。
+    指定 throttle 时，被抑制的行不会进入 LogPattern 和匹配器，汇总事件在每轮轮询后发布到事件总线，
+    刷屏停止、没有新行时同样会按时发布。
+    
+    Example:
+        >>> listener = TailingLogListener("server/logs/latest.log", offset_file="data/latest.offset")
+        >>> listener.add_pattern(LogPattern("join", r"(\\w+) joined the game", lambda m: print(m.group(1))))
+        >>> await listener.start()
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        offset_file: Optional[str] = None,
+        matchers: Optional[LogMatcherSet] = None,
+        event_bus: Any = None,
+        throttle: Optional[LogThrottle] = None,
+        **tailer_options
+    ):
+        """
+        构造函数
+        
+        Args:
+            path: 日志文件路径（通常为 logs/latest.log）
+            offset_file: 偏移持久化文件
+            matchers: 日志匹配器集合，None 表示不产生强类型事件
+            event_bus: 发布强类型事件的事件总线
+            throttle: 日志刷屏抑制器，None 表示不抑制
+            **tailer_options: 传给 LogTailer 的其他参数（start_at_end、poll_interval、on_error 等）；
+                on_error 同时接收 LogPattern 处理函数的异常，参数为 ([该行], 异常)；
+                on_poll 在每轮的刷屏汇总事件发布之后调用
+        """
+        self._patterns: Dict[str, Tuple[LogPattern, Pattern]] = {}
+        self._matchers = matchers
+        self._event_bus = event_bus
+        self._throttle = throttle
+        self._on_error: Optional[Callable[[List[str], Exception], None]] = tailer_options.get("on_error")
+        self._on_poll: Optional[Callable[[], Any]] = tailer_options.pop("on_poll", None)
+        self._tailer = LogTailer(
+            path, self._on_lines, offset_file=offset_file, on_poll=self._flush_summaries, **tailer_options
+        )
+    
+    @property
+    def tailer(self) -> LogTailer:
+        """底层的文件跟踪器"""
+        return self._tailer
+    
+    def add_pattern(self, pattern: LogPattern):
+        self._patterns[pattern.name] = (pattern, re.compile(pattern.pattern))
+    
+    def remove_pattern(self, name: str):
+        self._patterns.pop(name, None)
+    
+    def clear_patterns(self):
+        self._patterns.clear()
+    
+    async def start(self):
+        await self._tailer.start()
+    
+    async def stop(self):
+        await self._tailer.stop()
+    
+    def is_running(self) -> bool:
+        return self._tailer.is_running()
+    
+    async def _on_lines(self, lines: List[str]):
+        patterns = tuple(self._patterns.values())
+        matchers = self._matchers
+        throttle = self._throttle
+        for raw in lines:
+            line = parse_log_line(raw)
+            if line is None or (throttle is not None and not throttle.allow(line.message)):
+                continue
+            for pattern, compiled in patterns:
+                match = compiled.search(line.message)
+                if match is not None:
+                    try:
+                        result = pattern.handler(match)
+                        if asyncio.iscoroutine(result):
+                            await result
+                    except Exception as ex:
+                        # 单个处理函数失败不影响其他模式和后续行
+                        if self._on_error is not None:
+                            self._on_error([raw], ex)
+            if matchers is not None and self._event_bus is not None:
+                event = matchers.try_match(line.message, line.level, line.thread)
+                if event is not None:
+                    await self._event_bus.publish(event)
+    
+    async def _flush_summaries(self):
+        """发布到期的刷屏汇总事件，然后调用调用方的 on_poll"""
+        if self._throttle is not None and self._event_bus is not None:
+            for summary in self._throttle.flush():
+                await self._event_bus.publish(summary)
+        if self._on_poll is not None:
+            result = self._on_poll()
+            if asyncio.iscoroutine(result):
+                await result
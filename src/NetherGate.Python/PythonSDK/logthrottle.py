@@ -0,0 +1,217 @@
+"""
+日志刷屏抑制
+
+在日志行进入匹配器和 LogPattern 处理函数之前，按归一化模板限流，
+并定期汇总为 "N 条相似日志被抑制" 事件
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .events import LogSpamSuppressedEvent
+
+
+_DIGITS = b"0123456789"
+
+
+def log_template(message: str) -> bytes:
+    """
+    日志消息的归一化模板：删除所有数字
+    
+    "Can't keep up! Is the server overloaded? Running 2003ms or 40 ticks behind" 与
+    "... Running 5120ms or 102 ticks behind" 得到相同的模板。
+    编码后按字节表删除，每行只需两次 C 层调用
+    
+    Args:
+        message: 日志消息
+        
+    Returns:
+        模板（字节串）
+    """
+    return message.encode("utf-8", "replace").translate(None, _DIGITS)
+
+
+@dataclass
+class ThrottleRule:
+    """
+    针对特定日志的限流规则
+    
+    消息包含 contains 时使用该规则的速率。rate 为 0 时令牌不再补充，
+    每个汇总周期最多放行 burst 行（burst 为 0 表示全部抑制，仍然计入汇总）
+    """
+    contains: str
+    rate: float
+    """每个模板每秒允许通过的行数"""
+    burst: int = 1
+    """允许的突发行数"""
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "rate", "burst", "suppressed", "sample", "since")
+    
+    def __init__(self, rate: float, burst: int, now: float):
+        self.tokens = float(burst)
+        self.updated = now
+        self.rate = rate
+        self.burst = burst
+        self.suppressed = 0
+        self.sample = ""
+        self.since = 0.0
+
+
+class LogThrottle:
+    """
+    日志刷屏抑制器
+    
+    每个归一化模板（删除数字后的消息）一个令牌桶：允许 burst 行突发，之后每秒 rate 行。
+    被抑制的行不会进入匹配器和处理函数，只计数；flush() 每 summary_interval 秒
+    为有抑制记录的模板生成一个 LogSpamSuppressedEvent（包括期间因超出 max_templates 被淘汰的模板）。
+    刷屏停止后不会再有新行触发汇总，因此 flush() 应定时调用（TailingLogListener 在每轮轮询后调用）。
+    
+    Example:
+        >>> throttle = LogThrottle(rate=2, burst=10, rules=[ThrottleRule("moved too quickly!", rate=0.2)])
+        >>> if throttle.allow(message):
+        ...     event = matchers.try_match(message, level, thread)
+        >>> for summary in throttle.flush():
+        ...     await event_bus.publish(summary)
+    """
+    
+    def __init__(
+        self,
+        rate: Optional[float] = 5.0,
+        burst: int = 20,
+        rules: Iterable[ThrottleRule] = (),
+        summary_interval: float = 10.0,
+        max_templates: int = 4096,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        构造函数
+        
+        Args:
+            rate: 未命中规则的模板每秒允许的行数，None 表示只限制命中规则的日志
+            burst: 未命中规则的模板允许的突发行数
+            rules: 特定日志的限流规则，按顺序取第一个命中的规则
+            summary_interval: 生成汇总事件的间隔（秒）
+            max_templates: 最多跟踪的模板数，超出时淘汰最早加入的模板
+            clock: 单调时钟
+        """
+        self._rate = rate
+        self._burst = burst
+        self._rules = tuple(rules)
+        self._summary_interval = summary_interval
+        self._max_templates = max_templates
+        self._clock = clock
+        self._buckets: Dict[bytes, _Bucket] = {}
+        self._evicted: List[LogSpamSuppressedEvent] = []
+        """被淘汰但仍有未汇总抑制记录的模板的汇总"""
+        self._next_summary = clock() + summary_interval
+        
+        self.passed = 0
+        self.suppressed = 0
+    
+    def allow(self, message: str) -> bool:
+        """
+        判断一行日志是否放行
+        
+        Args:
+            message: 日志消息（已剥离时间戳/线程/级别）
+            
+        Returns:
+            放行返回 True，被抑制返回 False
+        """
+        rate, burst = self._rate, self._burst
+        for rule in self._rules:
+            if rule.contains in message:
+                rate, burst = rule.rate, rule.burst
+                break
+        else:
+            if rate is None:
+                self.passed += 1
+                return True
+        
+        template = log_template(message)
+        now = self._clock()
+        bucket = self._buckets.get(template)
+        if bucket is None:
+            if len(self._buckets) >= self._max_templates:
+                # 淘汰最早加入的模板，保持 O(1)；空闲模板由 flush() 定期清理
+                oldest = next(iter(self._buckets))
+                evicted = self._buckets.pop(oldest)
+                if evicted.suppressed:
+                    self._evicted.append(self._summary(oldest, evicted, now))
+            bucket = self._buckets[template] = _Bucket(rate, burst, now)
+        else:
+            bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+        
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            self.passed += 1
+            return True
+        if not bucket.suppressed:
+            bucket.sample = message
+            bucket.since = now
+        bucket.suppressed += 1
+        self.suppressed += 1
+        return False
+    
+    def flush(self, force: bool = False) -> List[LogSpamSuppressedEvent]:
+        """
+        生成到期的汇总事件
+        
+        Args:
+            force: 忽略 summary_interval，立即汇总全部抑制记录
+            
+        Returns:
+            汇总事件列表，未到期时为空
+        """
+        now = self._clock()
+        if not force and now < self._next_summary:
+            return []
+        self._next_summary = now + self._summary_interval
+        summaries, self._evicted = self._evicted, []
+        for template, bucket in self._buckets.items():
+            if bucket.suppressed:
+                summaries.append(self._summary(template, bucket, now))
+                bucket.suppressed = 0
+        self._prune(now)
+        return summaries
+    
+    def filter(self, messages: Iterable[str]) -> Tuple[List[str], List[LogSpamSuppressedEvent]]:
+        """
+        过滤一批消息
+        
+        Args:
+            messages: 日志消息
+            
+        Returns:
+            (放行的消息, 到期的汇总事件)
+        """
+        allowed = [message for message in messages if self.allow(message)]
+        return allowed, self.flush()
+    
+    @property
+    def templates(self) -> int:
+        """正在跟踪的模板数"""
+        return len(self._buckets)
+    
+    @staticmethod
+    def _summary(template: bytes, bucket: _Bucket, now: float) -> LogSpamSuppressedEvent:
+        return LogSpamSuppressedEvent(
+            template=template.decode("utf-8", "replace"),
+            sample=bucket.sample,
+            count=bucket.suppressed,
+            duration=now - bucket.since
+        )
+    
+    def _prune(self, now: float):
+        """删除令牌已经回满且没有未汇总抑制记录的模板（与新建的桶状态相同）"""
+        idle = [
+            template for template, bucket in self._buckets.items()
+            if not bucket.suppressed
+            and (bucket.rate <= 0 or bucket.tokens + (now - bucket.updated) * bucket.rate >= bucket.burst)
+        ]
+        for template in idle:
+            del self._buckets[template]
@@ -4,8 +4,33 @@ RCON 客户端
 提供 Minecraft 服务器命令执行功能
 """
 
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
+import asyncio
+import codecs
+import re
+import struct
+from typing import AsyncIterator, Callable, List, Optional, Dict, Any
+from dataclasses import dataclass, field
+
+
+# ========== 协议常量 ==========
+
+RCON_PACKET_AUTH = 3
+"""认证请求"""
+
+RCON_PACKET_AUTH_RESPONSE = 2
+"""认证响应"""
+
+RCON_PACKET_COMMAND = 2
+"""命令请求"""
+
+RCON_PACKET_RESPONSE = 0
+"""命令响应"""
+
+RCON_MAX_PAYLOAD = 4096
+"""服务器单个响应数据包的最大负载字节数"""
+
+_HEADER = struct.Struct("<iii")
+_LENGTH = struct.Struct("<i")
 
 
 @dataclass
@@ -21,6 +46,253 @@ class RconResponse:
         return self.success
 
 
+# ========== 响应解析 ==========
+
+@dataclass
+class PlayerList:
+    """list 命令的解析结果"""
+    online: int = 0
+    max_players: int = 0
+    players: List[str] = field(default_factory=list)
+    uuids: Dict[str, str] = field(default_factory=dict)
+    """list uuids 时的 玩家名 -> UUID"""
+
+
+@dataclass
+class ScoreResult:
+    """scoreboard players get 命令的解析结果"""
+    target: str = ""
+    objective: str = ""
+    value: int = 0
+
+
+@dataclass
+class DataGetResult:
+    """data get 命令的解析结果"""
+    target: str = ""
+    kind: str = ""
+    """entity、block 或 storage"""
+    value: Any = None
+    """解析后的 SNBT 值（dict/list/int/float/str）"""
+
+
+_LIST_PATTERN = re.compile(
+    r"There are (\d+) (?:of a max of |out of maximum )(\d+) players online[:.]\s?(.*)", re.S
+)
+_LIST_LEGACY_PATTERN = re.compile(r"There are (\d+)/(\d+) players online:\s?(.*)", re.S)
+_LIST_UUID_PATTERN = re.compile(r"(.+?) \(([0-9a-fA-F-]{32,36})\)")
+_SCORE_PATTERN = re.compile(r"(.+) has (-?\d+) \[(.+)\]")
+_DATA_PATTERN = re.compile(r"(.+?) has the following (entity|block) data: (.*)", re.S)
+_STORAGE_PATTERN = re.compile(r"Storage (\S+) has the following contents: (.*)", re.S)
+
+_SNBT_TOKEN = re.compile(
+    r"""\s*(?:([{}\[\]:,;])|"((?:[^"\\]|\\.)*)"|'((?:[^'\\]|\\.)*)'|([A-Za-z0-9._+\-]+))""", re.S
+)
+_SNBT_NUMBER = re.compile(r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)([bBsSlLfFdD]?)")
+_SNBT_ESCAPE = re.compile(r"\\(.)", re.S)
+_SNBT_ARRAY_TYPES = frozenset(("B", "I", "L"))
+
+
+def _snbt_tokenize(text: str) -> List[tuple]:
+    """把 SNBT 文本拆分为 (种类, 值) 列表；种类为标点本身、's'（引号字符串）或 'w'（裸字）"""
+    tokens = []
+    append = tokens.append
+    match = _SNBT_TOKEN.match
+    pos, end = 0, len(text)
+    while pos < end:
+        m = match(text, pos)
+        if m is None:
+            if text[pos:].strip():
+                raise ValueError(f"无效的 SNBT 字符，位置 {pos}: {text[pos:pos + 20]!r}")
+            break
+        punct, double, single, word = m.groups()
+        if punct is not None:
+            append((punct, punct))
+        elif word is not None:
+            append(("w", word))
+        else:
+            value = double if double is not None else single
+            if "\\" in value:
+                value = _SNBT_ESCAPE.sub(r"\1", value)
+            append(("s", value))
+        pos = m.end()
+    return tokens
+
+
+def _snbt_scalar(word: str) -> Any:
+    """把裸字转换为数值、布尔值或字符串"""
+    m = _SNBT_NUMBER.fullmatch(word)
+    if m is None:
+        if word == "true":
+            return True
+        if word == "false":
+            return False
+        return word
+    number, suffix = m.groups()
+    if suffix in ("f", "F", "d", "D") or (not suffix and ("." in number or "e" in number or "E" in number)):
+        return float(number)
+    return int(number)
+
+
+def parse_snbt(text: str) -> Any:
+    """
+    解析 SNBT（字符串化 NBT）文本
+    
+    复合标签解析为 dict，列表和类型数组（[B;...]、[I;...]、[L;...]）解析为 list，
+    带 b/s/l 后缀或无小数点的数值解析为 int，带 f/d 后缀或有小数点的数值解析为 float
+    
+    Args:
+        text: SNBT 文本
+        
+    Returns:
+        解析后的值
+        
+    Raises:
+        ValueError: 文本不是合法的 SNBT
+        
+    Example:
+        >>> parse_snbt('{Health: 20.0f, Pos: [0.5d, 64.0d, 0.5d], Tags: ["vip"]}')
+        {'Health': 20.0, 'Pos': [0.5, 64.0, 0.5], 'Tags': ['vip']}
+    """
+    tokens = _snbt_tokenize(text)
+    if not tokens:
+        raise ValueError("空的 SNBT 文本")
+    try:
+        value, index = _snbt_value(tokens, 0)
+    except IndexError:
+        raise ValueError("SNBT 意外结束") from None
+    if index != len(tokens):
+        raise ValueError(f"SNBT 末尾存在多余内容: {tokens[index][1]!r}")
+    return value
+
+
+def _snbt_value(tokens: List[tuple], index: int) -> tuple:
+    """从 index 处解析一个值，返回 (值, 下一个位置)"""
+    kind, value = tokens[index]
+    if kind == "w":
+        return _snbt_scalar(value), index + 1
+    if kind == "s":
+        return value, index + 1
+    
+    if kind == "{":
+        compound: Dict[str, Any] = {}
+        index += 1
+        if tokens[index][0] == "}":
+            return compound, index + 1
+        while True:
+            key_kind, key = tokens[index]
+            if key_kind not in ("w", "s") or tokens[index + 1][0] != ":":
+                raise ValueError(f"SNBT 复合标签中缺少键: {key!r}")
+            compound[key], index = _snbt_value(tokens, index + 2)
+            kind = tokens[index][0]
+            index += 1
+            if kind == "}":
+                return compound, index
+            if kind != ",":
+                raise ValueError(f"SNBT 复合标签中缺少逗号，位置 {index - 1}")
+    
+    if kind == "[":
+        items: List[Any] = []
+        index += 1
+        if (tokens[index][0] == "w" and tokens[index][1] in _SNBT_ARRAY_TYPES
+                and tokens[index + 1][0] == ";"):
+            index += 2
+        if tokens[index][0] == "]":
+            return items, index + 1
+        while True:
+            item, index = _snbt_value(tokens, index)
+            items.append(item)
+            kind = tokens[index][0]
+            index += 1
+            if kind == "]":
+                return items, index
+            if kind != ",":
+                raise ValueError(f"SNBT 列表中缺少逗号，位置 {index - 1}")
+    
+    raise ValueError(f"SNBT 中意外的符号: {value!r}")
+
+
+def _parse_list(text: str) -> Optional[PlayerList]:
+    """解析 list / list uuids 的输出"""
+    match = _LIST_PATTERN.match(text) or _LIST_LEGACY_PATTERN.match(text)
+    if match is None:
+        return None
+    names = match.group(3).strip()
+    result = PlayerList(online=int(match.group(1)), max_players=int(match.group(2)))
+    if not names:
+        return result
+    for entry in names.split(", "):
+        uuid_match = _LIST_UUID_PATTERN.fullmatch(entry)
+        if uuid_match is not None:
+            entry = uuid_match.group(1)
+            result.uuids[entry] = uuid_match.group(2)
+        result.players.append(entry)
+    return result
+
+
+def _parse_score(text: str) -> Optional[ScoreResult]:
+    """解析 scoreboard players get 的输出"""
+    match = _SCORE_PATTERN.fullmatch(text.strip())
+    if match is None:
+        return None
+    return ScoreResult(target=match.group(1), objective=match.group(3), value=int(match.group(2)))
+
+
+def _parse_data(text: str) -> Optional[DataGetResult]:
+    """解析 data get entity/block/storage 的输出"""
+    match = _STORAGE_PATTERN.match(text)
+    if match is not None:
+        return DataGetResult(target=match.group(1), kind="storage", value=parse_snbt(match.group(2)))
+    match = _DATA_PATTERN.match(text)
+    if match is not None:
+        return DataGetResult(target=match.group(1), kind=match.group(2), value=parse_snbt(match.group(3)))
+    return None
+
+
+_PARSERS: Dict[str, Callable[[str], Any]] = {
+    "list": _parse_list,
+    "score": _parse_score,
+    "data": _parse_data,
+    "snbt": parse_snbt,
+}
+
+
+def register_parser(name: str, parser: Callable[[str], Any]):
+    """
+    注册响应解析器
+    
+    解析器接收响应文本，返回解析结果；文本格式不匹配时应返回 None。
+    同名解析器会被覆盖，可用于适配修改过命令输出的服务端
+    
+    Args:
+        name: 解析器名称
+        parser: 解析函数
+        
+    Example:
+        >>> pattern = re.compile(r"The time is (\\d+)")
+        >>> register_parser("time", lambda text: int(m.group(1)) if (m := pattern.match(text)) else None)
+        >>> ticks = parse_response("time", (await rcon.execute("time query gametime")).response)
+    """
+    _PARSERS[name] = parser
+
+
+def parse_response(name: str, text: str) -> Any:
+    """
+    使用已注册的解析器解析响应文本
+    
+    Args:
+        name: 解析器名称（内置 list、score、data、snbt）
+        text: 响应文本
+        
+    Returns:
+        解析结果，格式不匹配时为 None
+        
+    Raises:
+        KeyError: 解析器未注册
+    """
+    return _PARSERS[name](text)
+
+
 class RconClient:
     """
     RCON 客户端
@@ -64,6 +336,31 @@ class RconClient:
         """
         pass
     
+    async def stream(self, command: str) -> AsyncIterator[str]:
+        """
+        执行命令并以异步迭代器的形式逐段返回响应
+        
+        支持分片重组的实现会在每个响应分片到达时产出文本；
+        默认实现等待完整响应后一次性产出
+        
+        Args:
+            command: Minecraft 命令
+            
+        Yields:
+            响应文本片段
+            
+        Raises:
+            ConnectionError: 命令执行失败
+            
+        Example:
+            >>> async for part in rcon.stream("data get entity Steve"):
+            ...     parser.feed(part)
+        """
+        response = await self.execute(command)
+        if not response.success:
+            raise ConnectionError(response.error or f"RCON 命令执行失败: {command}")
+        yield response.response
+    
     def is_connected(self) -> bool:
         """
         检查连接状态
@@ -315,4 +612,723 @@ class RconClient:
             执行结果
         """
         return await self.execute("stop")
+    
+    # ========== 解析结果 ==========
+    
+    async def list_players(self, uuids: bool = False) -> Optional[PlayerList]:
+        """
+        获取在线玩家列表
+        
+        Args:
+            uuids: 是否同时获取玩家 UUID（list uuids）
+            
+        Returns:
+            玩家列表，命令失败或输出无法识别时为 None
+            
+        Example:
+            >>> players = await rcon.list_players()
+            >>> print(f"{players.online}/{players.max_players}: {players.players}")
+        """
+        response = await self.execute("list uuids" if uuids else "list")
+        return _parse_list(response.response) if response.success else None
+    
+    async def get_score(self, target: str, objective: str) -> Optional[int]:
+        """
+        获取计分板分数
+        
+        Args:
+            target: 玩家名称或分数持有者
+            objective: 计分项名称
+            
+        Returns:
+            分数，命令失败或未设置分数时为 None
+        """
+        response = await self.execute(f"scoreboard players get {target} {objective}")
+        if not response.success:
+            return None
+        result = _parse_score(response.response)
+        return result.value if result is not None else None
+    
+    async def data_get(self, target: str, path: Optional[str] = None, kind: str = "entity") -> Any:
+        """
+        读取实体、方块或命令存储的 NBT 数据
+        
+        Args:
+            target: 实体选择器/玩家名称、方块坐标（"x y z"）或存储 ID
+            path: NBT 路径（可选）
+            kind: entity、block 或 storage
+            
+        Returns:
+            解析后的 SNBT 值，目标不存在或路径无匹配时为 None
+            
+        Example:
+            >>> health = await rcon.data_get("Steve", "Health")
+            >>> pos = await rcon.data_get("Steve", "Pos")
+        """
+        command = f"data get {kind} {target}"
+        if path:
+            command += f" {path}"
+        response = await self.execute(command)
+        if not response.success:
+            return None
+        try:
+            result = _parse_data(response.response)
+        except ValueError:
+            return None
+        return result.value if result is not None else None
+
+
+
+# ========== 数据包编解码 ==========
+
+def _encode_packet(request_id: int, packet_type: int, payload) -> bytes:
+    """
+    编码 RCON 数据包
+    
+    格式: 长度(int32) + 请求 ID(int32) + 类型(int32) + 负载 + 两个空字节
+    负载可以是字符串（按 UTF-8 编码）或已编码的字节
+    """
+    body = payload.encode("utf-8") if isinstance(payload, str) else payload
+    return _HEADER.pack(len(body) + 10, request_id, packet_type) + body + b"\x00\x00"
+
+
+async def _read_packet(reader: asyncio.StreamReader) -> tuple:
+    """
+    读取一个 RCON 数据包
+    
+    Returns:
+        (请求 ID, 类型, 负载字节)
+    """
+    size, = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    if size < 10:
+        raise ConnectionError(f"无效的 RCON 数据包长度: {size}")
+    data = await reader.readexactly(size)
+    request_id, packet_type = struct.unpack_from("<ii", data)
+    return request_id, packet_type, data[8:-2]
+
+
+# ========== 响应重组 ==========
+
+class _ResponseBuffer:
+    """
+    预分配、按倍数扩容的响应缓冲区
+    
+    多包响应的分片直接复制到同一块内存中，避免逐片拼接字符串带来的二次方开销；
+    分片边界可能切断多字节 UTF-8 字符，因此只在重组完成后统一解码
+    """
+    
+    __slots__ = ("_data", "_length")
+    
+    def __init__(self, capacity: int = RCON_MAX_PAYLOAD):
+        self._data = bytearray(capacity)
+        self._length = 0
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def append(self, chunk: bytes):
+        """追加一个分片，容量不足时按倍数扩容"""
+        end = self._length + len(chunk)
+        if end > len(self._data):
+            self._data.extend(bytes(max(end, len(self._data) * 2) - len(self._data)))
+        self._data[self._length:end] = chunk
+        self._length = end
+    
+    def decode(self) -> str:
+        """解码已接收的全部内容"""
+        with memoryview(self._data) as view:
+            return str(view[:self._length], "utf-8", errors="replace")
+
 
+class _PendingCommand:
+    """等待响应的命令：普通模式收集到缓冲区，流式模式逐片放入队列"""
+    
+    __slots__ = ("request_id", "sentinel_id", "future", "buffer", "queue", "decoder")
+    
+    def __init__(self, request_id: int, sentinel_id: Optional[int], streaming: bool):
+        self.request_id = request_id
+        self.sentinel_id = sentinel_id
+        if streaming:
+            self.future = None
+            self.buffer = None
+            self.queue: Optional[asyncio.Queue] = asyncio.Queue()
+            self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        else:
+            self.future = asyncio.get_running_loop().create_future()
+            self.buffer: Optional[_ResponseBuffer] = None
+            self.queue = None
+            self.decoder = None
+    
+    def feed(self, chunk: bytes):
+        """接收一个响应分片"""
+        if self.queue is not None:
+            text = self.decoder.decode(chunk)
+            if text:
+                self.queue.put_nowait(text)
+        else:
+            if self.buffer is None:
+                self.buffer = _ResponseBuffer()
+            self.buffer.append(chunk)
+    
+    def complete(self):
+        """响应接收完毕"""
+        if self.queue is not None:
+            tail = self.decoder.decode(b"", final=True)
+            if tail:
+                self.queue.put_nowait(tail)
+            self.queue.put_nowait(None)
+        elif not self.future.done():
+            self.future.set_result(RconResponse(
+                success=True,
+                response=self.buffer.decode() if self.buffer is not None else "",
+                request_id=self.request_id
+            ))
+    
+    def fail(self, error: str):
+        """连接中断等原因导致响应无法完成"""
+        if self.queue is not None:
+            self.queue.put_nowait(ConnectionError(error))
+        elif not self.future.done():
+            self.future.set_result(RconResponse(success=False, error=error, request_id=self.request_id))
+
+
+# ========== 流水线客户端 ==========
+
+class PipelinedRconClient(RconClient):
+    """
+    流水线 RCON 客户端
+    
+    纯 asyncio 实现的 Source RCON 客户端。命令数据包连续写入同一个套接字，
+    后台读取任务按请求 ID 把响应交给对应的等待者，因此 execute_batch
+    以及多个插件的并发 execute 不必逐条等待一次完整往返。
+    
+    服务器按接收顺序逐条执行同一连接上的命令，批量命令的执行顺序保持不变。
+    
+    超过 4096 字节的响应（如 data get entity、help）会被服务器拆分为多个同 ID 的数据包。
+    fragmented_responses=True 时每条命令后紧跟一个空的哨兵数据包：
+    服务器按顺序处理，哨兵的响应到达即表示前一条命令的所有分片都已收到。
+    
+    Example:
+        >>> rcon = PipelinedRconClient("localhost", 25575, "password")
+        >>> await rcon.connect()
+        >>> responses = await rcon.execute_batch([f"say {i}" for i in range(500)])
+    """
+    
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 25575,
+        password: str = "",
+        timeout: float = 10.0,
+        max_in_flight: int = 256,
+        fragmented_responses: bool = True
+    ):
+        """
+        构造函数
+        
+        Args:
+            host: 服务器地址
+            port: RCON 端口
+            password: RCON 密码
+            timeout: 连接和单条命令的超时时间（秒）
+            max_in_flight: execute_batch 每一轮最多连续写入的命令数量
+            fragmented_responses: 是否使用哨兵数据包重组多包响应；
+                关闭后每条命令只取第一个响应数据包
+        """
+        self._host = host
+        self._port = port
+        self._password = password
+        self._timeout = timeout
+        self._max_in_flight = max(1, max_in_flight)
+        self._fragmented = fragmented_responses
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._drain_lock: Optional[asyncio.Lock] = None
+        self._pending: Dict[int, _PendingCommand] = {}
+        self._sentinels: Dict[int, int] = {}
+        self._next_id = 0
+    
+    @property
+    def in_flight(self) -> int:
+        """已发送但尚未收到完整响应的命令数量"""
+        return len(self._pending)
+    
+    def is_connected(self) -> bool:
+        """检查连接状态"""
+        return self._writer is not None and not self._writer.is_closing()
+    
+    async def connect(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        password: Optional[str] = None
+    ):
+        """
+        连接并认证
+        
+        未指定的参数使用构造函数中的值
+        
+        Raises:
+            ConnectionError: 连接失败或认证失败
+        """
+        if self.is_connected():
+            return
+        
+        self._host = host if host is not None else self._host
+        self._port = port if port is not None else self._port
+        self._password = password if password is not None else self._password
+        
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self._host, self._port), self._timeout
+        )
+        
+        try:
+            auth_id = self._allocate_id()
+            writer.write(_encode_packet(auth_id, RCON_PACKET_AUTH, self._password))
+            await writer.drain()
+            
+            # Source 服务器会在认证响应之前先发送一个空的命令响应
+            while True:
+                request_id, packet_type, _ = await asyncio.wait_for(
+                    _read_packet(reader), self._timeout
+                )
+                if packet_type == RCON_PACKET_AUTH_RESPONSE:
+                    break
+            
+            if request_id == -1:
+                raise ConnectionError("RCON 认证失败")
+        except BaseException:
+            writer.close()
+            raise
+        
+        self._reader = reader
+        self._writer = writer
+        self._drain_lock = asyncio.Lock()
+        self._read_task = asyncio.ensure_future(self._read_loop(reader))
+    
+    async def disconnect(self):
+        """断开连接，尚未完成的命令会以失败结果返回"""
+        task, self._read_task = self._read_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._close("RCON 连接已关闭")
+    
+    async def execute(self, command: str) -> RconResponse:
+        """
+        执行单条命令
+        
+        并发调用时命令直接写入套接字，不等待其他命令的响应
+        """
+        if not self.is_connected():
+            return RconResponse(success=False, error="RCON 未连接")
+        
+        pending = self._register()
+        try:
+            self._writer.write(self._encode_command(pending, command))
+            await self._drain()
+            return await asyncio.wait_for(pending.future, self._timeout)
+        except asyncio.TimeoutError:
+            return RconResponse(success=False, error=f"RCON 命令超时: {command}", request_id=pending.request_id)
+        except (ConnectionError, OSError) as ex:
+            return RconResponse(success=False, error=str(ex) or "RCON 连接已断开", request_id=pending.request_id)
+        finally:
+            self._forget(pending)
+    
+    async def execute_batch(self, commands: List[str]) -> List[RconResponse]:
+        """
+        批量执行命令
+        
+        每一轮把最多 max_in_flight 条命令的数据包合并为一次写入，再按顺序收集响应
+        """
+        results: List[RconResponse] = []
+        for start in range(0, len(commands), self._max_in_flight):
+            window = commands[start:start + self._max_in_flight]
+            if not self.is_connected():
+                results.extend(RconResponse(success=False, error="RCON 未连接") for _ in window)
+                continue
+            results.extend(await self._execute_window(window))
+        return results
+    
+    async def stream(self, command: str) -> AsyncIterator[str]:
+        """
+        执行命令并在响应分片到达时逐段产出文本
+        
+        适合 data get entity 等超大输出的增量解析。无论 fragmented_responses
+        如何设置，流式调用总会发送哨兵数据包来确定响应结束
+        
+        Args:
+            command: Minecraft 命令
+            
+        Yields:
+            已解码的响应文本片段
+            
+        Raises:
+            ConnectionError: 未连接或连接中断
+            asyncio.TimeoutError: 等待下一个分片超时
+            
+        Example:
+            >>> parts = []
+            >>> async for part in rcon.stream("data get entity @e[limit=1]"):
+            ...     parts.append(part)
+        """
+        if not self.is_connected():
+            raise ConnectionError("RCON 未连接")
+        
+        pending = self._register(streaming=True)
+        try:
+            self._writer.write(self._encode_command(pending, command))
+            await self._drain()
+            while True:
+                item = await asyncio.wait_for(pending.queue.get(), self._timeout)
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self._forget(pending)
+    
+    # ========== 内部实现 ==========
+    
+    async def _execute_window(self, commands: List[str]) -> List[RconResponse]:
+        """连续写入一组命令并等待全部响应"""
+        registered = [self._register() for _ in commands]
+        buffer = bytearray()
+        for pending, command in zip(registered, commands):
+            buffer += self._encode_command(pending, command)
+        
+        results: List[RconResponse] = []
+        try:
+            self._writer.write(bytes(buffer))
+            await self._drain()
+            
+            # 响应按顺序到达，因此每条命令的超时从上一条响应到达时开始计算
+            timed_out = False
+            for pending, command in zip(registered, commands):
+                try:
+                    if timed_out and not pending.future.done():
+                        raise asyncio.TimeoutError()
+                    results.append(await asyncio.wait_for(pending.future, self._timeout))
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    results.append(RconResponse(
+                        success=False, error=f"RCON 命令超时: {command}", request_id=pending.request_id
+                    ))
+        except (ConnectionError, OSError) as ex:
+            error = str(ex) or "RCON 连接已断开"
+            for pending in registered[len(results):]:
+                future = pending.future
+                results.append(
+                    future.result() if future.done() and not future.cancelled()
+                    else RconResponse(success=False, error=error, request_id=pending.request_id)
+                )
+        finally:
+            for pending in registered:
+                self._forget(pending)
+        return results
+    
+    @staticmethod
+    def _encode_command(pending: _PendingCommand, command: str) -> bytes:
+        """编码命令数据包，需要时在其后追加哨兵数据包"""
+        packet = _encode_packet(pending.request_id, RCON_PACKET_COMMAND, command)
+        if pending.sentinel_id is None:
+            return packet
+        # 原版服务器对未知类型的数据包回复 "Unknown request 0"，其到达即表示前一条命令已完整响应
+        return packet + _encode_packet(pending.sentinel_id, RCON_PACKET_RESPONSE, "")
+    
+    def _allocate_id(self) -> int:
+        """分配一个正的 int32 请求 ID（-1 保留给认证失败）"""
+        while True:
+            self._next_id = self._next_id % 0x7FFFFFFF + 1
+            if self._next_id not in self._pending and self._next_id not in self._sentinels:
+                return self._next_id
+    
+    def _register(self, streaming: bool = False) -> _PendingCommand:
+        """分配请求 ID（以及哨兵 ID）并登记等待响应的命令"""
+        request_id = self._allocate_id()
+        self._pending[request_id] = None
+        sentinel_id = None
+        if streaming or self._fragmented:
+            sentinel_id = self._allocate_id()
+            self._sentinels[sentinel_id] = request_id
+        pending = _PendingCommand(request_id, sentinel_id, streaming)
+        self._pending[request_id] = pending
+        return pending
+    
+    def _forget(self, pending: _PendingCommand):
+        """移除命令及其哨兵的登记"""
+        if self._pending.get(pending.request_id) is pending:
+            del self._pending[pending.request_id]
+        if pending.sentinel_id is not None and self._sentinels.get(pending.sentinel_id) == pending.request_id:
+            del self._sentinels[pending.sentinel_id]
+    
+    async def _drain(self):
+        """
+        等待写缓冲区排空（串行化以兼容旧版本 asyncio）
+        
+        Raises:
+            ConnectionError: 等待期间连接已被读取任务关闭
+        """
+        async with self._drain_lock:
+            # 排队等锁期间读取任务可能已经关闭连接并清空 _writer
+            writer = self._writer
+            if writer is None:
+                raise ConnectionError("RCON 连接已断开")
+            await writer.drain()
+    
+    async def _read_loop(self, reader: asyncio.StreamReader):
+        """后台读取任务：按请求 ID 分发响应分片，哨兵响应到达时完成对应命令"""
+        error = "RCON 连接已断开"
+        try:
+            while True:
+                request_id, _, payload = await _read_packet(reader)
+                
+                command_id = self._sentinels.pop(request_id, None)
+                if command_id is not None:
+                    pending = self._pending.pop(command_id, None)
+                    if pending is not None:
+                        pending.complete()
+                    continue
+                
+                pending = self._pending.get(request_id)
+                if pending is None:
+                    # 已超时被丢弃的命令，或认证阶段的残留数据包
+                    continue
+                pending.feed(payload)
+                if pending.sentinel_id is None:
+                    del self._pending[request_id]
+                    pending.complete()
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as ex:
+            if not isinstance(ex, asyncio.IncompleteReadError):
+                error = str(ex) or error
+        finally:
+            self._close(error)
+    
+    def _close(self, error: str):
+        """关闭套接字并让所有等待中的命令以失败结果返回"""
+        writer, self._writer = self._writer, None
+        self._reader = None
+        if writer is not None:
+            writer.close()
+        
+        pending, self._pending = self._pending, {}
+        self._sentinels = {}
+        for command in pending.values():
+            command.fail(error)
+
+
+# ========== 连接池 ==========
+
+class RconConnectionPool(RconClient):
+    """
+    RCON 连接池
+    
+    维护 N 个已认证的流水线连接，每条命令派发到当前待处理命令最少的连接，
+    一条缓慢的命令（如 data get entity）不会阻塞其他插件的 say/give/kick。
+    后台健康检查会探测每个连接，断开或无响应的连接会被透明地重新建立。
+    
+    execute_batch 的全部命令在同一个连接上执行，以保证执行顺序。
+    
+    Example:
+        >>> rcon = RconConnectionPool("localhost", 25575, "password", size=4)
+        >>> await rcon.connect()
+        >>> await rcon.kick("Steve", "AFK")
+    """
+    
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 25575,
+        password: str = "",
+        size: int = 4,
+        timeout: float = 10.0,
+        max_in_flight: int = 256,
+        health_check_interval: float = 30.0,
+        health_check_command: str = "list",
+        fragmented_responses: bool = True
+    ):
+        """
+        构造函数
+        
+        Args:
+            host: 服务器地址
+            port: RCON 端口
+            password: RCON 密码
+            size: 连接数量
+            timeout: 连接和单条命令的超时时间（秒）
+            max_in_flight: 每个连接 execute_batch 每一轮最多连续写入的数据包数量
+            health_check_interval: 健康检查间隔（秒），0 表示禁用
+            health_check_command: 健康检查时发送的探测命令
+            fragmented_responses: 是否使用哨兵数据包重组多包响应
+        """
+        self._timeout = timeout
+        self._health_check_interval = health_check_interval
+        self._health_check_command = health_check_command
+        self._clients: List[PipelinedRconClient] = [
+            PipelinedRconClient(host, port, password, timeout, max_in_flight, fragmented_responses)
+            for _ in range(max(1, size))
+        ]
+        self._reconnect_tasks: Dict[int, asyncio.Task] = {}
+        self._health_task: Optional[asyncio.Task] = None
+    
+    @property
+    def size(self) -> int:
+        """连接数量"""
+        return len(self._clients)
+    
+    @property
+    def connected_count(self) -> int:
+        """当前已连接的连接数量"""
+        return sum(1 for client in self._clients if client.is_connected())
+    
+    @property
+    def in_flight(self) -> int:
+        """所有连接上已发送但尚未收到响应的命令数量"""
+        return sum(client.in_flight for client in self._clients)
+    
+    def is_connected(self) -> bool:
+        """至少一个连接可用时返回 True"""
+        return any(client.is_connected() for client in self._clients)
+    
+    async def connect(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        password: Optional[str] = None
+    ):
+        """
+        建立所有连接并启动健康检查
+        
+        Raises:
+            ConnectionError: 没有任何连接建立成功
+        """
+        results = await asyncio.gather(
+            *(client.connect(host, port, password) for client in self._clients),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if len(errors) == len(self._clients):
+            raise ConnectionError(f"RCON 连接池建立失败: {errors[0]}")
+        
+        if self._health_check_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+    
+    async def disconnect(self):
+        """停止健康检查并断开所有连接"""
+        tasks = list(self._reconnect_tasks.values())
+        if self._health_task is not None:
+            tasks.append(self._health_task)
+        self._health_task = None
+        self._reconnect_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*(client.disconnect() for client in self._clients))
+    
+    async def execute(self, command: str) -> RconResponse:
+        """在当前负载最低的连接上执行命令"""
+        client = await self._acquire()
+        if client is None:
+            return RconResponse(success=False, error="RCON 未连接")
+        response = await client.execute(command)
+        if not response.success and not client.is_connected():
+            self._schedule_reconnect(client)
+        return response
+    
+    async def execute_batch(self, commands: List[str]) -> List[RconResponse]:
+        """在当前负载最低的单个连接上按顺序执行整批命令"""
+        client = await self._acquire()
+        if client is None:
+            return [RconResponse(success=False, error="RCON 未连接") for _ in commands]
+        responses = await client.execute_batch(commands)
+        if not client.is_connected():
+            self._schedule_reconnect(client)
+        return responses
+    
+    async def stream(self, command: str) -> AsyncIterator[str]:
+        """在当前负载最低的连接上执行命令并逐段返回响应"""
+        client = await self._acquire()
+        if client is None:
+            raise ConnectionError("RCON 未连接")
+        try:
+            async for part in client.stream(command):
+                yield part
+        finally:
+            if not client.is_connected():
+                self._schedule_reconnect(client)
+    
+    # ========== 内部实现 ==========
+    
+    def _least_loaded(self) -> Optional[PipelinedRconClient]:
+        """选择已连接且待处理命令最少的连接"""
+        best: Optional[PipelinedRconClient] = None
+        for client in self._clients:
+            if client.is_connected() and (best is None or client.in_flight < best.in_flight):
+                best = client
+        return best
+    
+    async def _acquire(self) -> Optional[PipelinedRconClient]:
+        """获取可用连接；全部断开时先尝试重连一次"""
+        client = self._least_loaded()
+        if client is not None:
+            return client
+        await asyncio.gather(
+            *(self._schedule_reconnect(client) for client in self._clients),
+            return_exceptions=True
+        )
+        return self._least_loaded()
+    
+    def _schedule_reconnect(self, client: PipelinedRconClient) -> asyncio.Task:
+        """在后台重连指定连接（同一连接同时只会有一个重连任务）"""
+        index = self._clients.index(client)
+        task = self._reconnect_tasks.get(index)
+        if task is None or task.done():
+            task = asyncio.ensure_future(self._reconnect(client))
+            self._reconnect_tasks[index] = task
+        return task
+    
+    async def _reconnect(self, client: PipelinedRconClient):
+        """重新建立指定连接"""
+        if client.is_connected():
+            return
+        await client.disconnect()
+        try:
+            await client.connect()
+        except (ConnectionError, OSError, asyncio.TimeoutError):
+            pass
+    
+    async def _health_loop(self):
+        """周期性探测每个连接，重建断开或无响应的连接"""
+        while True:
+            await asyncio.sleep(self._health_check_interval)
+            await asyncio.gather(
+                *(self._check(client) for client in self._clients),
+                return_exceptions=True
+            )
+    
+    async def _check(self, client: PipelinedRconClient):
+        """
+        探测单个连接
+        
+        有命令在途的连接不探测：探测命令可能排在慢命令之后超时，此时断开会让这些命令全部失败。
+        在途命令超时后会被移除，连接真正无响应时之后的检查仍会探测到
+        """
+        if client.is_connected():
+            if client.in_flight:
+                return
+            response = await client.execute(self._health_check_command)
+            if response.success:
+                return
+            if client.is_connected():
+                if client.in_flight:
+                    # 探测期间有新命令发出，连接正在被使用，留给下一轮检查
+                    return
+                await client.disconnect()
+        await self._schedule_reconnect(client)
@@ -0,0 +1,357 @@
+"""
+RCON 查询缓存
+
+为幂等查询命令提供按命令族 TTL 的读穿缓存，并在写命令经过时失效
+"""
+
+import asyncio
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple, Set
+from dataclasses import dataclass
+
+from .rcon import RconClient, RconResponse
+
+
+ALL_FAMILIES = "*"
+"""写命令失效全部命令族时使用的特殊族名"""
+
+DEFAULT_QUERY_FAMILIES: Dict[str, str] = {
+    "list": "players",
+    "scoreboard players get": "scoreboard",
+    "scoreboard players list": "scoreboard",
+    "scoreboard objectives list": "scoreboard",
+    "data get entity": "entity",
+    "data get block": "block",
+    "data get storage": "storage",
+    "time query": "time",
+    "whitelist list": "whitelist",
+    "banlist": "bans",
+    "seed": "seed",
+}
+"""默认可缓存的查询命令前缀 -> 命令族"""
+
+DEFAULT_WRITE_FAMILIES: Dict[str, Tuple[str, ...]] = {
+    "scoreboard players set": ("scoreboard",),
+    "scoreboard players add": ("scoreboard",),
+    "scoreboard players remove": ("scoreboard",),
+    "scoreboard players reset": ("scoreboard",),
+    "scoreboard players operation": ("scoreboard",),
+    "scoreboard players enable": ("scoreboard",),
+    "scoreboard objectives add": ("scoreboard",),
+    "scoreboard objectives remove": ("scoreboard",),
+    "data merge entity": ("entity",),
+    "data modify entity": ("entity",),
+    "data remove entity": ("entity",),
+    "data merge block": ("block",),
+    "data modify block": ("block",),
+    "data remove block": ("block",),
+    "data merge storage": ("storage",),
+    "data modify storage": ("storage",),
+    "data remove storage": ("storage",),
+    "tp": ("entity",),
+    "teleport": ("entity",),
+    "spreadplayers": ("entity",),
+    "kill": ("entity", "players"),
+    "give": ("entity",),
+    "clear": ("entity",),
+    "item": ("entity", "block"),
+    "loot": ("entity", "block"),
+    "summon": ("entity",),
+    "damage": ("entity",),
+    "ride": ("entity",),
+    "effect": ("entity",),
+    "enchant": ("entity",),
+    "attribute": ("entity",),
+    "tag": ("entity",),
+    "xp": ("entity",),
+    "experience": ("entity",),
+    "gamemode": ("entity", "players"),
+    "team": ("entity", "players", "scoreboard"),
+    "setblock": ("block",),
+    "fill": ("block",),
+    "clone": ("block",),
+    "time set": ("time",),
+    "time add": ("time",),
+    "kick": ("players",),
+    "ban": ("players", "bans"),
+    "ban-ip": ("players", "bans"),
+    "pardon": ("bans",),
+    "pardon-ip": ("bans",),
+    "whitelist add": ("whitelist",),
+    "whitelist remove": ("whitelist",),
+    "whitelist reload": ("whitelist",),
+    "execute": (ALL_FAMILIES,),
+    "function": (ALL_FAMILIES,),
+    "reload": (ALL_FAMILIES,),
+}
+"""默认写命令前缀 -> 需要失效的命令族"""
+
+DEFAULT_FAMILY_TTLS: Dict[str, float] = {
+    "players": 1.0,
+    "scoreboard": 1.0,
+    "entity": 0.5,
+    "block": 1.0,
+    "storage": 1.0,
+    "time": 1.0,
+    "whitelist": 5.0,
+    "bans": 5.0,
+    "seed": 3600.0,
+}
+"""默认各命令族的缓存时间（秒）"""
+
+
+def normalize_command(command: str) -> str:
+    """
+    规范化命令文本，作为缓存键
+    
+    去掉前导斜杠并把连续空白压缩为单个空格
+    """
+    command = command.strip()
+    if command.startswith("/"):
+        command = command[1:]
+    return " ".join(command.split())
+
+
+class _PrefixTable:
+    """按首个单词索引的命令前缀表，最长前缀优先"""
+    
+    def __init__(self, entries: Dict[str, object]):
+        self._index: Dict[str, List[Tuple[str, object]]] = {}
+        for prefix, value in entries.items():
+            prefix = normalize_command(prefix)
+            self._index.setdefault(prefix.split(" ", 1)[0], []).append((prefix, value))
+        for candidates in self._index.values():
+            candidates.sort(key=lambda item: len(item[0]), reverse=True)
+    
+    def lookup(self, normalized: str) -> Optional[object]:
+        """查找与命令匹配的最长前缀对应的值"""
+        candidates = self._index.get(normalized.split(" ", 1)[0])
+        if candidates:
+            for prefix, value in candidates:
+                if normalized == prefix or normalized.startswith(prefix + " "):
+                    return value
+        return None
+
+
+@dataclass
+class RconCacheStats:
+    """缓存统计"""
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    invalidations: int = 0
+
+
+class CachedRconClient(RconClient):
+    """
+    带读穿缓存的 RCON 客户端
+    
+    包装一个现有的 RCON 客户端，对 list、scoreboard players get、
+    data get entity、time query 等幂等查询按规范化命令文本缓存结果：
+    
+    - 每个命令族有独立的 TTL
+    - 相同命令的并发请求只发送一次，其余调用共享同一结果
+    - 修改同一命令族的写命令（如 scoreboard players set）经过时立即失效该族缓存
+    - 缓存项达到 max_entries 时先清除所有过期项，仍然过多时按写入顺序淘汰最早的项
+    
+    execute_batch 不读缓存，但批次中的写命令同样会触发失效。
+    
+    Example:
+        >>> rcon = CachedRconClient(rcon, family_ttls={"entity": 0.25})
+        >>> await rcon.execute("data get entity Steve Pos")  # 发送到服务器
+        >>> await rcon.execute("data get entity Steve Pos")  # 命中缓存
+    """
+    
+    def __init__(
+        self,
+        inner: RconClient,
+        family_ttls: Optional[Dict[str, float]] = None,
+        query_families: Optional[Dict[str, str]] = None,
+        write_families: Optional[Dict[str, Tuple[str, ...]]] = None,
+        max_entries: int = 4096
+    ):
+        """
+        构造函数
+        
+        Args:
+            inner: 实际执行命令的 RCON 客户端
+            family_ttls: 覆盖默认的命令族 TTL（秒），TTL 为 0 表示不缓存该族
+            query_families: 替换默认的查询命令前缀表
+            write_families: 替换默认的写命令前缀表
+            max_entries: 最多保留的缓存项数（按玩家区分的查询会产生大量不同的键）
+        """
+        self._inner = inner
+        self._ttls = dict(DEFAULT_FAMILY_TTLS)
+        if family_ttls:
+            self._ttls.update(family_ttls)
+        self._queries = _PrefixTable(
+            query_families if query_families is not None else DEFAULT_QUERY_FAMILIES
+        )
+        self._writes = _PrefixTable(
+            write_families if write_families is not None else DEFAULT_WRITE_FAMILIES
+        )
+        self._max_entries = max(1, max_entries)
+        self._entries: Dict[str, Tuple[float, str, RconResponse]] = {}
+        """命令 -> (过期时间, 命令族, 响应)，按写入顺序排列"""
+        self._family_keys: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._global_generation = 0
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        """命令 -> (命令族, 共享结果)"""
+        self.stats = RconCacheStats()
+    
+    @property
+    def inner(self) -> RconClient:
+        """被包装的 RCON 客户端"""
+        return self._inner
+    
+    def is_connected(self) -> bool:
+        """检查连接状态"""
+        return self._inner.is_connected()
+    
+    async def connect(self, *args, **kwargs):
+        """连接被包装的客户端"""
+        await self._inner.connect(*args, **kwargs)
+    
+    async def disconnect(self):
+        """断开被包装的客户端并清空缓存"""
+        self.invalidate()
+        await self._inner.disconnect()
+    
+    async def execute(self, command: str) -> RconResponse:
+        """执行命令，可缓存的查询优先从缓存返回"""
+        key = normalize_command(command)
+        
+        families = self._writes.lookup(key)
+        if families is not None:
+            self._invalidate_families(families)
+            try:
+                return await self._inner.execute(command)
+            finally:
+                self._invalidate_families(families)
+        
+        family = self._queries.lookup(key)
+        ttl = self._ttls.get(family, 0.0) if family is not None else 0.0
+        if ttl <= 0:
+            return await self._inner.execute(command)
+        
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.stats.hits += 1
+                return entry[2]
+            self._discard(key, family)
+        
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.stats.coalesced += 1
+            response = await asyncio.shield(pending[1])
+            if response is None:
+                # 发起请求的调用方被取消，本调用方没有被取消，重新发起请求
+                return await self.execute(command)
+            return response
+        
+        self.stats.misses += 1
+        generation = self._generation(family)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (family, future)
+        try:
+            response = await self._inner.execute(command)
+        except asyncio.CancelledError:
+            # 不取消共享的 future，否则所有合并等待的调用方都会收到 CancelledError
+            future.set_result(None)
+            raise
+        except BaseException as ex:
+            future.set_exception(ex)
+            # 没有共享等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            # 请求期间若该族被写命令失效，结果可能已过时，不写入缓存
+            if response.success and self._generation(family) == generation:
+                self._store(key, family, ttl, response)
+            return response
+        finally:
+            # 写命令可能已经把本请求移出，并有新的请求占用了该键
+            pending = self._in_flight.get(key)
+            if pending is not None and pending[1] is future:
+                del self._in_flight[key]
+    
+    async def execute_batch(self, commands: List[str]) -> List[RconResponse]:
+        """批量执行命令（不读缓存，批次中的写命令会失效对应命令族）"""
+        families: Set[str] = set()
+        for command in commands:
+            written = self._writes.lookup(normalize_command(command))
+            if written is not None:
+                families.update(written)
+        if not families:
+            return await self._inner.execute_batch(commands)
+        
+        self._invalidate_families(families)
+        try:
+            return await self._inner.execute_batch(commands)
+        finally:
+            self._invalidate_families(families)
+    
+    def invalidate(self, family: Optional[str] = None):
+        """
+        手动失效缓存
+        
+        Args:
+            family: 命令族名称，为空时清空全部缓存
+        """
+        self._invalidate_families((family or ALL_FAMILIES,))
+    
+    # ========== 内部实现 ==========
+    
+    def _generation(self, family: str) -> Tuple[int, int]:
+        """命令族当前的失效代数"""
+        return self._global_generation, self._generations.get(family, 0)
+    
+    def _invalidate_families(self, families):
+        """失效指定命令族的所有缓存项，并让之后的查询不再合并到写命令之前发出的请求"""
+        self.stats.invalidations += 1
+        if ALL_FAMILIES in families:
+            self._global_generation += 1
+            self._entries.clear()
+            self._family_keys.clear()
+            self._in_flight.clear()
+            return
+        if self._in_flight:
+            for key in [key for key, (family, _) in self._in_flight.items() if family in families]:
+                del self._in_flight[key]
+        for family in families:
+            self._generations[family] = self._generations.get(family, 0) + 1
+            for key in self._family_keys.pop(family, ()):
+                self._entries.pop(key, None)
+    
+    def _store(self, key: str, family: str, ttl: float, response: RconResponse):
+        """写入缓存项，达到上限时先清理"""
+        if len(self._entries) >= self._max_entries:
+            self._sweep()
+        self._entries[key] = (time.monotonic() + ttl, family, response)
+        self._family_keys.setdefault(family, set()).add(key)
+    
+    def _sweep(self):
+        """清除所有过期缓存项；仍然超过上限的 3/4 时按写入顺序淘汰最早的项，避免每次写入都要扫描"""
+        now = time.monotonic()
+        stale = [(key, family) for key, (expires, family, _) in self._entries.items() if expires <= now]
+        excess = len(self._entries) - len(stale) - self._max_entries * 3 // 4
+        if excess > 0:
+            stale.extend(itertools.islice(
+                ((key, family) for key, (expires, family, _) in self._entries.items() if expires > now),
+                excess
+            ))
+        for key, family in stale:
+            self._discard(key, family)
+    
+    def _discard(self, key: str, family: str):
+        """删除单个缓存项"""
+        self._entries.pop(key, None)
+        keys = self._family_keys.get(family)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._family_keys[family]
@@ -0,0 +1,278 @@
+"""
+RCON 服务器组
+
+把同一条命令或同一批命令并发发送到多台服务器，并按服务器汇总结果
+"""
+
+import asyncio
+from typing import Dict, Iterable, List, Optional
+from dataclasses import dataclass, field
+
+from .rcon import RconClient, RconResponse
+
+
+@dataclass
+class RconGroupResult:
+    """单条命令在服务器组上的执行结果"""
+    command: str = ""
+    responses: Dict[str, RconResponse] = field(default_factory=dict)
+    """服务器名称 -> 响应（超时或异常的服务器同样有一条失败响应）"""
+    
+    @property
+    def succeeded(self) -> List[str]:
+        """执行成功的服务器名称"""
+        return [name for name, response in self.responses.items() if response.success]
+    
+    @property
+    def failed(self) -> Dict[str, str]:
+        """执行失败的服务器名称 -> 错误信息"""
+        return {name: response.error for name, response in self.responses.items() if not response.success}
+    
+    @property
+    def all_succeeded(self) -> bool:
+        """是否所有服务器都执行成功"""
+        return all(response.success for response in self.responses.values())
+    
+    def __bool__(self) -> bool:
+        return self.all_succeeded
+
+
+@dataclass
+class RconGroupBatchResult:
+    """一批命令在服务器组上的执行结果"""
+    commands: List[str] = field(default_factory=list)
+    responses: Dict[str, List[RconResponse]] = field(default_factory=dict)
+    """服务器名称 -> 与 commands 一一对应的响应列表"""
+    
+    @property
+    def succeeded(self) -> List[str]:
+        """整批命令全部执行成功的服务器名称"""
+        return [
+            name for name, responses in self.responses.items()
+            if all(response.success for response in responses)
+        ]
+    
+    @property
+    def failed(self) -> Dict[str, str]:
+        """存在失败命令的服务器名称 -> 第一条错误信息"""
+        failed: Dict[str, str] = {}
+        for name, responses in self.responses.items():
+            for response in responses:
+                if not response.success:
+                    failed[name] = response.error
+                    break
+        return failed
+    
+    @property
+    def all_succeeded(self) -> bool:
+        """是否所有服务器的所有命令都执行成功"""
+        return not self.failed
+    
+    def __bool__(self) -> bool:
+        return self.all_succeeded
+
+
+class RconGroup:
+    """
+    RCON 服务器组
+    
+    每台服务器使用各自的 RconClient（可以是流水线客户端、连接池或其他包装），
+    命令并发发送到所有服务器，每台服务器单独计算超时，
+    一台服务器超时或断开不会影响其他服务器的结果。
+    
+    Example:
+        >>> group = RconGroup(timeout=3.0)
+        >>> group.add("lobby", RconConnectionPool("10.0.0.1", 25575, "pw"))
+        >>> for i in range(1, 7):
+        ...     group.add(f"game{i}", PipelinedRconClient("10.0.0.2", 25575 + i, "pw"))
+        >>> await group.connect()
+        >>> result = await group.execute("say 服务器将在 5 分钟后重启")
+        >>> for name, error in result.failed.items():
+        ...     self.logger.warning(f"{name} 广播失败: {error}")
+    """
+    
+    def __init__(self, clients: Optional[Dict[str, RconClient]] = None, timeout: float = 10.0):
+        """
+        构造函数
+        
+        Args:
+            clients: 服务器名称 -> RCON 客户端
+            timeout: 默认的单台服务器超时时间（秒）
+        """
+        self._timeout = timeout
+        self._clients: Dict[str, RconClient] = {}
+        self._timeouts: Dict[str, float] = {}
+        for name, client in (clients or {}).items():
+            self.add(name, client)
+    
+    @property
+    def names(self) -> List[str]:
+        """服务器名称列表"""
+        return list(self._clients)
+    
+    def __len__(self) -> int:
+        return len(self._clients)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._clients
+    
+    def __getitem__(self, name: str) -> RconClient:
+        return self._clients[name]
+    
+    def add(self, name: str, client: RconClient, timeout: Optional[float] = None):
+        """
+        添加服务器
+        
+        Args:
+            name: 服务器名称
+            client: RCON 客户端
+            timeout: 该服务器的超时时间（秒），None 使用默认值
+        """
+        self._clients[name] = client
+        if timeout is not None:
+            self._timeouts[name] = timeout
+        else:
+            self._timeouts.pop(name, None)
+    
+    def remove(self, name: str) -> Optional[RconClient]:
+        """
+        移除服务器（不会断开其连接）
+        
+        Returns:
+            被移除的客户端，不存在时为 None
+        """
+        self._timeouts.pop(name, None)
+        return self._clients.pop(name, None)
+    
+    def is_connected(self) -> Dict[str, bool]:
+        """
+        检查各服务器的连接状态
+        
+        Returns:
+            服务器名称 -> 是否已连接
+        """
+        return {name: client.is_connected() for name, client in self._clients.items()}
+    
+    async def connect(self) -> Dict[str, str]:
+        """
+        并发连接所有服务器
+        
+        各客户端使用自身构造时的地址和密码
+        
+        Returns:
+            连接失败的服务器名称 -> 错误信息（全部成功时为空）
+        """
+        names = list(self._clients)
+        results = await asyncio.gather(
+            *(self._with_timeout(name, self._clients[name].connect()) for name in names),
+            return_exceptions=True
+        )
+        return {
+            name: str(result) or type(result).__name__
+            for name, result in zip(names, results)
+            if isinstance(result, Exception)
+        }
+    
+    async def disconnect(self):
+        """断开所有服务器"""
+        await asyncio.gather(
+            *(client.disconnect() for client in self._clients.values()),
+            return_exceptions=True
+        )
+    
+    async def execute(self, command: str, servers: Optional[Iterable[str]] = None) -> RconGroupResult:
+        """
+        在多台服务器上并发执行同一条命令
+        
+        Args:
+            command: Minecraft 命令
+            servers: 目标服务器名称，None 表示全部
+            
+        Returns:
+            按服务器汇总的执行结果
+            
+        Raises:
+            KeyError: 指定了不存在的服务器
+        """
+        names = self._select(servers)
+        results = await asyncio.gather(
+            *(self._with_timeout(name, self._clients[name].execute(command)) for name in names),
+            return_exceptions=True
+        )
+        return RconGroupResult(
+            command=command,
+            responses={
+                name: self._to_response(name, result)
+                for name, result in zip(names, results)
+            }
+        )
+    
+    async def execute_batch(
+        self,
+        commands: List[str],
+        servers: Optional[Iterable[str]] = None
+    ) -> RconGroupBatchResult:
+        """
+        在多台服务器上并发执行同一批命令
+        
+        每台服务器内部仍按顺序执行，超时时间作用于整批命令
+        
+        Args:
+            commands: 命令列表
+            servers: 目标服务器名称，None 表示全部
+            
+        Returns:
+            按服务器汇总的执行结果
+            
+        Raises:
+            KeyError: 指定了不存在的服务器
+        """
+        names = self._select(servers)
+        results = await asyncio.gather(
+            *(self._with_timeout(name, self._clients[name].execute_batch(commands)) for name in names),
+            return_exceptions=True
+        )
+        responses: Dict[str, List[RconResponse]] = {}
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                failure = self._to_response(name, result)
+                responses[name] = [failure for _ in commands]
+            else:
+                responses[name] = result
+        return RconGroupBatchResult(commands=list(commands), responses=responses)
+    
+    async def say(self, message: str, servers: Optional[Iterable[str]] = None) -> RconGroupResult:
+        """
+        向多台服务器广播聊天消息
+        
+        Args:
+            message: 消息内容
+            servers: 目标服务器名称，None 表示全部
+        """
+        return await self.execute(f"say {message}", servers)
+    
+    # ========== 内部实现 ==========
+    
+    def _select(self, servers: Optional[Iterable[str]]) -> List[str]:
+        """解析目标服务器名称"""
+        if servers is None:
+            return list(self._clients)
+        names = list(servers)
+        for name in names:
+            if name not in self._clients:
+                raise KeyError(f"未知的服务器: {name}")
+        return names
+    
+    async def _with_timeout(self, name: str, awaitable):
+        """按服务器的超时时间等待"""
+        return await asyncio.wait_for(awaitable, self._timeouts.get(name, self._timeout))
+    
+    def _to_response(self, name: str, result) -> RconResponse:
+        """把超时或异常转换为失败响应"""
+        if isinstance(result, RconResponse):
+            return result
+        if isinstance(result, asyncio.TimeoutError):
+            return RconResponse(success=False, error=f"服务器 {name} 响应超时")
+        if isinstance(result, BaseException):
+            return RconResponse(success=False, error=f"服务器 {name} 执行失败: {result}")
+        return RconResponse(success=False, error=f"服务器 {name} 返回了无效结果")
@@ -0,0 +1,324 @@
+"""
+RCON 优先级通道
+
+按优先级分道排队，并用令牌桶限制每 tick 发送的命令数量
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Deque, Dict, List, Optional
+
+from .rcon import RconClient, RconResponse
+
+
+TICKS_PER_SECOND = 20
+"""服务器每秒的 tick 数"""
+
+
+class RconPriority(IntEnum):
+    """RCON 命令优先级（数字越小越先发送）"""
+    ADMIN = 0  # 管理/处罚命令：kick、ban、op 等
+    INTERACTIVE = 1  # 交互命令：玩家触发的 say、give、tp 等
+    BULK = 2  # 批量/后台命令：排行榜刷新、音乐播放等
+
+
+DEFAULT_ADMIN_COMMANDS = (
+    "kick", "ban", "ban-ip", "pardon", "pardon-ip", "op", "deop",
+    "whitelist", "stop", "save-all", "save-off", "save-on",
+)
+"""默认归入 ADMIN 通道的命令"""
+
+
+@dataclass
+class RconLaneStats:
+    """单个优先级通道的统计"""
+    queue_depth: int = 0
+    enqueued: int = 0
+    dispatched: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    p99_wait: float = 0.0
+    
+    @property
+    def average_wait(self) -> float:
+        """平均排队时间（秒）"""
+        return self.total_wait / self.dispatched if self.dispatched else 0.0
+
+
+class _Lane:
+    """优先级通道：FIFO 队列和等待时间样本"""
+    
+    def __init__(self, sample_size: int):
+        self.queue: Deque[tuple] = deque()
+        self.samples: Deque[float] = deque(maxlen=sample_size)
+        self.enqueued = 0
+        self.dispatched = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def record(self, wait: float):
+        """记录一次出队的排队时间"""
+        self.dispatched += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+        self.samples.append(wait)
+    
+    def snapshot(self) -> RconLaneStats:
+        """生成统计快照"""
+        p99 = 0.0
+        if self.samples:
+            ordered = sorted(self.samples)
+            p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return RconLaneStats(
+            queue_depth=len(self.queue),
+            enqueued=self.enqueued,
+            dispatched=self.dispatched,
+            total_wait=self.total_wait,
+            max_wait=self.max_wait,
+            p99_wait=p99
+        )
+
+
+class _TokenBucket:
+    """令牌桶"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._last = time.monotonic()
+    
+    async def acquire(self):
+        """取出一个令牌，令牌不足时等待补充"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self.tokens) / self.rate)
+    
+    def release(self):
+        """归还一个未使用的令牌"""
+        self.tokens = min(self.capacity, self.tokens + 1.0)
+
+
+class PriorityRconClient(RconClient):
+    """
+    优先级 RCON 客户端
+    
+    包装一个现有的 RCON 客户端，命令按 ADMIN / INTERACTIVE / BULK
+    三个通道排队，调度器始终先发送高优先级通道中的命令，并按
+    commands_per_tick 的预算（令牌桶）限速，批量任务不会挤占 kick 或 ban。
+    
+    每个通道的队列深度和排队时间可通过 lane_stats() 获取，用于对照 MSPT 调整预算。
+    
+    Example:
+        >>> rcon = PriorityRconClient(rcon, commands_per_tick=10)
+        >>> await rcon.kick("Griefer")                   # 自动归入 ADMIN 通道
+        >>> bulk = rcon.lane(RconPriority.BULK)
+        >>> await bulk.execute_batch(leaderboard_commands)
+        >>> print(rcon.lane_stats()[RconPriority.BULK].p99_wait)
+    """
+    
+    def __init__(
+        self,
+        inner: RconClient,
+        commands_per_tick: float = 20,
+        burst: Optional[float] = None,
+        admin_commands=DEFAULT_ADMIN_COMMANDS,
+        sample_size: int = 1024
+    ):
+        """
+        构造函数
+        
+        Args:
+            inner: 实际执行命令的 RCON 客户端
+            commands_per_tick: 每 tick 允许发送的命令数，0 表示不限速
+            burst: 令牌桶容量，默认等于 commands_per_tick
+            admin_commands: 默认归入 ADMIN 通道的命令名
+            sample_size: 计算 p99 排队时间时保留的最近样本数
+        """
+        self._inner = inner
+        self._admin_commands = frozenset(admin_commands)
+        self._lanes: Dict[RconPriority, _Lane] = {
+            priority: _Lane(sample_size) for priority in RconPriority
+        }
+        self._bucket: Optional[_TokenBucket] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: set = set()
+        self.set_budget(commands_per_tick, burst)
+    
+    @property
+    def inner(self) -> RconClient:
+        """被包装的 RCON 客户端"""
+        return self._inner
+    
+    def set_budget(self, commands_per_tick: float, burst: Optional[float] = None):
+        """
+        调整每 tick 的命令预算
+        
+        Args:
+            commands_per_tick: 每 tick 允许发送的命令数，0 表示不限速
+            burst: 令牌桶容量，默认等于 commands_per_tick
+        """
+        if commands_per_tick <= 0:
+            self._bucket = None
+            return
+        capacity = max(1.0, burst if burst is not None else commands_per_tick)
+        self._bucket = _TokenBucket(commands_per_tick * TICKS_PER_SECOND, capacity)
+    
+    def lane_stats(self) -> Dict[RconPriority, RconLaneStats]:
+        """获取每个通道的统计快照"""
+        return {priority: lane.snapshot() for priority, lane in self._lanes.items()}
+    
+    def lane(self, priority: RconPriority) -> RconClient:
+        """
+        获取固定使用指定通道的客户端视图
+        
+        便于把整个客户端交给音乐播放、排行榜刷新等后台任务
+        """
+        return _LaneView(self, priority)
+    
+    def classify(self, command: str) -> RconPriority:
+        """按命令名确定默认优先级"""
+        name = command.lstrip().lstrip("/").split(" ", 1)[0].lower()
+        return RconPriority.ADMIN if name in self._admin_commands else RconPriority.INTERACTIVE
+    
+    def is_connected(self) -> bool:
+        """检查连接状态"""
+        return self._inner.is_connected()
+    
+    async def connect(self, *args, **kwargs):
+        """连接被包装的客户端"""
+        await self._inner.connect(*args, **kwargs)
+    
+    async def disconnect(self):
+        """停止调度器，排队中的命令以失败结果返回，然后断开被包装的客户端"""
+        dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher is not None:
+            dispatcher.cancel()
+            await asyncio.gather(dispatcher, return_exceptions=True)
+        for lane in self._lanes.values():
+            while lane.queue:
+                _, future, _ = lane.queue.popleft()
+                if not future.done():
+                    future.set_result(RconResponse(success=False, error="RCON 连接已关闭"))
+        await self._inner.disconnect()
+    
+    async def execute(self, command: str, priority: Optional[RconPriority] = None) -> RconResponse:
+        """
+        排队执行单条命令
+        
+        Args:
+            command: Minecraft 命令
+            priority: 优先级，默认按命令名分类
+        """
+        if priority is None:
+            priority = self.classify(command)
+        return await self._submit(priority, command)
+    
+    async def execute_batch(
+        self,
+        commands: List[str],
+        priority: RconPriority = RconPriority.BULK
+    ) -> List[RconResponse]:
+        """
+        排队执行一批命令（默认使用 BULK 通道，按顺序出队）
+        
+        Args:
+            commands: 命令列表
+            priority: 优先级
+        """
+        futures = [self._submit(priority, command) for command in commands]
+        return list(await asyncio.gather(*futures))
+    
+    # ========== 调度 ==========
+    
+    def _submit(self, priority: RconPriority, command: str) -> asyncio.Future:
+        """把命令加入通道并唤醒调度器"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        lane = self._lanes[priority]
+        lane.queue.append((command, future, time.monotonic()))
+        lane.enqueued += 1
+        
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch_loop())
+        return future
+    
+    def _next_lane(self) -> Optional[_Lane]:
+        """返回优先级最高的非空通道，顺带丢弃队首已完成（调用方已取消）的命令"""
+        for priority in RconPriority:
+            queue = self._lanes[priority].queue
+            while queue and queue[0][1].done():
+                queue.popleft()
+            if queue:
+                return self._lanes[priority]
+        return None
+    
+    async def _dispatch_loop(self):
+        """调度循环：取令牌后发送最高优先级通道队首的命令"""
+        while True:
+            if self._next_lane() is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            
+            # 等待令牌期间可能有更高优先级的命令到达，因此取令牌后再选择通道
+            lane = self._next_lane()
+            if lane is None:
+                # 等待期间队列中的命令都被取消了
+                if self._bucket is not None:
+                    self._bucket.release()
+                continue
+            command, future, enqueued_at = lane.queue.popleft()
+            lane.record(time.monotonic() - enqueued_at)
+            
+            task = asyncio.ensure_future(self._run(command, future))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+    
+    async def _run(self, command: str, future: asyncio.Future):
+        """通过被包装的客户端执行命令并回填结果"""
+        try:
+            response = await self._inner.execute(command)
+        except Exception as ex:
+            response = RconResponse(success=False, error=str(ex))
+        if not future.done():
+            future.set_result(response)
+
+
+class _LaneView(RconClient):
+    """固定使用某个优先级通道的客户端视图"""
+    
+    def __init__(self, owner: PriorityRconClient, priority: RconPriority):
+        self._owner = owner
+        self._priority = priority
+    
+    def is_connected(self) -> bool:
+        return self._owner.is_connected()
+    
+    async def connect(self, *args, **kwargs):
+        await self._owner.connect(*args, **kwargs)
+    
+    async def disconnect(self):
+        await self._owner.disconnect()
+    
+    async def execute(self, command: str) -> RconResponse:
+        return await self._owner.execute(command, self._priority)
+    
+    async def execute_batch(self, commands: List[str]) -> List[RconResponse]:
+        return await self._owner.execute_batch(commands, self._priority)
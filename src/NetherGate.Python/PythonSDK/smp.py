@@ -4,7 +4,9 @@ SMP (Server Management Protocol) API
 提供服务器管理协议功能，包括白名单、封禁、玩家管理等
 """
 
-from typing import List, Dict, Optional, Any
+import asyncio
+import json
+from typing import List, Dict, Optional, Any, Callable, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -16,6 +18,15 @@ class PlayerDto:
     """玩家数据传输对象"""
     uuid: str
     name: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 SMP 协议的 JSON 对象"""
+        return {"name": self.name, "uuid": self.uuid}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlayerDto":
+        """从 SMP 协议的 JSON 对象创建"""
+        return cls(uuid=data.get("uuid") or "", name=data.get("name") or "")
 
 
 @dataclass
@@ -27,6 +38,28 @@ class UserBanDto:
     source: str
     expires: Optional[str] = None
     reason: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 SMP 协议的 JSON 对象"""
+        return {
+            "player": {"name": self.name, "uuid": self.uuid},
+            "reason": self.reason,
+            "expires": self.expires,
+            "source": self.source,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UserBanDto":
+        """从 SMP 协议的 JSON 对象创建"""
+        player = data.get("player") or {}
+        return cls(
+            uuid=player.get("uuid") or "",
+            name=player.get("name") or "",
+            created=data.get("created") or "",
+            source=data.get("source") or "",
+            expires=data.get("expires"),
+            reason=data.get("reason")
+        )
 
 
 @dataclass
@@ -37,6 +70,21 @@ class IpBanDto:
     source: str
     expires: Optional[str] = None
     reason: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 SMP 协议的 JSON 对象"""
+        return {"ip": self.ip, "reason": self.reason, "expires": self.expires, "source": self.source}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IpBanDto":
+        """从 SMP 协议的 JSON 对象创建"""
+        return cls(
+            ip=data.get("ip") or "",
+            created=data.get("created") or "",
+            source=data.get("source") or "",
+            expires=data.get("expires"),
+            reason=data.get("reason")
+        )
 
 
 @dataclass
@@ -46,6 +94,25 @@ class OperatorDto:
     name: str
     level: int = 4
     bypass_player_limit: bool = False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 SMP 协议的 JSON 对象"""
+        return {
+            "player": {"name": self.name, "uuid": self.uuid},
+            "level": self.level,
+            "bypassPlayerLimit": self.bypass_player_limit,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OperatorDto":
+        """从 SMP 协议的 JSON 对象创建"""
+        player = data.get("player") or {}
+        return cls(
+            uuid=player.get("uuid") or "",
+            name=player.get("name") or "",
+            level=data.get("level", 4),
+            bypass_player_limit=data.get("bypassPlayerLimit", False)
+        )
 
 
 class ServerState(Enum):
@@ -64,6 +131,15 @@ class TypedRule:
     type: str  # "boolean", "integer", etc.
 
 
+class SmpError(Exception):
+    """SMP 服务器返回的 JSON-RPC 错误"""
+    
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
 # ========== SMP API ==========
 
 class SmpApi:
@@ -71,9 +147,86 @@ class SmpApi:
     SMP (Server Management Protocol) API
     
     提供服务器管理功能的高级接口
-    注意：这是一个接口类，实际实现由 C# 桥接提供
+    注意：这是一个接口类，实际实现为 BridgedSmpApi（由 C# 桥接注入）或 SmpClient（直接连接）
     """
     
+    async def invoke(self, method: str, params: Any = None) -> Any:
+        """
+        调用任意 SMP 方法
+        
+        Args:
+            method: 方法名（如 "allowlist/add"）
+            params: 方法参数（JSON 兼容的值）
+            
+        Returns:
+            方法返回的 JSON 结果
+            
+        Raises:
+            NotImplementedError: 没有实际的 SMP 连接实现
+            
+        Example:
+            >>> await smp.invoke("allowlist/add", [{"name": "Steve", "uuid": "..."}])
+        """
+        raise NotImplementedError(f"{type(self).__name__} 没有 SMP 连接实现，无法调用 {method}")
+    
+    async def invoke_batch(self, calls: List[Tuple[str, Any]]) -> List[Any]:
+        """
+        批量调用 SMP 方法
+        
+        支持 JSON-RPC 批量请求的实现会把所有调用放入一个请求帧；
+        默认实现并发地逐个调用 invoke
+        
+        Args:
+            calls: (方法名, 参数) 列表
+            
+        Returns:
+            与 calls 一一对应的结果；失败的调用对应一个异常对象（不会抛出）
+        """
+        return list(await asyncio.gather(
+            *(self.invoke(method, params) for method, params in calls),
+            return_exceptions=True
+        ))
+    
+    def batch(self) -> "SmpBatch":
+        """
+        创建批量请求
+        
+        在 async with 块中调用的方法只会被记录，离开块时作为一个批量请求发送，
+        每个调用返回的 Future 在收到对应响应后完成
+        
+        Returns:
+            批量请求对象
+            
+        Example:
+            >>> async with smp.batch() as b:
+            ...     for player in new_players:
+            ...         b.add_to_allowlist(player)
+            ...     b.add_operator(OperatorDto(uuid=admin.uuid, name=admin.name))
+            ...     rules = b.get_game_rules()
+            >>> print(rules.result()["keepInventory"].value)
+        """
+        return SmpBatch(self)
+    
+    def on_notification(self, method: str, handler: Callable[[Any], None]):
+        """
+        注册服务器通知处理器
+        
+        Args:
+            method: 通知名（如 "players/joined"、"allowlist/added"）
+            handler: 处理函数，参数为通知的 JSON 参数
+        """
+        pass
+    
+    def off_notification(self, method: str, handler: Callable[[Any], None]):
+        """
+        注销服务器通知处理器
+        
+        Args:
+            method: 通知名
+            handler: 注册时使用的处理函数
+        """
+        pass
+    
     # ========== 白名单管理 ==========
     
     async def get_allowlist(self) -> List[PlayerDto]:
@@ -345,3 +498,488 @@ class SmpApi:
         """
         pass
 
+
+
+
+# ========== JSON-RPC 请求 ==========
+
+def _player_list(result: Any) -> List[PlayerDto]:
+    return [PlayerDto.from_dict(entry) for entry in result or []]
+
+
+def _ban_list(result: Any) -> List[UserBanDto]:
+    return [UserBanDto.from_dict(entry) for entry in result or []]
+
+
+def _ip_ban_list(result: Any) -> List[IpBanDto]:
+    return [IpBanDto.from_dict(entry) for entry in result or []]
+
+
+def _operator_list(result: Any) -> List[OperatorDto]:
+    return [OperatorDto.from_dict(entry) for entry in result or []]
+
+
+def _server_state(result: Any) -> ServerState:
+    if isinstance(result, dict):
+        return ServerState.RUNNING if result.get("started") else ServerState.STOPPED
+    return ServerState(result)
+
+
+def _game_rules(result: Any) -> Dict[str, TypedRule]:
+    rules: Dict[str, TypedRule] = {}
+    for name, rule in (result or {}).items():
+        if isinstance(rule, dict):
+            rules[name] = TypedRule(name=name, value=rule.get("value"), type=rule.get("type", ""))
+        else:
+            rules[name] = TypedRule(name=name, value=rule, type="")
+    return rules
+
+
+_Request = Tuple[str, Any, Optional[Callable[[Any], Any]]]
+
+
+class _SmpRequests:
+    """SmpApi 各方法对应的 (方法名, 参数, 结果转换) ，方法名与 C# SmpClient 一致"""
+    
+    @staticmethod
+    def get_allowlist() -> _Request:
+        return "allowlist", None, _player_list
+    
+    @staticmethod
+    def set_allowlist(players: List[PlayerDto]) -> _Request:
+        return "allowlist/set", [player.to_dict() for player in players], None
+    
+    @staticmethod
+    def add_to_allowlist(player: PlayerDto) -> _Request:
+        return "allowlist/add", [player.to_dict()], None
+    
+    @staticmethod
+    def remove_from_allowlist(player: PlayerDto) -> _Request:
+        return "allowlist/remove", [player.to_dict()], None
+    
+    @staticmethod
+    def clear_allowlist() -> _Request:
+        return "allowlist/clear", None, None
+    
+    @staticmethod
+    def get_bans() -> _Request:
+        return "bans", None, _ban_list
+    
+    @staticmethod
+    def set_bans(bans: List[UserBanDto]) -> _Request:
+        return "bans/set", [ban.to_dict() for ban in bans], None
+    
+    @staticmethod
+    def add_ban(ban: UserBanDto) -> _Request:
+        return "bans/add", [ban.to_dict()], None
+    
+    @staticmethod
+    def remove_ban(player: PlayerDto) -> _Request:
+        return "bans/remove", [player.to_dict()], None
+    
+    @staticmethod
+    def clear_bans() -> _Request:
+        return "bans/clear", None, None
+    
+    @staticmethod
+    def get_ip_bans() -> _Request:
+        return "ip_bans", None, _ip_ban_list
+    
+    @staticmethod
+    def set_ip_bans(bans: List[IpBanDto]) -> _Request:
+        return "ip_bans/set", [ban.to_dict() for ban in bans], None
+    
+    @staticmethod
+    def add_ip_ban(ban: IpBanDto) -> _Request:
+        return "ip_bans/add", [ban.to_dict()], None
+    
+    @staticmethod
+    def remove_ip_ban(ip: str) -> _Request:
+        return "ip_bans/remove", [ip], None
+    
+    @staticmethod
+    def clear_ip_bans() -> _Request:
+        return "ip_bans/clear", None, None
+    
+    @staticmethod
+    def get_players() -> _Request:
+        return "players", None, _player_list
+    
+    @staticmethod
+    def kick_player(player_name: str, reason: Optional[str] = None) -> _Request:
+        params = {"playerName": player_name}
+        if reason is not None:
+            params["reason"] = reason
+        return "players/kick", params, None
+    
+    @staticmethod
+    def get_operators() -> _Request:
+        return "operators", None, _operator_list
+    
+    @staticmethod
+    def set_operators(operators: List[OperatorDto]) -> _Request:
+        return "operators/set", [op.to_dict() for op in operators], None
+    
+    @staticmethod
+    def add_operator(op: OperatorDto) -> _Request:
+        return "operators/add", [op.to_dict()], None
+    
+    @staticmethod
+    def remove_operator(player: PlayerDto) -> _Request:
+        return "operators/remove", [player.to_dict()], None
+    
+    @staticmethod
+    def clear_operators() -> _Request:
+        return "operators/clear", None, None
+    
+    @staticmethod
+    def get_server_status() -> _Request:
+        return "server/status", None, _server_state
+    
+    @staticmethod
+    def save_world() -> _Request:
+        return "server/save", None, None
+    
+    @staticmethod
+    def stop_server() -> _Request:
+        return "server/stop", None, None
+    
+    @staticmethod
+    def send_system_message(message: str) -> _Request:
+        return "server/system_message", {"message": message}, None
+    
+    @staticmethod
+    def get_game_rules() -> _Request:
+        return "gamerules", None, _game_rules
+    
+    @staticmethod
+    def update_game_rule(rule: str, value: Any) -> _Request:
+        return "gamerules/update", {"rule": rule, "value": value}, None
+    
+    @staticmethod
+    def get_server_settings() -> _Request:
+        return "serversettings", None, dict
+    
+    @staticmethod
+    def get_server_setting(key: str) -> _Request:
+        return f"serversettings/{key}", None, None
+    
+    @staticmethod
+    def set_server_setting(key: str, value: Any) -> _Request:
+        return f"serversettings/{key}/set", value, None
+
+
+# ========== 基于 invoke 的实现 ==========
+
+class _InvokeSmpApi(SmpApi):
+    """通过 invoke 实现全部类型化方法的 SmpApi 基类，子类只需实现 invoke"""
+    
+    async def get_allowlist(self) -> List[PlayerDto]:
+        return await self._call(_SmpRequests.get_allowlist())
+    
+    async def set_allowlist(self, players: List[PlayerDto]):
+        await self._call(_SmpRequests.set_allowlist(players))
+    
+    async def add_to_allowlist(self, player: PlayerDto):
+        await self._call(_SmpRequests.add_to_allowlist(player))
+    
+    async def remove_from_allowlist(self, player: PlayerDto):
+        await self._call(_SmpRequests.remove_from_allowlist(player))
+    
+    async def clear_allowlist(self):
+        await self._call(_SmpRequests.clear_allowlist())
+    
+    async def get_bans(self) -> List[UserBanDto]:
+        return await self._call(_SmpRequests.get_bans())
+    
+    async def set_bans(self, bans: List[UserBanDto]):
+        await self._call(_SmpRequests.set_bans(bans))
+    
+    async def add_ban(self, ban: UserBanDto):
+        await self._call(_SmpRequests.add_ban(ban))
+    
+    async def remove_ban(self, player: PlayerDto):
+        await self._call(_SmpRequests.remove_ban(player))
+    
+    async def clear_bans(self):
+        await self._call(_SmpRequests.clear_bans())
+    
+    async def get_ip_bans(self) -> List[IpBanDto]:
+        return await self._call(_SmpRequests.get_ip_bans())
+    
+    async def set_ip_bans(self, bans: List[IpBanDto]):
+        await self._call(_SmpRequests.set_ip_bans(bans))
+    
+    async def add_ip_ban(self, ban: IpBanDto):
+        await self._call(_SmpRequests.add_ip_ban(ban))
+    
+    async def remove_ip_ban(self, ip: str):
+        await self._call(_SmpRequests.remove_ip_ban(ip))
+    
+    async def clear_ip_bans(self):
+        await self._call(_SmpRequests.clear_ip_bans())
+    
+    async def get_players(self) -> List[PlayerDto]:
+        return await self._call(_SmpRequests.get_players())
+    
+    async def kick_player(self, player_name: str, reason: Optional[str] = None):
+        await self._call(_SmpRequests.kick_player(player_name, reason))
+    
+    async def get_operators(self) -> List[OperatorDto]:
+        return await self._call(_SmpRequests.get_operators())
+    
+    async def set_operators(self, operators: List[OperatorDto]):
+        await self._call(_SmpRequests.set_operators(operators))
+    
+    async def add_operator(self, op: OperatorDto):
+        await self._call(_SmpRequests.add_operator(op))
+    
+    async def remove_operator(self, player: PlayerDto):
+        await self._call(_SmpRequests.remove_operator(player))
+    
+    async def clear_operators(self):
+        await self._call(_SmpRequests.clear_operators())
+    
+    async def get_server_status(self) -> ServerState:
+        return await self._call(_SmpRequests.get_server_status())
+    
+    async def save_world(self):
+        await self._call(_SmpRequests.save_world())
+    
+    async def stop_server(self):
+        await self._call(_SmpRequests.stop_server())
+    
+    async def send_system_message(self, message: str):
+        await self._call(_SmpRequests.send_system_message(message))
+    
+    async def get_game_rules(self) -> Dict[str, TypedRule]:
+        return await self._call(_SmpRequests.get_game_rules())
+    
+    async def update_game_rule(self, rule: str, value: Any):
+        await self._call(_SmpRequests.update_game_rule(rule, value))
+    
+    async def get_server_settings(self) -> Dict[str, Any]:
+        return await self._call(_SmpRequests.get_server_settings())
+    
+    async def get_server_setting(self, key: str) -> Any:
+        return await self._call(_SmpRequests.get_server_setting(key))
+    
+    async def set_server_setting(self, key: str, value: Any):
+        await self._call(_SmpRequests.set_server_setting(key, value))
+    
+    # ========== 内部实现 ==========
+    
+    async def _call(self, request: _Request) -> Any:
+        method, params, convert = request
+        result = await self.invoke(method, params)
+        return convert(result) if convert is not None else result
+
+
+class BridgedSmpApi(_InvokeSmpApi):
+    """
+    C# SMP 服务的 Python 包装
+    
+    插件构造函数中名为 smp 的参数由 C# 桥接注入此对象。invoke 转发到
+    ISmpApi.InvokeJsonAsync，参数和结果以 JSON 文本跨越桥接，C# Task 在线程池中等待，
+    不阻塞事件循环；服务器返回的 JSON-RPC 错误转换为 SmpError。
+    
+    C# ISmpApi 不提供服务器通知订阅，on_notification 会抛出 NotImplementedError；
+    依赖通知的 SmpMirror、BanIndex 需要使用 SmpClient 直接连接。
+    """
+    
+    def __init__(self, api: Any):
+        """
+        构造函数
+        
+        Args:
+            api: C# ISmpApi 对象
+        """
+        self._api = api
+    
+    async def invoke(self, method: str, params: Any = None) -> Any:
+        payload = None if params is None else json.dumps(params, ensure_ascii=False)
+        task = self._api.InvokeJsonAsync(method, payload)
+        result = await asyncio.get_running_loop().run_in_executor(None, self._wait, task)
+        return None if result is None else json.loads(result)
+    
+    def on_notification(self, method: str, handler: Callable[[Any], None]):
+        raise NotImplementedError("C# SMP 桥接不支持服务器通知，请使用 SmpClient 直接连接")
+    
+    @staticmethod
+    def _wait(task: Any) -> Optional[str]:
+        try:
+            return task.GetAwaiter().GetResult()
+        except Exception as ex:
+            # C# JsonRpcException 带有 Code 属性
+            code = getattr(ex, "Code", None)
+            if code is None:
+                raise
+            raise SmpError(int(code), str(getattr(ex, "Message", ex))) from ex
+
+
+# ========== 批量请求 ==========
+
+class SmpBatch:
+    """
+    SMP 批量请求
+    
+    由 SmpApi.batch() 创建。方法与 SmpApi 同名，但不需要 await：
+    调用只被记录并返回一个 Future，离开 async with 块时所有调用作为
+    一个 JSON-RPC 批量请求发送，各 Future 以对应响应的结果或 SmpError 完成。
+    块内抛出异常时不会发送任何请求，已返回的 Future 被取消。
+    """
+    
+    def __init__(self, smp: SmpApi):
+        self._smp = smp
+        self._calls: List[Tuple[str, Any]] = []
+        self._pending: List[Tuple[asyncio.Future, Optional[Callable[[Any], Any]]]] = []
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+    
+    async def __aenter__(self) -> "SmpBatch":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            for future, _ in self._pending:
+                future.cancel()
+            self._calls.clear()
+            self._pending.clear()
+            return
+        await self.flush()
+    
+    async def flush(self):
+        """立即发送已记录的调用（async with 块结束时自动调用）"""
+        calls, pending = self._calls, self._pending
+        self._calls, self._pending = [], []
+        if not calls:
+            return
+        try:
+            results = await self._smp.invoke_batch(calls)
+        except Exception as ex:
+            for future, _ in pending:
+                if not future.done():
+                    future.set_exception(ex)
+            raise
+        for (future, convert), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+                continue
+            try:
+                future.set_result(convert(result) if convert is not None else result)
+            except Exception as ex:
+                future.set_exception(ex)
+    
+    def invoke(self, method: str, params: Any = None) -> asyncio.Future:
+        """记录任意 SMP 方法调用"""
+        return self._queue((method, params, None))
+    
+    def _queue(self, request: _Request) -> asyncio.Future:
+        method, params, convert = request
+        future = asyncio.get_running_loop().create_future()
+        # 调用者可能只关心部分结果，避免未读取的异常产生警告
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls.append((method, params))
+        self._pending.append((future, convert))
+        return future
+    
+    # ========== 白名单 ==========
+    
+    def get_allowlist(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.get_allowlist())
+    
+    def set_allowlist(self, players: List[PlayerDto]) -> asyncio.Future:
+        return self._queue(_SmpRequests.set_allowlist(players))
+    
+    def add_to_allowlist(self, player: PlayerDto) -> asyncio.Future:
+        return self._queue(_SmpRequests.add_to_allowlist(player))
+    
+    def remove_from_allowlist(self, player: PlayerDto) -> asyncio.Future:
+        return self._queue(_SmpRequests.remove_from_allowlist(player))
+    
+    def clear_allowlist(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.clear_allowlist())
+    
+    # ========== 封禁 ==========
+    
+    def get_bans(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.get_bans())
+    
+    def set_bans(self, bans: List[UserBanDto]) -> asyncio.Future:
+        return self._queue(_SmpRequests.set_bans(bans))
+    
+    def add_ban(self, ban: UserBanDto) -> asyncio.Future:
+        return self._queue(_SmpRequests.add_ban(ban))
+    
+    def remove_ban(self, player: PlayerDto) -> asyncio.Future:
+        return self._queue(_SmpRequests.remove_ban(player))
+    
+    def clear_bans(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.clear_bans())
+    
+    def get_ip_bans(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.get_ip_bans())
+    
+    def set_ip_bans(self, bans: List[IpBanDto]) -> asyncio.Future:
+        return self._queue(_SmpRequests.set_ip_bans(bans))
+    
+    def add_ip_ban(self, ban: IpBanDto) -> asyncio.Future:
+        return self._queue(_SmpRequests.add_ip_ban(ban))
+    
+    def remove_ip_ban(self, ip: str) -> asyncio.Future:
+        return self._queue(_SmpRequests.remove_ip_ban(ip))
+    
+    def clear_ip_bans(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.clear_ip_bans())
+    
+    # ========== 玩家与管理员 ==========
+    
+    def get_players(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.get_players())
+    
+    def kick_player(self, player_name: str, reason: Optional[str] = None) -> asyncio.Future:
+        return self._queue(_SmpRequests.kick_player(player_name, reason))
+    
+    def get_operators(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.get_operators())
+    
+    def set_operators(self, operators: List[OperatorDto]) -> asyncio.Future:
+        return self._queue(_SmpRequests.set_operators(operators))
+    
+    def add_operator(self, op: OperatorDto) -> asyncio.Future:
+        return self._queue(_SmpRequests.add_operator(op))
+    
+    def remove_operator(self, player: PlayerDto) -> asyncio.Future:
+        return self._queue(_SmpRequests.remove_operator(player))
+    
+    def clear_operators(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.clear_operators())
+    
+    # ========== 服务器、游戏规则与设置 ==========
+    
+    def get_server_status(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.get_server_status())
+    
+    def save_world(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.save_world())
+    
+    def send_system_message(self, message: str) -> asyncio.Future:
+        return self._queue(_SmpRequests.send_system_message(message))
+    
+    def get_game_rules(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.get_game_rules())
+    
+    def update_game_rule(self, rule: str, value: Any) -> asyncio.Future:
+        return self._queue(_SmpRequests.update_game_rule(rule, value))
+    
+    def get_server_settings(self) -> asyncio.Future:
+        return self._queue(_SmpRequests.get_server_settings())
+    
+    def get_server_setting(self, key: str) -> asyncio.Future:
+        return self._queue(_SmpRequests.get_server_setting(key))
+    
+    def set_server_setting(self, key: str, value: Any) -> asyncio.Future:
+        return self._queue(_SmpRequests.set_server_setting(key, value))
@@ -0,0 +1,388 @@
+"""
+SMP 客户端
+
+纯 asyncio 实现的 SMP (JSON-RPC 2.0 over WebSocket) 客户端，支持批量请求
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import ssl
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .smp import SmpError, _InvokeSmpApi
+
+
+# ========== WebSocket 帧 ==========
+
+WS_OP_CONTINUATION = 0x0
+WS_OP_TEXT = 0x1
+WS_OP_BINARY = 0x2
+WS_OP_CLOSE = 0x8
+WS_OP_PING = 0x9
+WS_OP_PONG = 0xA
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _ws_accept(key: str) -> str:
+    """计算握手响应中的 Sec-WebSocket-Accept"""
+    return base64.b64encode(hashlib.sha1((key + _WS_GUID).encode("ascii")).digest()).decode("ascii")
+
+
+def _ws_mask(data: bytes, key: bytes) -> bytes:
+    """对负载应用掩码（按整数整体异或，避免逐字节循环）"""
+    length = len(data)
+    if not length:
+        return data
+    stream = (key * (length // 4 + 1))[:length]
+    return (int.from_bytes(data, "little") ^ int.from_bytes(stream, "little")).to_bytes(length, "little")
+
+
+def _ws_encode_frame(opcode: int, payload: bytes, mask: bool) -> bytes:
+    """编码一个完整（FIN）帧；客户端发送的帧必须带掩码"""
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, mask_bit | length)
+    elif length < 0x10000:
+        header = struct.pack("!BBH", 0x80 | opcode, mask_bit | 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, mask_bit | 127, length)
+    if mask:
+        key = os.urandom(4)
+        return header + key + _ws_mask(payload, key)
+    return header + payload
+
+
+async def _ws_read_frame(reader: asyncio.StreamReader) -> Tuple[bool, int, bytes]:
+    """
+    读取一个帧
+    
+    Returns:
+        (FIN, 操作码, 已去除掩码的负载)
+    """
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack("!Q", await reader.readexactly(8))
+    key = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if key is not None:
+        payload = _ws_mask(payload, key)
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+async def _ws_read_message(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    mask: bool
+) -> Optional[bytes]:
+    """
+    读取一条完整的数据消息，自动应答 ping 并拼接分片
+    
+    Returns:
+        消息负载，对方关闭连接时为 None
+    """
+    fragments: List[bytes] = []
+    while True:
+        fin, opcode, payload = await _ws_read_frame(reader)
+        if opcode == WS_OP_PING:
+            writer.write(_ws_encode_frame(WS_OP_PONG, payload, mask))
+            continue
+        if opcode == WS_OP_PONG:
+            continue
+        if opcode == WS_OP_CLOSE:
+            if not writer.is_closing():
+                writer.write(_ws_encode_frame(WS_OP_CLOSE, payload[:2], mask))
+            return None
+        fragments.append(payload)
+        if fin:
+            return fragments[0] if len(fragments) == 1 else b"".join(fragments)
+
+
+# ========== SMP 客户端 ==========
+
+class SmpClient(_InvokeSmpApi):
+    """
+    SMP 客户端
+    
+    不依赖 C# 桥接，直接通过 WebSocket 连接服务器管理协议端口，
+    可用于独立脚本、测试，或需要 JSON-RPC 批量请求的场景。
+    invoke_batch（以及 batch()）会把所有调用放入一个 JSON-RPC 批量数组，
+    按响应中的 id 分别完成。
+    
+    原版服务器的方法名带有 "minecraft:" 前缀，通知名为 "minecraft:notification/..."；
+    连接原版服务器时设置 method_prefix="minecraft:"，通知处理器仍使用不带前缀的名称注册。
+    
+    Example:
+        >>> smp = SmpClient("localhost", 40745, secret="...")
+        >>> await smp.connect()
+        >>> async with smp.batch() as b:
+        ...     for player in players:
+        ...         b.add_to_allowlist(player)
+        ...     b.update_game_rule("keepInventory", True)
+    """
+    
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 40745,
+        secret: str = "",
+        use_tls: bool = False,
+        timeout: float = 10.0,
+        method_prefix: str = ""
+    ):
+        """
+        构造函数
+        
+        Args:
+            host: 服务器地址
+            port: 管理协议端口
+            secret: 管理协议密钥（以 Bearer 令牌发送）
+            use_tls: 是否使用 wss
+            timeout: 连接和请求超时时间（秒）
+            method_prefix: 方法名前缀（原版服务器为 "minecraft:"）
+        """
+        self._host = host
+        self._port = port
+        self._secret = secret
+        self._use_tls = use_tls
+        self._timeout = timeout
+        self._prefix = method_prefix
+        self._notification_prefix = f"{method_prefix}notification/" if method_prefix else ""
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._handlers: Dict[str, List[Callable[[Any], None]]] = {}
+        self._next_id = 0
+    
+    def is_connected(self) -> bool:
+        """检查连接状态"""
+        return self._writer is not None and not self._writer.is_closing()
+    
+    async def connect(self):
+        """
+        建立 WebSocket 连接
+        
+        Raises:
+            ConnectionError: 握手失败（如密钥错误）
+        """
+        if self.is_connected():
+            return
+        
+        context = ssl.create_default_context() if self._use_tls else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self._host, self._port, ssl=context), self._timeout
+        )
+        try:
+            key = base64.b64encode(os.urandom(16)).decode("ascii")
+            request = (
+                f"GET / HTTP/1.1\r\n"
+                f"Host: {self._host}:{self._port}\r\n"
+                f"Upgrade: websocket\r\n"
+                f"Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Key: {key}\r\n"
+                f"Sec-WebSocket-Version: 13\r\n"
+                f"Authorization: Bearer {self._secret}\r\n"
+                f"\r\n"
+            )
+            writer.write(request.encode("ascii"))
+            await writer.drain()
+            
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self._timeout)
+            lines = head.decode("latin-1").split("\r\n")
+            if len(lines[0].split(" ")) < 2 or lines[0].split(" ")[1] != "101":
+                raise ConnectionError(f"SMP 握手失败: {lines[0]}")
+            headers = {
+                name.strip().lower(): value.strip()
+                for name, _, value in (line.partition(":") for line in lines[1:] if line)
+            }
+            if headers.get("sec-websocket-accept") != _ws_accept(key):
+                raise ConnectionError("SMP 握手失败: Sec-WebSocket-Accept 不匹配")
+        except BaseException:
+            writer.close()
+            raise
+        
+        self._reader = reader
+        self._writer = writer
+        self._read_task = asyncio.ensure_future(self._read_loop(reader, writer))
+    
+    async def disconnect(self):
+        """断开连接，等待中的请求以 ConnectionError 结束"""
+        writer = self._writer
+        if writer is not None and not writer.is_closing():
+            writer.write(_ws_encode_frame(WS_OP_CLOSE, struct.pack("!H", 1000), True))
+        task, self._read_task = self._read_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._close("SMP 连接已关闭")
+    
+    # ========== JSON-RPC ==========
+    
+    async def invoke(self, method: str, params: Any = None) -> Any:
+        """
+        调用 SMP 方法
+        
+        Raises:
+            SmpError: 服务器返回错误
+            ConnectionError: 未连接或连接中断
+            asyncio.TimeoutError: 请求超时
+        """
+        request_id, future = self._register()
+        try:
+            await self._send(self._request(request_id, method, params))
+            return self._result(await asyncio.wait_for(future, self._timeout))
+        finally:
+            self._pending.pop(request_id, None)
+    
+    async def invoke_batch(self, calls: List[Tuple[str, Any]]) -> List[Any]:
+        """
+        以一个 JSON-RPC 批量数组发送全部调用
+        
+        Returns:
+            与 calls 一一对应的结果；失败的调用对应 SmpError 或超时异常
+            
+        Raises:
+            ConnectionError: 未连接或连接中断
+        """
+        if not calls:
+            return []
+        registered = [self._register() for _ in calls]
+        try:
+            await self._send([
+                self._request(request_id, method, params)
+                for (request_id, _), (method, params) in zip(registered, calls)
+            ])
+            futures = [future for _, future in registered]
+            done, _ = await asyncio.wait(futures, timeout=self._timeout)
+            results: List[Any] = []
+            for future in futures:
+                if future not in done:
+                    results.append(asyncio.TimeoutError())
+                elif future.exception() is not None:
+                    exception = future.exception()
+                    if isinstance(exception, ConnectionError):
+                        self._discard(futures)
+                        raise exception
+                    results.append(exception)
+                else:
+                    try:
+                        results.append(self._result(future.result()))
+                    except SmpError as ex:
+                        results.append(ex)
+            return results
+        finally:
+            for request_id, _ in registered:
+                self._pending.pop(request_id, None)
+    
+    @staticmethod
+    def _discard(futures: List[asyncio.Future]):
+        """放弃一批调用的结果：取回已设置的异常并取消未完成的调用，避免 "exception was never retrieved" 警告"""
+        for future in futures:
+            if future.done():
+                if not future.cancelled():
+                    future.exception()
+            else:
+                future.cancel()
+    
+    def on_notification(self, method: str, handler: Callable[[Any], None]):
+        """注册服务器通知处理器"""
+        self._handlers.setdefault(method, []).append(handler)
+    
+    def off_notification(self, method: str, handler: Callable[[Any], None]):
+        """注销服务器通知处理器"""
+        handlers = self._handlers.get(method)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+    
+    # ========== 内部实现 ==========
+    
+    def _request(self, request_id: int, method: str, params: Any) -> Dict[str, Any]:
+        message = {"jsonrpc": "2.0", "id": request_id, "method": self._prefix + method}
+        if params is not None:
+            message["params"] = params
+        return message
+    
+    @staticmethod
+    def _result(response: Dict[str, Any]) -> Any:
+        error = response.get("error")
+        if error is not None:
+            raise SmpError(error.get("code", 0), error.get("message", ""), error.get("data"))
+        return response.get("result")
+    
+    def _register(self) -> Tuple[int, asyncio.Future]:
+        if not self.is_connected():
+            raise ConnectionError("SMP 未连接")
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        return self._next_id, future
+    
+    async def _send(self, message: Any):
+        payload = json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        self._writer.write(_ws_encode_frame(WS_OP_TEXT, payload, True))
+        await self._writer.drain()
+    
+    async def _read_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """后台读取任务：按 id 完成请求，按方法名分发通知"""
+        error = "SMP 连接已断开"
+        try:
+            while True:
+                payload = await _ws_read_message(reader, writer, True)
+                if payload is None:
+                    break
+                try:
+                    message = json.loads(payload)
+                except ValueError:
+                    continue
+                for item in message if isinstance(message, list) else (message,):
+                    if isinstance(item, dict):
+                        self._dispatch(item)
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as ex:
+            if not isinstance(ex, asyncio.IncompleteReadError):
+                error = str(ex) or error
+        finally:
+            self._close(error)
+    
+    def _dispatch(self, message: Dict[str, Any]):
+        request_id = message.get("id")
+        if request_id is not None:
+            future = self._pending.pop(request_id, None)
+            if future is not None and not future.done():
+                future.set_result(message)
+            return
+        
+        method = message.get("method")
+        if not method:
+            return
+        if self._notification_prefix and method.startswith(self._notification_prefix):
+            method = method[len(self._notification_prefix):]
+        for handler in list(self._handlers.get(method, ())):
+            try:
+                handler(message.get("params"))
+            except Exception:
+                # 与 C# JsonRpcHandler 一致：单个处理器失败不影响其他处理器
+                pass
+    
+    def _close(self, error: str):
+        writer, self._writer = self._writer, None
+        self._reader = None
+        if writer is not None:
+            writer.close()
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(error))
@@ -0,0 +1,369 @@
+"""
+SMP 服务器状态镜像
+
+加载一次完整状态后依靠服务器通知保持内存副本最新，读取操作在本地完成
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .smp import SmpApi, PlayerDto, UserBanDto, IpBanDto, OperatorDto, ServerState, TypedRule
+from ._smpentries import PlayerIndex, notification_entries, to_dto
+
+
+class SmpMirror(SmpApi):
+    """
+    SMP 服务器状态镜像
+    
+    包装一个现有的 SmpApi。load() 读取一次在线玩家、白名单、封禁、IP 封禁、
+    管理员、游戏规则和服务器设置，之后通过 players/joined、allowlist/added、
+    bans/removed、gamerules/updated 等通知增量更新内存副本。
+    get_* 方法和 is_* 查询直接读取本地副本，不产生网络请求；
+    写操作转发给被包装的 SmpApi，本地副本在成功后立即更新，不等待通知。
+    
+    服务器设置没有对应的通知，只在 load() 和经由本镜像的修改时更新。
+    
+    staleness 表示距离最后一次收到通知（包括 server/status 心跳）或加载的秒数，
+    超过 max_staleness 时 is_stale 为 True，此时可以调用 refresh() 重新加载。
+    
+    Example:
+        >>> mirror = SmpMirror(self.smp)
+        >>> await mirror.load()
+        >>> if mirror.is_banned(player_name) or not mirror.is_allowlisted(player_name):
+        ...     return
+        >>> if mirror.is_stale:
+        ...     await mirror.refresh()
+    """
+    
+    NOTIFICATIONS = (
+        "players/joined", "players/left",
+        "allowlist/added", "allowlist/removed", "allowlist/set", "allowlist/cleared",
+        "bans/added", "bans/removed", "bans/set", "bans/cleared",
+        "ip_bans/added", "ip_bans/removed", "ip_bans/set", "ip_bans/cleared",
+        "operators/added", "operators/removed", "operators/set", "operators/cleared",
+        "gamerules/updated", "server/status",
+    )
+    """镜像订阅的通知"""
+    
+    def __init__(self, inner: SmpApi, max_staleness: float = 60.0):
+        """
+        构造函数
+        
+        Args:
+            inner: 实际执行请求并接收通知的 SmpApi
+            max_staleness: 超过该秒数没有任何更新时认为镜像已过期
+        """
+        self._inner = inner
+        self._max_staleness = max_staleness
+        self._players: PlayerIndex[PlayerDto] = PlayerIndex()
+        self._allowlist: PlayerIndex[PlayerDto] = PlayerIndex()
+        self._bans: PlayerIndex[UserBanDto] = PlayerIndex()
+        self._operators: PlayerIndex[OperatorDto] = PlayerIndex()
+        self._ip_bans: Dict[str, IpBanDto] = {}
+        self._game_rules: Dict[str, TypedRule] = {}
+        self._settings: Dict[str, Any] = {}
+        self._status: Any = None
+        self._handlers: Dict[str, Callable[[Any], None]] = {}
+        self._loaded_at: Optional[float] = None
+        self._updated_at: Optional[float] = None
+        self._notifications = 0
+    
+    @property
+    def inner(self) -> SmpApi:
+        """被包装的 SmpApi"""
+        return self._inner
+    
+    @property
+    def loaded(self) -> bool:
+        """是否已完成加载"""
+        return self._loaded_at is not None
+    
+    @property
+    def staleness(self) -> float:
+        """距离最后一次更新的秒数，尚未加载时为无穷大"""
+        if self._updated_at is None:
+            return float("inf")
+        return time.monotonic() - self._updated_at
+    
+    @property
+    def is_stale(self) -> bool:
+        """镜像是否已过期"""
+        return self.staleness > self._max_staleness
+    
+    @property
+    def notifications(self) -> int:
+        """已应用的通知数量"""
+        return self._notifications
+    
+    async def load(self):
+        """订阅通知并加载完整状态"""
+        if not self._handlers:
+            for method in self.NOTIFICATIONS:
+                handler = self._make_handler(method)
+                self._handlers[method] = handler
+                self._inner.on_notification(method, handler)
+        await self.refresh()
+    
+    async def refresh(self):
+        """重新读取完整状态（通知在读取期间照常应用，读取结果随后覆盖）"""
+        inner = self._inner
+        players, allowlist, bans, ip_bans, operators, rules, settings = await asyncio.gather(
+            inner.get_players(), inner.get_allowlist(), inner.get_bans(), inner.get_ip_bans(),
+            inner.get_operators(), inner.get_game_rules(), inner.get_server_settings()
+        )
+        self._players.replace(players or [])
+        self._allowlist.replace(allowlist or [])
+        self._bans.replace(bans or [])
+        self._ip_bans = {ban.ip: ban for ban in ip_bans or []}
+        self._operators.replace(operators or [])
+        self._game_rules = dict(rules or {})
+        self._settings = dict(settings or {})
+        self._loaded_at = self._updated_at = time.monotonic()
+    
+    def close(self):
+        """取消通知订阅，镜像不再更新"""
+        for method, handler in self._handlers.items():
+            self._inner.off_notification(method, handler)
+        self._handlers.clear()
+    
+    # ========== 本地查询 ==========
+    
+    def is_online(self, player: str) -> bool:
+        """玩家（UUID 或名称）是否在线"""
+        return self._players.get(player) is not None
+    
+    def is_allowlisted(self, player: str) -> bool:
+        """玩家（UUID 或名称）是否在白名单中"""
+        return self._allowlist.get(player) is not None
+    
+    def is_banned(self, player: str) -> bool:
+        """玩家（UUID 或名称）是否被封禁"""
+        return self._bans.get(player) is not None
+    
+    def is_ip_banned(self, ip: str) -> bool:
+        """IP 是否被精确封禁"""
+        return ip in self._ip_bans
+    
+    def is_operator(self, player: str) -> bool:
+        """玩家（UUID 或名称）是否为管理员"""
+        return self._operators.get(player) is not None
+    
+    def get_ban(self, player: str) -> Optional[UserBanDto]:
+        """获取玩家的封禁信息"""
+        return self._bans.get(player)
+    
+    def get_operator(self, player: str) -> Optional[OperatorDto]:
+        """获取玩家的管理员信息"""
+        return self._operators.get(player)
+    
+    def get_game_rule(self, rule: str) -> Optional[TypedRule]:
+        """获取游戏规则"""
+        return self._game_rules.get(rule)
+    
+    @property
+    def online_count(self) -> int:
+        """在线玩家数量"""
+        return len(self._players)
+    
+    @property
+    def last_status(self) -> Any:
+        """最后一次 server/status 心跳的参数"""
+        return self._status
+    
+    # ========== SmpApi 读取（本地） ==========
+    
+    async def get_players(self) -> List[PlayerDto]:
+        return self._players.values()
+    
+    async def get_allowlist(self) -> List[PlayerDto]:
+        return self._allowlist.values()
+    
+    async def get_bans(self) -> List[UserBanDto]:
+        return self._bans.values()
+    
+    async def get_ip_bans(self) -> List[IpBanDto]:
+        return list(self._ip_bans.values())
+    
+    async def get_operators(self) -> List[OperatorDto]:
+        return self._operators.values()
+    
+    async def get_game_rules(self) -> Dict[str, TypedRule]:
+        return dict(self._game_rules)
+    
+    async def get_server_settings(self) -> Dict[str, Any]:
+        return dict(self._settings)
+    
+    async def get_server_setting(self, key: str) -> Any:
+        if key in self._settings:
+            return self._settings[key]
+        return await self._inner.get_server_setting(key)
+    
+    # ========== SmpApi 写入（转发） ==========
+    
+    async def invoke(self, method: str, params: Any = None) -> Any:
+        return await self._inner.invoke(method, params)
+    
+    async def invoke_batch(self, calls: List[Tuple[str, Any]]) -> List[Any]:
+        return await self._inner.invoke_batch(calls)
+    
+    def on_notification(self, method: str, handler: Callable[[Any], None]):
+        self._inner.on_notification(method, handler)
+    
+    def off_notification(self, method: str, handler: Callable[[Any], None]):
+        self._inner.off_notification(method, handler)
+    
+    async def set_allowlist(self, players: List[PlayerDto]):
+        await self._inner.set_allowlist(players)
+        self._apply("allowlist/set", players)
+    
+    async def add_to_allowlist(self, player: PlayerDto):
+        await self._inner.add_to_allowlist(player)
+        self._apply("allowlist/added", player)
+    
+    async def remove_from_allowlist(self, player: PlayerDto):
+        await self._inner.remove_from_allowlist(player)
+        self._apply("allowlist/removed", player)
+    
+    async def clear_allowlist(self):
+        await self._inner.clear_allowlist()
+        self._apply("allowlist/cleared", None)
+    
+    async def set_bans(self, bans: List[UserBanDto]):
+        await self._inner.set_bans(bans)
+        self._apply("bans/set", bans)
+    
+    async def add_ban(self, ban: UserBanDto):
+        await self._inner.add_ban(ban)
+        self._apply("bans/added", ban)
+    
+    async def remove_ban(self, player: PlayerDto):
+        await self._inner.remove_ban(player)
+        self._apply("bans/removed", player)
+    
+    async def clear_bans(self):
+        await self._inner.clear_bans()
+        self._apply("bans/cleared", None)
+    
+    async def set_ip_bans(self, bans: List[IpBanDto]):
+        await self._inner.set_ip_bans(bans)
+        self._apply("ip_bans/set", bans)
+    
+    async def add_ip_ban(self, ban: IpBanDto):
+        await self._inner.add_ip_ban(ban)
+        self._apply("ip_bans/added", ban)
+    
+    async def remove_ip_ban(self, ip: str):
+        await self._inner.remove_ip_ban(ip)
+        self._apply("ip_bans/removed", ip)
+    
+    async def clear_ip_bans(self):
+        await self._inner.clear_ip_bans()
+        self._apply("ip_bans/cleared", None)
+    
+    async def kick_player(self, player_name: str, reason: Optional[str] = None):
+        await self._inner.kick_player(player_name, reason)
+    
+    async def set_operators(self, operators: List[OperatorDto]):
+        await self._inner.set_operators(operators)
+        self._apply("operators/set", operators)
+    
+    async def add_operator(self, op: OperatorDto):
+        await self._inner.add_operator(op)
+        self._apply("operators/added", op)
+    
+    async def remove_operator(self, player: PlayerDto):
+        await self._inner.remove_operator(player)
+        self._apply("operators/removed", player)
+    
+    async def clear_operators(self):
+        await self._inner.clear_operators()
+        self._apply("operators/cleared", None)
+    
+    async def get_server_status(self) -> ServerState:
+        return await self._inner.get_server_status()
+    
+    async def save_world(self):
+        await self._inner.save_world()
+    
+    async def stop_server(self):
+        await self._inner.stop_server()
+    
+    async def send_system_message(self, message: str):
+        await self._inner.send_system_message(message)
+    
+    async def update_game_rule(self, rule: str, value: Any):
+        await self._inner.update_game_rule(rule, value)
+        self._apply("gamerules/updated", {"name": rule, "value": value})
+    
+    async def set_server_setting(self, key: str, value: Any):
+        await self._inner.set_server_setting(key, value)
+        self._settings[key] = value
+    
+    # ========== 通知处理 ==========
+    
+    def _make_handler(self, method: str) -> Callable[[Any], None]:
+        def handler(params: Any):
+            self._apply(method, params)
+            self._notifications += 1
+        return handler
+    
+    def _apply(self, method: str, params: Any):
+        """把一条通知（或本地写入）应用到镜像"""
+        self._updated_at = time.monotonic()
+        family, _, action = method.partition("/")
+        
+        if family == "server":
+            self._status = params
+            return
+        
+        if family == "gamerules":
+            for entry in notification_entries(params):
+                name = entry.get("name") if isinstance(entry, dict) else getattr(entry, "name", None)
+                if not name:
+                    continue
+                value = entry.get("value") if isinstance(entry, dict) else entry.value
+                rule = self._game_rules.get(name)
+                if rule is not None:
+                    rule.value = value
+                else:
+                    self._game_rules[name] = TypedRule(
+                        name=name, value=value, type="boolean" if isinstance(value, bool) else "integer"
+                    )
+            return
+        
+        if family == "ip_bans":
+            if action in ("set", "cleared"):
+                self._ip_bans.clear()
+            for entry in notification_entries(params):
+                if action == "removed":
+                    ip = entry if isinstance(entry, str) else (
+                        entry.get("ip") if isinstance(entry, dict) else entry.ip
+                    )
+                    self._ip_bans.pop(ip, None)
+                elif action in ("added", "set"):
+                    ban = to_dto(IpBanDto, entry)
+                    self._ip_bans[ban.ip] = ban
+            return
+        
+        index, dto_type = {
+            "players": (self._players, PlayerDto),
+            "allowlist": (self._allowlist, PlayerDto),
+            "bans": (self._bans, UserBanDto),
+            "operators": (self._operators, OperatorDto),
+        }.get(family, (None, None))
+        if index is None:
+            return
+        
+        if action in ("set", "cleared"):
+            index.replace([])
+        for entry in notification_entries(params):
+            if action in ("left", "removed"):
+                # 移除通知可能只携带玩家信息（bans/removed、operators/removed）
+                if isinstance(entry, dict):
+                    player = entry.get("player") or entry
+                    index.remove(player.get("uuid") or "", player.get("name") or "")
+                else:
+                    index.remove(entry.uuid, entry.name)
+            elif action in ("joined", "added", "set"):
+                index.add(to_dto(dto_type, entry))
@@ -0,0 +1,264 @@
+"""
+SMP 列表增量同步
+
+把白名单、封禁和管理员列表同步到期望状态时，只发送与本地镜像相比的增量
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+from dataclasses import dataclass
+
+from .smp import SmpApi, PlayerDto, UserBanDto, IpBanDto, OperatorDto
+from ._smpentries import player_key
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class SmpSyncResult:
+    """一次同步的统计"""
+    added: int = 0
+    removed: int = 0
+    updated: int = 0
+    """已存在但内容变化（如封禁原因、管理员等级）而重新提交的条目数"""
+    requests: int = 0
+    """实际发送的 SMP 请求数"""
+    
+    @property
+    def changed(self) -> bool:
+        """是否有任何变化"""
+        return bool(self.added or self.removed or self.updated)
+
+
+class _ListSpec:
+    """一种 SMP 列表的方法名、比较键和序列化方式"""
+    
+    __slots__ = ("name", "load", "add", "remove", "set", "key", "identity", "remove_params")
+    
+    def __init__(
+        self,
+        name: str,
+        load: Callable[[SmpApi], Any],
+        key: Callable[[Any], str],
+        identity: Callable[[Any], Any],
+        remove_params: Callable[[Any], Any]
+    ):
+        self.name = name
+        self.load = load
+        self.add = f"{name}/add"
+        self.remove = f"{name}/remove"
+        self.set = f"{name}/set"
+        self.key = key
+        self.identity = identity
+        self.remove_params = remove_params
+
+
+_ALLOWLIST = _ListSpec(
+    "allowlist",
+    lambda smp: smp.get_allowlist(),
+    key=lambda player: player_key(player.uuid, player.name),
+    identity=lambda player: None,
+    remove_params=lambda player: player.to_dict()
+)
+_BANS = _ListSpec(
+    "bans",
+    lambda smp: smp.get_bans(),
+    key=lambda ban: player_key(ban.uuid, ban.name),
+    identity=lambda ban: (ban.reason, ban.expires, ban.source),
+    remove_params=lambda ban: {"name": ban.name, "uuid": ban.uuid}
+)
+_IP_BANS = _ListSpec(
+    "ip_bans",
+    lambda smp: smp.get_ip_bans(),
+    key=lambda ban: ban.ip,
+    identity=lambda ban: (ban.reason, ban.expires, ban.source),
+    remove_params=lambda ban: ban.ip
+)
+_OPERATORS = _ListSpec(
+    "operators",
+    lambda smp: smp.get_operators(),
+    key=lambda op: player_key(op.uuid, op.name),
+    identity=lambda op: (op.level, op.bypass_player_limit),
+    remove_params=lambda op: {"name": op.name, "uuid": op.uuid}
+)
+
+
+class SmpSynchronizer:
+    """
+    SMP 列表增量同步器
+    
+    首次同步某个列表时通过 SmpApi 读取一次完整列表作为本地镜像，
+    之后每次同步只在本地计算与期望状态的差异，
+    按 chunk_size 分块发送 add/remove 请求，并在每个请求成功后更新镜像。
+    
+    镜像只反映经由本同步器的修改；其他途径修改了服务器列表时，
+    调用 refresh() 重新读取。
+    
+    Example:
+        >>> sync = SmpSynchronizer(self.smp, chunk_size=500)
+        >>> desired = [PlayerDto(uuid=row.uuid, name=row.name) for row in rows]
+        >>> result = await sync.sync_allowlist(desired)
+        >>> self.logger.info(f"白名单 +{result.added} -{result.removed}，{result.requests} 个请求")
+    """
+    
+    def __init__(self, smp: SmpApi, chunk_size: int = 256):
+        """
+        构造函数
+        
+        Args:
+            smp: SMP API
+            chunk_size: 单个 add/remove 请求携带的最大条目数
+        """
+        self._smp = smp
+        self._chunk_size = max(1, chunk_size)
+        self._mirrors: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+    
+    async def sync_allowlist(self, desired: Iterable[PlayerDto]) -> SmpSyncResult:
+        """
+        把白名单同步为 desired
+        
+        Args:
+            desired: 期望的完整白名单
+            
+        Returns:
+            同步统计
+        """
+        return await self._sync(_ALLOWLIST, desired)
+    
+    async def sync_bans(self, desired: Iterable[UserBanDto]) -> SmpSyncResult:
+        """
+        把玩家封禁列表同步为 desired
+        
+        原因、过期时间或来源变化的封禁会被重新提交
+        
+        Args:
+            desired: 期望的完整封禁列表
+            
+        Returns:
+            同步统计
+        """
+        return await self._sync(_BANS, desired)
+    
+    async def sync_ip_bans(self, desired: Iterable[IpBanDto]) -> SmpSyncResult:
+        """
+        把 IP 封禁列表同步为 desired
+        
+        Args:
+            desired: 期望的完整 IP 封禁列表
+            
+        Returns:
+            同步统计
+        """
+        return await self._sync(_IP_BANS, desired)
+    
+    async def sync_operators(self, desired: Iterable[OperatorDto]) -> SmpSyncResult:
+        """
+        把管理员列表同步为 desired
+        
+        等级或 bypass_player_limit 变化的管理员会被重新提交
+        
+        Args:
+            desired: 期望的完整管理员列表
+            
+        Returns:
+            同步统计
+        """
+        return await self._sync(_OPERATORS, desired)
+    
+    async def refresh(self, name: Optional[str] = None):
+        """
+        重新从服务器读取本地镜像
+        
+        Args:
+            name: 列表名称（allowlist、bans、ip_bans、operators），None 表示丢弃全部镜像，
+                在下次同步时重新读取
+        """
+        if name is None:
+            self._mirrors.clear()
+            return
+        spec = _SPECS[name]
+        async with self._lock(name):
+            self._mirrors[name] = self._index(spec, await spec.load(self._smp) or [])
+    
+    def mirrored(self, name: str) -> List[Any]:
+        """
+        获取本地镜像中的条目
+        
+        Args:
+            name: 列表名称
+            
+        Returns:
+            条目列表，尚未加载时为空列表
+        """
+        return list(self._mirrors.get(name, {}).values())
+    
+    # ========== 内部实现 ==========
+    
+    def _lock(self, name: str) -> asyncio.Lock:
+        lock = self._locks.get(name)
+        if lock is None:
+            lock = self._locks[name] = asyncio.Lock()
+        return lock
+    
+    @staticmethod
+    def _index(spec: _ListSpec, entries: Iterable[T]) -> Dict[str, T]:
+        return {spec.key(entry): entry for entry in entries}
+    
+    async def _sync(self, spec: _ListSpec, desired: Iterable[Any]) -> SmpSyncResult:
+        """计算差异并分块提交"""
+        async with self._lock(spec.name):
+            mirror = self._mirrors.get(spec.name)
+            if mirror is None:
+                mirror = self._mirrors[spec.name] = self._index(spec, await spec.load(self._smp) or [])
+            
+            target = self._index(spec, desired)
+            removals = [entry for key, entry in mirror.items() if key not in target]
+            additions: List[Any] = []
+            updated = 0
+            for key, entry in target.items():
+                current = mirror.get(key)
+                if current is None:
+                    additions.append(entry)
+                elif spec.identity(current) != spec.identity(entry):
+                    additions.append(entry)
+                    updated += 1
+            
+            result = SmpSyncResult(added=len(additions) - updated, removed=len(removals), updated=updated)
+            if not additions and not removals:
+                return result
+            
+            # 增量需要多个请求而完整列表一个请求就能装下时，直接整体替换
+            delta_requests = self._chunks(len(removals)) + self._chunks(len(additions))
+            if len(target) <= self._chunk_size and delta_requests > 1:
+                await self._smp.invoke(spec.set, [entry.to_dict() for entry in target.values()])
+                self._mirrors[spec.name] = target
+                result.requests = 1
+                return result
+            
+            for chunk in self._split(removals):
+                await self._smp.invoke(spec.remove, [spec.remove_params(entry) for entry in chunk])
+                for entry in chunk:
+                    mirror.pop(spec.key(entry), None)
+                result.requests += 1
+            
+            for chunk in self._split(additions):
+                await self._smp.invoke(spec.add, [entry.to_dict() for entry in chunk])
+                for entry in chunk:
+                    mirror[spec.key(entry)] = entry
+                result.requests += 1
+            
+            return result
+    
+    def _chunks(self, count: int) -> int:
+        return -(-count // self._chunk_size)
+    
+    def _split(self, entries: List[T]) -> Iterable[List[T]]:
+        for start in range(0, len(entries), self._chunk_size):
+            yield entries[start:start + self._chunk_size]
+
+
+_SPECS: Dict[str, _ListSpec] = {
+    spec.name: spec for spec in (_ALLOWLIST, _BANS, _IP_BANS, _OPERATORS)
+}
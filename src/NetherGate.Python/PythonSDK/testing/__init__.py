@@ -0,0 +1,13 @@
+"""
+测试工具
+
+提供本地替身服务器，用于在没有真实 Minecraft 服务器时测试和压测插件
+"""
+
+from .rcon_server import FakeRconServer
+from .smp_server import FakeSmpServer
+
+__all__ = [
+    'FakeRconServer',
+    'FakeSmpServer',
+]
@@ -0,0 +1,188 @@
+"""
+RCON 替身服务器
+
+基于 asyncio 的本地 Minecraft RCON 服务器，实现 Source RCON 协议
+"""
+
+import asyncio
+from typing import Callable, Dict, List, Optional, Set, Union
+
+from ..rcon import (
+    RCON_PACKET_AUTH, RCON_PACKET_AUTH_RESPONSE, RCON_PACKET_COMMAND,
+    RCON_PACKET_RESPONSE, RCON_MAX_PAYLOAD, _encode_packet, _read_packet
+)
+
+
+class FakeRconServer:
+    """
+    RCON 替身服务器
+    
+    行为与原版服务器一致：
+    - 密码错误时认证响应的请求 ID 为 -1，未认证时执行命令同样返回 -1
+    - 超过 4096 字节的响应拆分为多个同 ID 的数据包
+    - 未知类型的数据包返回 "Unknown request <类型>"（可用作多包响应的结束标记）
+    - serialize=True 时所有连接的命令由一个“主线程”逐条执行
+    
+    Example:
+        >>> async with FakeRconServer(password="secret", latency=0.002) as server:
+        ...     server.set_response("list", "There are 0 of a max of 20 players online: ")
+        ...     rcon = PipelinedRconClient("127.0.0.1", server.port, "secret")
+        ...     await rcon.connect()
+    """
+    
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        password: str = "",
+        latency: float = 0.0,
+        command_latency: Optional[Dict[str, float]] = None,
+        handler: Optional[Callable[[str], str]] = None,
+        fail_auth: bool = False,
+        serialize: bool = True
+    ):
+        """
+        构造函数
+        
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示随机分配
+            password: RCON 密码
+            latency: 每条命令的默认执行延迟（秒）
+            command_latency: 按命令名（首个单词）覆盖的执行延迟（秒）
+            handler: 自定义响应生成函数，优先于 set_response 设置的固定响应
+            fail_auth: 为 True 时任何密码都认证失败
+            serialize: 是否像原版服务器一样在单个主线程上逐条执行所有连接的命令
+        """
+        self._host = host
+        self._port = port
+        self.password = password
+        self.latency = latency
+        self.command_latency: Dict[str, float] = dict(command_latency or {})
+        self.handler = handler
+        self.fail_auth = fail_auth
+        self._serialize = serialize
+        self._responses: Dict[str, Union[str, Callable[[str], str]]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._main_thread: Optional[asyncio.Lock] = None
+        self._writers: List[asyncio.StreamWriter] = []
+        self._handlers: Set[asyncio.Task] = set()
+        
+        self.commands: List[str] = []
+        self.connections = 0
+        self.auth_failures = 0
+    
+    @property
+    def port(self) -> int:
+        """实际监听的端口"""
+        if self._server is not None and self._server.sockets:
+            return self._server.sockets[0].getsockname()[1]
+        return self._port
+    
+    @property
+    def host(self) -> str:
+        """监听地址"""
+        return self._host
+    
+    def set_response(self, command: str, response: Union[str, Callable[[str], str]]):
+        """
+        设置命令的固定响应
+        
+        Args:
+            command: 命令前缀（按最长前缀匹配）
+            response: 响应文本，或接收完整命令返回响应文本的函数
+        """
+        self._responses[command] = response
+    
+    async def start(self):
+        """开始监听"""
+        self._main_thread = asyncio.Lock()
+        self._server = await asyncio.start_server(self._handle, self._host, self._port)
+    
+    async def stop(self):
+        """停止监听并断开所有连接"""
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._handlers):
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+    
+    async def drop_connections(self):
+        """断开所有现有连接（模拟网络故障），保持监听"""
+        for writer in list(self._writers):
+            writer.close()
+    
+    async def __aenter__(self) -> "FakeRconServer":
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+    
+    # ========== 内部实现 ==========
+    
+    def _respond(self, command: str) -> str:
+        """生成命令响应"""
+        if self.handler is not None:
+            return self.handler(command)
+        for prefix in sorted(self._responses, key=len, reverse=True):
+            if command == prefix or command.startswith(prefix + " "):
+                response = self._responses[prefix]
+                return response(command) if callable(response) else response
+        return ""
+    
+    async def _run_command(self, command: str) -> str:
+        """模拟命令执行延迟并生成响应"""
+        delay = self.command_latency.get(command.split(" ", 1)[0], self.latency)
+        if self._serialize:
+            async with self._main_thread:
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                return self._respond(command)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._respond(command)
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理单个客户端连接"""
+        self.connections += 1
+        self._writers.append(writer)
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        authenticated = False
+        try:
+            while True:
+                request_id, packet_type, payload = await _read_packet(reader)
+                body = payload.decode("utf-8", errors="replace")
+                
+                if packet_type == RCON_PACKET_AUTH:
+                    authenticated = not self.fail_auth and body == self.password
+                    if not authenticated:
+                        self.auth_failures += 1
+                    writer.write(_encode_packet(
+                        request_id if authenticated else -1, RCON_PACKET_AUTH_RESPONSE, ""
+                    ))
+                elif not authenticated:
+                    writer.write(_encode_packet(-1, RCON_PACKET_AUTH_RESPONSE, ""))
+                elif packet_type == RCON_PACKET_COMMAND:
+                    self.commands.append(body)
+                    data = (await self._run_command(body)).encode("utf-8")
+                    # 与原版一致：按 4096 字节拆分，每个分片都带相同的请求 ID
+                    for start in range(0, max(len(data), 1), RCON_MAX_PAYLOAD):
+                        writer.write(_encode_packet(
+                            request_id, RCON_PACKET_RESPONSE, data[start:start + RCON_MAX_PAYLOAD]
+                        ))
+                else:
+                    writer.write(_encode_packet(
+                        request_id, RCON_PACKET_RESPONSE, f"Unknown request {packet_type:x}"
+                    ))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, OSError, asyncio.CancelledError):
+            # 停止服务器时处理任务会被取消，正常结束即可
+            pass
+        finally:
+            self._handlers.discard(task)
+            self._writers.remove(writer)
+            writer.close()
@@ -0,0 +1,385 @@
+"""
+SMP 替身服务器
+
+基于 asyncio 的本地服务器管理协议（JSON-RPC 2.0 over WebSocket）服务器
+"""
+
+import asyncio
+import json
+import uuid as uuid_module
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ..smpclient import (
+    WS_OP_TEXT, _ws_accept, _ws_encode_frame, _ws_read_message
+)
+
+
+def _player_key(player: Dict[str, Any]) -> str:
+    uuid = player.get("uuid") or ""
+    return uuid.lower() if uuid else (player.get("name") or "").lower()
+
+
+def _as_list(params: Any) -> List[Any]:
+    """兼容单个对象、对象列表和按位置参数包装的列表"""
+    if params is None:
+        return []
+    if isinstance(params, list):
+        if len(params) == 1 and isinstance(params[0], list):
+            return params[0]
+        return params
+    return [params]
+
+
+class FakeSmpServer:
+    """
+    SMP 替身服务器
+    
+    实现白名单、封禁、IP 封禁、管理员、玩家、游戏规则和服务器设置方法，
+    状态修改后向所有连接广播对应通知（allowlist/added、bans/removed、gamerules/updated 等），
+    支持 JSON-RPC 批量请求。
+    
+    Example:
+        >>> async with FakeSmpServer(secret="s", allowlist_size=10000, latency=0.001) as server:
+        ...     smp = SmpClient(server.host, server.port, secret="s")
+        ...     await smp.connect()
+        ...     await server.join_player("Steve")
+    """
+    
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        secret: str = "",
+        latency: float = 0.0,
+        allowlist_size: int = 0,
+        bans_size: int = 0,
+        ip_bans_size: int = 0,
+        operators_size: int = 0,
+        players_size: int = 0,
+        method_prefix: str = "",
+        handler: Optional[Callable[[str, Any], Any]] = None
+    ):
+        """
+        构造函数
+        
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示随机分配
+            secret: 管理协议密钥，握手时校验 Bearer 令牌
+            latency: 每个请求（批量请求中的每一项）的处理延迟（秒）
+            allowlist_size: 预先生成的白名单条目数
+            bans_size: 预先生成的玩家封禁数
+            ip_bans_size: 预先生成的 IP 封禁数
+            operators_size: 预先生成的管理员数
+            players_size: 预先生成的在线玩家数
+            method_prefix: 方法名前缀（模拟原版服务器时为 "minecraft:"）
+            handler: 自定义方法处理函数，返回 NotImplemented 时回退到内置实现
+        """
+        self._host = host
+        self._port = port
+        self.secret = secret
+        self.latency = latency
+        self.handler = handler
+        self._prefix = method_prefix
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: List[asyncio.StreamWriter] = []
+        self._tasks: Set[asyncio.Task] = set()
+        
+        self.allowlist: Dict[str, Dict[str, Any]] = {}
+        self.bans: Dict[str, Dict[str, Any]] = {}
+        self.ip_bans: Dict[str, Dict[str, Any]] = {}
+        self.operators: Dict[str, Dict[str, Any]] = {}
+        self.players: Dict[str, Dict[str, Any]] = {}
+        self.game_rules: Dict[str, Dict[str, Any]] = {
+            "keepInventory": {"type": "boolean", "value": False},
+            "doDaylightCycle": {"type": "boolean", "value": True},
+            "randomTickSpeed": {"type": "integer", "value": 3},
+            "spawnRadius": {"type": "integer", "value": 10},
+        }
+        self.settings: Dict[str, Any] = {
+            "motd": "A Minecraft Server",
+            "max_players": 20,
+            "difficulty": "normal",
+            "view_distance": 10,
+        }
+        
+        self.requests = 0
+        self.frames = 0
+        self.batches = 0
+        self.notifications = 0
+        self.connections = 0
+        self.auth_failures = 0
+        
+        for i in range(allowlist_size):
+            self._put(self.allowlist, self.make_player(f"player{i}"))
+        for i in range(bans_size):
+            player = self.make_player(f"banned{i}")
+            self._put(self.bans, {"player": player, "reason": "Banned", "expires": None, "source": "Server"})
+        for i in range(ip_bans_size):
+            ip = f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+            self.ip_bans[ip] = {"ip": ip, "reason": "Banned", "expires": None, "source": "Server"}
+        for i in range(operators_size):
+            player = self.make_player(f"op{i}")
+            self._put(self.operators, {"player": player, "level": 4, "bypassPlayerLimit": False})
+        for i in range(players_size):
+            self._put(self.players, self.make_player(f"online{i}"))
+    
+    @property
+    def port(self) -> int:
+        """实际监听的端口"""
+        if self._server is not None and self._server.sockets:
+            return self._server.sockets[0].getsockname()[1]
+        return self._port
+    
+    @property
+    def host(self) -> str:
+        """监听地址"""
+        return self._host
+    
+    @staticmethod
+    def make_player(name: str) -> Dict[str, Any]:
+        """生成带离线模式 UUID 的玩家对象"""
+        return {"name": name, "uuid": str(uuid_module.uuid3(uuid_module.NAMESPACE_OID, f"OfflinePlayer:{name}"))}
+    
+    async def start(self):
+        """开始监听"""
+        self._server = await asyncio.start_server(self._handle, self._host, self._port)
+    
+    async def stop(self):
+        """停止监听并断开所有连接"""
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+    
+    async def __aenter__(self) -> "FakeSmpServer":
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+    
+    # ========== 模拟服务器事件 ==========
+    
+    async def notify(self, method: str, params: Any = None):
+        """向所有连接广播通知"""
+        message = {"jsonrpc": "2.0", "method": f"{self._prefix}notification/{method}" if self._prefix else method}
+        if params is not None:
+            message["params"] = params
+        frame = _ws_encode_frame(WS_OP_TEXT, json.dumps(message, separators=(",", ":")).encode("utf-8"), False)
+        self.notifications += 1
+        for writer in list(self._writers):
+            if not writer.is_closing():
+                writer.write(frame)
+    
+    async def join_player(self, name: str) -> Dict[str, Any]:
+        """模拟玩家加入"""
+        player = self.make_player(name)
+        self._put(self.players, player)
+        await self.notify("players/joined", player)
+        return player
+    
+    async def leave_player(self, name: str):
+        """模拟玩家离开"""
+        player = self.players.pop(_player_key(self.make_player(name)), None)
+        if player is not None:
+            await self.notify("players/left", player)
+    
+    async def drop_connections(self):
+        """断开所有现有连接（模拟网络故障），保持监听"""
+        for writer in list(self._writers):
+            writer.close()
+    
+    # ========== 内部实现 ==========
+    
+    @staticmethod
+    def _put(table: Dict[str, Dict[str, Any]], entry: Dict[str, Any]):
+        table[_player_key(entry.get("player", entry))] = entry
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理单个客户端连接"""
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            if not await self._handshake(reader, writer):
+                return
+            self.connections += 1
+            self._writers.append(writer)
+            while True:
+                payload = await _ws_read_message(reader, writer, False)
+                if payload is None:
+                    break
+                self.frames += 1
+                try:
+                    message = json.loads(payload)
+                except ValueError:
+                    response: Any = self._error(None, -32700, "Parse error")
+                else:
+                    if isinstance(message, list):
+                        self.batches += 1
+                        response = [
+                            result for result in [await self._process(item) for item in message]
+                            if result is not None
+                        ] or None
+                    else:
+                        response = await self._process(message)
+                if response is not None:
+                    data = json.dumps(response, separators=(",", ":")).encode("utf-8")
+                    writer.write(_ws_encode_frame(WS_OP_TEXT, data, False))
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, OSError, asyncio.CancelledError):
+            # 停止服务器时处理任务会被取消，正常结束即可
+            pass
+        finally:
+            self._tasks.discard(task)
+            if writer in self._writers:
+                self._writers.remove(writer)
+            writer.close()
+    
+    async def _handshake(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        head = await reader.readuntil(b"\r\n\r\n")
+        headers = {
+            name.strip().lower(): value.strip()
+            for name, _, value in (line.partition(":") for line in head.decode("latin-1").split("\r\n")[1:] if line)
+        }
+        if headers.get("authorization") != f"Bearer {self.secret}":
+            self.auth_failures += 1
+            writer.write(b"HTTP/1.1 401 Unauthorized\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return False
+        key = headers.get("sec-websocket-key", "")
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {_ws_accept(key)}\r\n"
+            "\r\n"
+        ).encode("ascii"))
+        await writer.drain()
+        return True
+    
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+    
+    async def _process(self, message: Any) -> Optional[Dict[str, Any]]:
+        """处理一个请求，通知（没有 id）不返回响应"""
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            return self._error(None, -32600, "Invalid Request")
+        request_id = message.get("id")
+        method = message["method"]
+        if self._prefix and method.startswith(self._prefix):
+            method = method[len(self._prefix):]
+        self.requests += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        try:
+            result = NotImplemented
+            if self.handler is not None:
+                result = self.handler(method, message.get("params"))
+            if result is NotImplemented:
+                result = await self._dispatch(method, message.get("params"))
+        except KeyError:
+            return self._error(request_id, -32601, f"Method not found: {method}")
+        except (TypeError, ValueError, AttributeError) as ex:
+            return self._error(request_id, -32602, f"Invalid params: {ex}")
+        if request_id is None:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+    
+    async def _dispatch(self, method: str, params: Any) -> Any:
+        family, _, action = method.partition("/")
+        
+        if family in ("allowlist", "bans", "operators"):
+            return await self._player_list(family, action, params)
+        if family == "ip_bans":
+            return await self._ip_ban_list(action, params)
+        
+        if method == "players":
+            return list(self.players.values())
+        if method == "players/kick":
+            name = params.get("playerName") or params.get("name")
+            player = self.players.pop(_player_key(self.make_player(name)), None)
+            if player is not None:
+                await self.notify("players/left", player)
+            return None
+        
+        if method == "server/status":
+            return {"started": True, "version": {"name": "1.21.9", "protocol": 773}}
+        if method in ("server/save", "server/stop", "server/system_message"):
+            return None
+        
+        if method == "gamerules":
+            return self.game_rules
+        if method == "gamerules/update":
+            rule = self.game_rules[params["rule"]]
+            rule["value"] = params["value"]
+            await self.notify("gamerules/updated", {"name": params["rule"], "value": params["value"]})
+            return None
+        
+        if method == "serversettings":
+            return self.settings
+        if family == "serversettings":
+            key, _, action = action.partition("/")
+            if action == "set":
+                self.settings[key] = params
+                return None
+            return self.settings[key]
+        
+        raise KeyError(method)
+    
+    async def _player_list(self, family: str, action: str, params: Any) -> Any:
+        table = getattr(self, family)
+        if not action:
+            return list(table.values())
+        if action == "clear":
+            table.clear()
+            await self.notify(f"{family}/cleared")
+            return None
+        entries = _as_list(params)
+        if action == "set":
+            table.clear()
+            for entry in entries:
+                self._put(table, entry)
+            await self.notify(f"{family}/set", list(table.values()))
+        elif action == "add":
+            for entry in entries:
+                self._put(table, entry)
+            await self.notify(f"{family}/added", entries)
+        elif action == "remove":
+            removed = [
+                table.pop(_player_key(entry.get("player", entry)), None) for entry in entries
+            ]
+            removed = [entry for entry in removed if entry is not None]
+            if removed:
+                await self.notify(f"{family}/removed", removed)
+        else:
+            raise KeyError(f"{family}/{action}")
+        return None
+    
+    async def _ip_ban_list(self, action: str, params: Any) -> Any:
+        if not action:
+            return list(self.ip_bans.values())
+        if action == "clear":
+            self.ip_bans.clear()
+            await self.notify("ip_bans/cleared")
+            return None
+        entries = _as_list(params)
+        if action == "set":
+            self.ip_bans = {entry["ip"]: entry for entry in entries}
+            await self.notify("ip_bans/set", entries)
+        elif action == "add":
+            for entry in entries:
+                self.ip_bans[entry["ip"]] = entry
+            await self.notify("ip_bans/added", entries)
+        elif action == "remove":
+            ips = [entry if isinstance(entry, str) else entry["ip"] for entry in entries]
+            removed = [ip for ip in ips if self.ip_bans.pop(ip, None) is not None]
+            if removed:
+                await self.notify("ip_bans/removed", removed)
+        else:
+            raise KeyError(f"ip_bans/{action}")
+        return None